@@ -0,0 +1,170 @@
+"""
+clean_text() as it stood before the compiled OCR rule engine: one re.sub per
+rule, copied verbatim from the original parse_frank_shann.py. Frozen here as
+the reference bench_clean_text.py checks the engine against.
+"""
+import re
+import unicodedata
+
+
+def normalize_unicode(text):
+    """Convert Unicode characters to ASCII where possible"""
+    # Normalize Unicode to decomposed form, then remove combining characters
+    text = unicodedata.normalize('NFKD', text)
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    return text
+
+def clean_text(text):
+    """Comprehensive text cleaning with OCR error correction"""
+    # First, normalize Unicode
+    text = normalize_unicode(text)
+    
+    # Remove page artifacts and headers/footers
+    text = re.sub(r'=== PAGE \d+ ===', ' ', text)
+    text = re.sub(r'\$\d+\.\d+ \+ postage from orders@drugdoses\.com Page \d+', ' ', text)
+    text = re.sub(r'drugdoses\.com', ' ', text)
+    text = re.sub(r'Page \d+', ' ', text)
+    
+    # Fix common OCR character confusions - UNITS (comprehensive)
+    # mg variations
+    text = re.sub(r'(?<=\d)\s*rng\b', 'mg', text)
+    text = re.sub(r'(?<=\d)\s*rn\s*g\b', 'mg', text)
+    text = re.sub(r'(?<=\d)\s*rnq\b', 'mg', text)
+    text = re.sub(r'\brng\b', 'mg', text)
+    text = re.sub(r'\bmg\s+(?=\d)', 'mg/', text)  # "mg 12" -> "mg/12"
+    
+    # mcg variations
+    text = re.sub(r'(?<=\d)\s*rncg\b', 'mcg', text)
+    text = re.sub(r'(?<=\d)\s*mc\s*g\b', 'mcg', text)
+    text = re.sub(r'\brncg\b', 'mcg', text)
+    
+    # kg variations (extensive)
+    text = re.sub(r'(?<=\d)\s*l<g\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*1<g\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*I<g\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*k\(J\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*1\(g\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*k\[J\b', 'kg', text)
+    text = re.sub(r'(?<=\d)\s*kq\b', 'kg', text)
+    text = re.sub(r'\bl<g\b', 'kg', text)
+    text = re.sub(r'\bI<g\b', 'kg', text)
+    text = re.sub(r'\bk\(J\b', 'kg', text)
+    text = re.sub(r'\bk\[J\b', 'kg', text)
+    text = re.sub(r'\bkq\b', 'kg', text)
+    
+    # ml variations
+    text = re.sub(r'(?<=\d)\s*rnl\b', 'ml', text)
+    text = re.sub(r'(?<=\d)\s*rn I\b', 'ml', text)
+    text = re.sub(r'\brnl\b', 'ml', text)
+    text = re.sub(r'\bm\s+l\b', 'ml', text)
+    text = re.sub(r'\bmll\b', 'ml', text)
+    
+    # min/hr/H variations
+    text = re.sub(r'(?<=\d)\s*rnin\b', 'min', text)
+    text = re.sub(r'\brnin\b', 'min', text)
+    text = re.sub(r'\bllr\b', 'hr', text)
+    text = re.sub(r'\blhr\b', 'hr', text)
+    text = re.sub(r'\b1hr\b', '1hr', text)
+    text = re.sub(r'(?<=\d)\s*/H\b', 'H', text)  # "6-12/H" -> "6-12H"
+    text = re.sub(r'\bti-1\s*/H\b', '6-12H', text)  # Common pattern
+    text = re.sub(r'\b8-l2H\b', '8-12H', text)
+    
+    # Fix spacing around numbers and units
+    text = re.sub(r'(\d+)\s+(\.\s*\d+)', r'\1\2', text)  # "0 . 5" -> "0.5"
+    text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)  # "0 . 5" -> "0.5"
+    text = re.sub(r'0_\s*1', '0.1', text)  # "0_ 1" -> "0.1"
+    text = re.sub(r'(\d+)\s*_\s*(\d+)', r'\1.\2', text)  # "0_ 1" -> "0.1"
+    
+    # Common word OCR errors
+    text = re.sub(r'\bornl\b', 'oral', text, flags=re.IGNORECASE)
+    text = re.sub(r'\boml\b', 'oral', text, flags=re.IGNORECASE)
+    text = re.sub(r'\borul\b', 'oral', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bOrnin\b', '0min', text)
+    text = re.sub(r'\bOmin\b', '0min', text)
+    text = re.sub(r'\bbeforo\b', 'before', text)
+    text = re.sub(r'\btl1on\b', 'then', text)
+    text = re.sub(r'\btl1en\b', 'then', text)
+    text = re.sub(r'\bparacetarno1\b', 'paracetamol', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bparacetarnol\b', 'paracetamol', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bangioplasly\b', 'angioplasty', text)
+    text = re.sub(r'\bsoltn\b', 'solution', text)
+    text = re.sub(r'\bintratrac:l1eal\b', 'intratracheal', text)
+    text = re.sub(r'\bumoi\b', 'umol', text)
+    text = re.sub(r'\bumolll\b', 'umol/L', text)
+    text = re.sub(r'\burnoi\b', 'umol', text)
+    text = re.sub(r'\brnux\b', 'max', text)
+    text = re.sub(r'\brnax\b', 'max', text)
+    text = re.sub(r'\btub\b', 'tab', text)
+    text = re.sub(r'\brepoat\b', 'repeat', text)
+    text = re.sub(r'\bdni!y\b', 'daily', text)
+    text = re.sub(r'\bdnily\b', 'daily', text)
+    
+    # IV/IM variations
+    text = re.sub(r'\bUlV\b', 'IV', text)
+    text = re.sub(r'\bIVl\b', 'IM', text)
+    text = re.sub(r'\blVl\b', 'IM', text)
+    
+    # Common letter/number confusions in dosages
+    text = re.sub(r'\b1\s*!\s*i\s*0', '150', text)  # "1!i0" -> "150"
+    text = re.sub(r'\b!\s*i', '5', text)  # "!i" -> "5"
+    # Fix exclamation marks and special character confusions FIRST (before other substitutions)
+    # Most ! should be 't', but need to handle special cases
+    text = re.sub(r'!i', '5i', text)  # Temporarily mark "!i" pattern  
+    text = re.sub(r'!', 't', text)  # Convert remaining ! to t
+    text = re.sub(r'5i', 'ti', text)  # Convert back, now it's "ti"
+    text = re.sub(r'ti-1', '6-1', text)  # Fix "ti-1" -> "6-1"
+    
+    # Common letter/number confusions in dosages (do early)
+    text = re.sub(r'\b1\s*0\s*-\s*/\s*0', '10-20', text)  # "1 0-/0" or "10-/0" -> "10-20"
+    text = re.sub(r'\b([12]?\d)-/0', r'\1-20', text)  # "X-/0" -> "X-20"  
+    text = re.sub(r'/0mg', '20mg', text)  # "/0mg" -> "20mg"
+    text = re.sub(r'\b1 OO\s*(?=mg|mcg|ml|kg)', '100', text)
+    text = re.sub(r'\b1 O\s*(?=mg|mcg|ml|kg)', '10', text)
+    text = re.sub(r'\b0\s*\.\s*1\b', '0.1', text)
+    text = re.sub(r'\b0\s*\.\s*2\b', '0.2', text)
+    text = re.sub(r'\b0\s*\.\s*5\b', '0.5', text)
+    text = re.sub(r'\b1\s*\.\s*0\b', '1.0', text)
+    text = re.sub(r'\b2\.\s*5', '2.5', text)
+    
+    # Time intervals cleanup
+    text = re.sub(r'\b8-24ft\b', '8-24H', text)
+    text = re.sub(r'\b6-12JI\b', '6-12H', text)
+    text = re.sub(r'\b4wl<\b', '4wk', text)
+    text = re.sub(r'\b2wl<\b', '2wk', text)
+    text = re.sub(r'\b(\d+)wl<\b', r'\1wk', text)
+    text = re.sub(r'\bwl<\b', 'wk', text)
+    text = re.sub(r'\b(\d+)hr\b', r'\1H', text)  # Standardize to H
+    text = re.sub(r'\b21lr\b', '2hr', text)
+    text = re.sub(r'\b241lr\b', '24hr', text)
+    
+    # Fix "See X" references
+    text = re.sub(r'\bSee\s+([a-z])', r'See \1', text)
+    text = re.sub(r'\bSec\s+', 'See ', text)
+    text = re.sub(r'\bSoo\s+', 'See ', text)
+    text = re.sub(r'\bSeu\s+', 'See ', text)
+    
+    # Clean up common garbage patterns
+    text = re.sub(r'\b[A-Z]{1}\\\\\w+\b', '', text)  # Remove patterns like "A\\dtJit"
+    text = re.sub(r'\\u00b7', '-', text)
+    text = re.sub(r'~', '-', text)
+    text = re.sub(r'--+', '-', text)
+    
+    # Remove soft hyphens and other invisible characters
+    text = re.sub(r'[\u00ad\u200b\u200c\u200d]', '', text)
+    
+    # Remove obvious garbage patterns
+    text = re.sub(r'\$\d+\.\d+\s+\+\s+po;;lnqc.*?drugd?u?sos\.com', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'from\s+oniom.*?drugdosos\.com', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'ordors@.*?\.com', '', text)
+    text = re.sub(r'Pane\s+\d+', '', text)
+    text = re.sub(r'turnourlysis:', 'tumour lysis:', text)
+    
+    # Fix double periods
+    text = re.sub(r'\.\.+', '.', text)
+    
+    # Normalize whitespace
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+\.', '.', text)
+    text = re.sub(r'\.\s+\.', '.', text)
+    
+    return text.strip()
@@ -0,0 +1,89 @@
+"""
+Benchmark clean_text(): compiled OCR rule engine vs the original re.sub cascade.
+
+Runs over the raw name and dosage of every entry split out of
+frank_shann_extracted.txt and reports entries/second for both. Before timing,
+the engine's output is checked against the rule table run as a cascade and
+against the original hand-written clean_text() (baseline_clean_text.py),
+and every rule table phase is checked against its cascade on EDGE_CASES.
+
+    python benchmarks/bench_clean_text.py
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import parse_frank_shann as fs
+from frank_shann_rules import PHASES, compile_phase
+from baseline_clean_text import clean_text as baseline_clean_text
+
+
+# Text the corpus does not contain but the engine must still handle like
+# the cascade: 'ſ' folds to 's' under re.IGNORECASE but not under str.lower()
+EDGE_CASES = ['take ſy daily', 'Sy rng ſY', 'mg 12 rncg Kelvin K']
+
+
+def load_entries(path=os.path.join(ROOT, 'frank_shann_extracted.txt')):
+    """Raw (uncleaned) Frank Shann entries"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return fs.split_entries(f.readlines())
+
+
+def cascade_clean_text(text):
+    """clean_text() as it used to run: one re.sub per rule"""
+    text = fs.normalize_unicode(text)
+    text = fs.CLEAN_TEXT_RULES.apply_sequential(text)
+    return text.strip()
+
+
+def time_cleaner(cleaner, entries, repeat=3):
+    """Best-of-N wall time to clean every name and dosage"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for entry in entries:
+            cleaner(entry['name'])
+            cleaner(entry['dosage'])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    entries = load_entries()
+    rules = fs.CLEAN_TEXT_RULES
+
+    # Same output is a precondition for comparing speed
+    for entry in entries:
+        for field in ('name', 'dosage'):
+            compiled = fs.clean_text(entry[field])
+            for label, reference in (('rule table cascade', cascade_clean_text),
+                                     ('baseline clean_text', baseline_clean_text)):
+                if compiled != reference(entry[field]):
+                    print(f"✗ Output differs from {label} in {field}: {entry[field][:60]!r}")
+                    sys.exit(1)
+    for text in EDGE_CASES:
+        if fs.clean_text(text) != baseline_clean_text(text):
+            print(f"✗ Output differs from baseline clean_text: {text!r}")
+            sys.exit(1)
+        for phase in PHASES:
+            for field in ('name', 'dosage'):
+                table = compile_phase(phase, field)
+                if table.apply(text) != table.apply_sequential(text):
+                    print(f"✗ {phase}/{field} differs from its cascade: {text!r}")
+                    sys.exit(1)
+    print("✓ Output matches the rule table cascade and the baseline clean_text")
+
+    cascade = time_cleaner(cascade_clean_text, entries)
+    compiled = time_cleaner(fs.clean_text, entries)
+
+    print(f"Entries: {len(entries)} ({len(rules)} rules -> {len(rules.passes)} passes)")
+    print(f"  re.sub cascade : {cascade:.3f}s  {len(entries) / cascade:,.0f} entries/sec")
+    print(f"  compiled engine: {compiled:.3f}s  {len(entries) / compiled:,.0f} entries/sec")
+    print(f"  speedup        : {cascade / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Payload size and parse time of the columnar profile against minified JSON
+arrays, for every dataset.
+
+Sizes are raw and gzip-compressed (what a static host usually serves).
+Parse time is JSON parsing alone for the array form, and parsing plus
+decoding for the columnar form. It is measured in Python with
+decode_columnar(), and in Node with src/columnar.js when node is on PATH;
+Node stands in for the browser. Both decoders are checked to return the
+original records.
+
+    python benchmarks/bench_columnar.py [--repeat 20]
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from js_data import load_js_export
+from json_writer import decode_columnar, to_columnar
+
+
+def _load_json(path, key=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data[key] if key else data
+
+
+DATASETS = {
+    'formulary': lambda: _load_json('src/formularyData.json'),
+    'frankShann': lambda: _load_json('src/frankShannData.json'),
+    'counseling': lambda: load_js_export('src/counselingData.js', 'COUNSELING_MEDICATIONS'),
+    'dilution': lambda: load_js_export('src/dilutionData.js', 'DILUTION_DATA'),
+    'abx': lambda: _load_json('src/abxData.json', 'antibiotics'),
+}
+
+# Times JSON.parse of the array file against JSON.parse + decodeColumnar of
+# the columnar one; argv: columnar.js URL, array file, columnar file, repeat
+NODE_SCRIPT = """
+import { readFileSync } from 'node:fs';
+const { decodeColumnar } = await import(process.argv[1]);
+const [arrayText, columnarText] = [readFileSync(process.argv[2], 'utf8'), readFileSync(process.argv[3], 'utf8')];
+const repeat = Number(process.argv[4]);
+function best(fn) {
+    let min = Infinity;
+    for (let i = 0; i < repeat; i++) {
+        const start = process.hrtime.bigint();
+        fn();
+        min = Math.min(min, Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    return min;
+}
+// Key order aside: decoded records take the column order
+const sorted = (key, value) => value && typeof value === 'object' && !Array.isArray(value)
+    ? Object.fromEntries(Object.entries(value).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0)))
+    : value;
+const same = JSON.stringify(decodeColumnar(JSON.parse(columnarText)), sorted)
+    === JSON.stringify(JSON.parse(arrayText), sorted);
+console.log(JSON.stringify({
+    array: best(() => JSON.parse(arrayText)),
+    columnar: best(() => decodeColumnar(JSON.parse(columnarText))),
+    same,
+}));
+"""
+
+
+def minified(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def node_times(array_bytes, columnar_bytes, repeat):
+    """{'array': ms, 'columnar': ms, 'same': bool} from Node, or None without node"""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    decoder = 'file://' + os.path.join(ROOT, 'src', 'columnar.js')
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, payload in (('array.json', array_bytes), ('columnar.json', columnar_bytes)):
+            paths.append(os.path.join(tmp, name))
+            with open(paths[-1], 'wb') as f:
+                f.write(payload)
+        proc = subprocess.run([node, '--input-type=module', '-e', NODE_SCRIPT, decoder, *paths, str(repeat)],
+                              capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar vs JSON array payloads")
+    parser.add_argument('--repeat', type=int, default=20, help="timed parses per format, best kept (default 20)")
+    args = parser.parse_args()
+
+    print(f"{'dataset':<11} {'records':>7} {'array KB':>9} {'col KB':>7} {'gz array':>9} {'gz col':>7} "
+          f"{'py ms':>13} {'node ms':>13}")
+    totals = [0, 0, 0, 0]
+    for name, load in DATASETS.items():
+        records = load()
+        array_bytes = minified(records)
+        columnar_bytes = minified(to_columnar(records))
+        assert decode_columnar(json.loads(columnar_bytes)) == records, f"{name} does not round-trip"
+        sizes = [len(array_bytes), len(columnar_bytes),
+                 len(gzip.compress(array_bytes, 9)), len(gzip.compress(columnar_bytes, 9))]
+        totals = [t + s for t, s in zip(totals, sizes)]
+
+        py = (best_ms(lambda: json.loads(array_bytes), args.repeat),
+              best_ms(lambda: decode_columnar(json.loads(columnar_bytes)), args.repeat))
+        node = node_times(array_bytes, columnar_bytes, args.repeat)
+        if node is not None:
+            assert node['same'], f"{name} does not round-trip in src/columnar.js"
+        node_text = f"{node['array']:>6.2f}/{node['columnar']:<6.2f}" if node else f"{'-':>13}"
+        print(f"{name:<11} {len(records):>7} {sizes[0] / 1e3:>9.1f} {sizes[1] / 1e3:>7.1f} "
+              f"{sizes[2] / 1e3:>9.1f} {sizes[3] / 1e3:>7.1f} {py[0]:>6.2f}/{py[1]:<6.2f} {node_text}")
+
+    print(f"{'total':<11} {'':>7} {totals[0] / 1e3:>9.1f} {totals[1] / 1e3:>7.1f} "
+          f"{totals[2] / 1e3:>9.1f} {totals[3] / 1e3:>7.1f}")
+    print(f"\n✓ Columnar is {(1 - totals[1] / totals[0]) * 100:.0f}% smaller raw, "
+          f"{(1 - totals[3] / totals[2]) * 100:.0f}% smaller gzipped; every record round-trips")
@@ -0,0 +1,77 @@
+"""
+Benchmark the NumPy dose calculator against a per-patient Python loop.
+
+A synthetic batch of 10,000 paediatric weights (0.5-80 kg) is dosed for one
+drug, and one weight is dosed for every rule in the table. The rules are
+parsed from src/frankShannData.json, so no build step is needed first.
+
+    python benchmarks/bench_dose_calc.py
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from dose_rules import DoseCalculator, build_dose_rules, rule_limits
+
+
+def loop_doses(rule, weights):
+    """What a hand-written per-patient loop does"""
+    limits = rule_limits(rule)
+    if limits is None:
+        return [(float('nan'), float('nan'))] * len(weights)
+    low_per_kg, high_per_kg, cap_low, cap_high = limits
+    out = []
+    for w in weights:
+        out.append((min(low_per_kg * w, cap_low), min(high_per_kg * w, cap_high)))
+    return out
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n_patients=10000, seed=5):
+    with open('src/frankShannData.json', 'r', encoding='utf-8') as f:
+        calc = DoseCalculator(build_dose_rules(json.load(f)))
+    rng = np.random.default_rng(seed)
+    weights = np.clip(rng.lognormal(mean=2.6, sigma=0.8, size=n_patients), 0.5, 80.0)
+    weight_list = weights.tolist()
+
+    entry_id = calc.find('Tinidazole') if 'Tinidazole' in calc.names.values() else calc.ids[0]
+    rule = calc.rules[calc.first_rule[entry_id]]
+
+    # Same answers first
+    vec = calc.for_weights(entry_id, weights)
+    ref = np.array(loop_doses(rule, weight_list))
+    assert np.allclose(vec['low'], ref[:, 0], equal_nan=True) and np.allclose(vec['high'], ref[:, 1], equal_nan=True)
+
+    loop = best_of(lambda: loop_doses(rule, weight_list))
+    numpy = best_of(lambda: calc.for_weights(entry_id, weights))
+    print(f"One drug, {n_patients:,} patients ({calc.names[entry_id]}):")
+    print(f"  python loop: {loop * 1000:8.3f} ms")
+    print(f"  numpy batch: {numpy * 1000:8.3f} ms  ({loop / numpy:.0f}x)")
+
+    loop = best_of(lambda: [loop_doses(r, [12.5]) for r in calc.rules])
+    numpy = best_of(lambda: calc.for_weight(12.5))
+    print(f"One patient, {len(calc.rules):,} rules ({len(calc.ids):,} drugs):")
+    print(f"  python loop: {loop * 1000:8.3f} ms")
+    print(f"  numpy batch: {numpy * 1000:8.3f} ms  ({loop / numpy:.0f}x)")
+
+    full = best_of(lambda: [calc.for_weights(e, weights) for e in calc.ids], repeat=1)
+    print(f"Every drug for {n_patients:,} patients: {full:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Reading a page range from an extracted text file: scanning every page
+against seeking through the .pages.json index.
+
+The corpus is paediatric_5th_edition_extracted.txt repeated into a ~800
+page file (digit-shifted copies, as in bench_parsers.py), the size of the
+full Paediatric Protocols. Reported per range: the full scan
+(read_pages() filtered), the indexed read with the sidecar already on
+disk, and the one-off cost of building the index. The pages returned
+are checked to be the same.
+
+    python benchmarks/bench_page_index.py [--pages 800] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_parsers import scale_pages, write_page_file
+from extracted_text import read_pages, write_page_index
+
+SOURCE = os.path.join(ROOT, 'paediatric_5th_edition_extracted.txt')
+RANGES = ((169, 200), (1, 10), (790, 800))
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full scan vs page index")
+    parser.add_argument('--pages', type=int, default=800, help="approximate page count (default 800)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs, best kept (default 5)")
+    args = parser.parse_args()
+
+    pages = list(read_pages(SOURCE))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'paediatric_full_extracted.txt')
+        write_page_file(scale_pages(pages, -(-args.pages // len(pages))), path)
+        build_seconds, index = best(lambda: write_page_index(path), args.repeat)
+        print(f"{len(index['pages'])} pages, {os.path.getsize(path) / 1e6:.1f} MB; "
+              f"index built in {build_seconds * 1000:.1f} ms\n")
+
+        print(f"{'pages':<10} {'scan ms':>9} {'indexed ms':>11} {'speedup':>8}")
+        for first, last in RANGES:
+            scan_seconds, scanned = best(
+                lambda: [p for p in read_pages(path) if first <= p[0] <= last], args.repeat)
+            seek_seconds, indexed = best(lambda: list(read_pages(path, first, last)), args.repeat)
+            assert scanned == indexed, f"pages {first}-{last} differ"
+            print(f"{first}-{last:<6} {scan_seconds * 1000:>9.2f} {seek_seconds * 1000:>11.2f} "
+                  f"{scan_seconds / seek_seconds:>7.0f}x")
+    print("\n✓ Indexed reads return the same pages as the full scan")
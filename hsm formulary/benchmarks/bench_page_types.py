@@ -0,0 +1,74 @@
+"""
+What the page-type classifier changes in the Frank Shann parse.
+
+Without it, parse_frank_shann() segments every page after the generic-name
+marker, the infusion tables and appendix included; with it, only the pages
+page_types.py labels monograph. Reported: the one-off cost of classifying
+the document (the .pagetypes.json sidecar is then reused), best-of-N parse
+time with the sidecar in place, and the entries each run keeps.
+
+The gain is in the output, not in speed: the entries only the all-pages run
+keeps are pseudo-entries cut from infusion tables, lab values and the
+appendix. Parse time is within noise either way, and is printed as such.
+
+Runs on the frozen benchmarks/corpora copy, serial and without the
+incremental state, so every page is segmented and every entry cleaned.
+
+    python benchmarks/bench_page_types.py [--repeat 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from page_types import PAGE_TYPES, write_page_types
+from parse_frank_shann import parse_frank_shann
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpora', 'frank_shann_extracted.txt')
+MODES = {'all pages': None, 'monograph pages': ('monograph',)}
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frank Shann parse with and without page classification")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per mode, best kept (default 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frank_shann_extracted.txt')
+        shutil.copy(CORPUS, path)
+        classify_seconds, types = best(lambda: write_page_types(path), args.repeat)
+        counts = {kind: list(types['pages'].values()).count(kind) for kind in PAGE_TYPES}
+        print(f"{len(types['pages'])} pages classified in {classify_seconds * 1000:.1f} ms: "
+              + ', '.join(f"{n} {kind}" for kind, n in counts.items() if n) + "\n")
+
+        def parse(page_types):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return parse_frank_shann(path, output_file=os.path.join(tmp, 'out.json'), workers=1,
+                                         index_root=tmp, page_types=page_types)
+
+        results = {}
+        print(f"{'mode':<16} {'parse ms':>9} {'entries':>8}")
+        for mode, page_types in MODES.items():
+            seconds, entries = best(lambda: parse(page_types), args.repeat)
+            results[mode] = (seconds, len(entries))
+            print(f"{mode:<16} {seconds * 1000:>9.1f} {len(entries):>8}")
+
+    (all_seconds, all_entries), (mono_seconds, mono_entries) = results.values()
+    print(f"\n✓ {all_entries - mono_entries} pseudo-entries from table and appendix pages dropped")
+    print(f"  parse time {mono_seconds / all_seconds:.2f}x the all-pages run: within noise, not a speed optimisation")
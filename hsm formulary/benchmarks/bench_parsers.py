@@ -0,0 +1,252 @@
+"""
+Benchmark the parsing hot paths on fixed corpora, at 1x and scaled-up sizes.
+
+Corpora in benchmarks/corpora/ are frozen copies of frank_shann_extracted.txt,
+abx_extracted.txt and public/formulary.csv, so numbers stay comparable when
+the live files change. The counseling and dilution source text is not in the
+tree; their corpora are rendered from src/counselingData.js and
+create_complete_dataset.COMPLETE_DILUTION_DATA in the page layout the
+parsers read.
+
+A scaled corpus repeats the 1x pages (or CSV rows) with every digit of
+copy k shifted by k, so no two copies are byte-identical. The parsers do
+real work on each copy rather than hitting a content-hash cache.
+
+Each case runs in a fresh process, so its peak RSS is its own. Reported:
+best-of-N wall time, MB/s of input, records/s of output, peak RSS and
+the peak Python heap (one extra tracemalloc run).
+parse_abx_data() always emits its curated 18-drug table, so for abx only
+MB/s is meaningful.
+
+    python benchmarks/bench_parsers.py                      # every case, 1x 10x 100x
+    python benchmarks/bench_parsers.py --cases frank_shann,formulary_csv --scales 1,10
+    python benchmarks/bench_parsers.py --json bench.json    # also save results
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPORA = os.path.join(ROOT, 'benchmarks', 'corpora')
+sys.path.insert(0, ROOT)
+
+from build_report import peak_rss_mb
+
+PAGE = "=== PAGE {num} ===\n\n{text}\n\n"
+SCALES = (1, 10, 100)
+
+
+def shift_digits(text, k):
+    """Every digit d -> (d + k) % 10, to make copies differ without changing their shape"""
+    if k % 10 == 0:
+        return text
+    return text.translate(str.maketrans('0123456789', ''.join(str((d + k) % 10) for d in range(10))))
+
+
+def scale_pages(pages, scale):
+    """Pages repeated `scale` times, renumbered, copy k digit-shifted by k"""
+    num = 0
+    for k in range(scale):
+        for _, text in pages:
+            num += 1
+            yield num, shift_digits(text, k)
+
+
+def write_page_file(pages, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for num, text in pages:
+            f.write(PAGE.format(num=num, text=text.rstrip('\n')))
+
+
+def render_counseling(medications):
+    """Counseling PDF text, one medication per page, in the form parse_counseling_text() reads"""
+    pages = []
+    for n, med in enumerate(medications, 1):
+        special = med.get('specialConsiderations') or {}
+        lines = [med['name'], "Name:", "Pharmacological Group", med.get('pharmacologicalGroup', ''),
+                 "Indications and Dosage", f"Indication: {med.get('indication', '')}",
+                 f"Dosage: {med.get('dosage', '')}",
+                 "Method of Administration", med.get('methodOfAdministration', ''),
+                 "Special Considerations"]
+        labels = {'pregnancy': 'Pregnancy', 'breastfeeding': 'Breastfeeding', 'elderly': 'Elderly',
+                  'paediatric': 'Paediatric', 'fasting': 'Fasting',
+                  'hepaticImpairment': 'Hepatic impairment', 'renalImpairment': 'Renal impairment'}
+        for key, label in labels.items():
+            if special.get(key):
+                lines += [label, special[key]]
+        lines += ["Side Effects and their Management"] + list(med.get('sideEffects') or [])
+        others = med.get('others') or {}
+        lines += ["Storage", others.get('storage', ''), "Others", str(others.get('other_points', ''))]
+        pages.append((n, '\n'.join(lines)))
+    return pages
+
+
+def render_dilution(drugs):
+    """Dilution guideline text, one drug per page, in the form parse_dilution_pages() reads"""
+    pages = []
+    for n, drug in enumerate(drugs, 1):
+        lines = [f"{drug['genericName']} Injection",
+                 f"Brand Name {drug.get('brandName', '')}",
+                 f"Reconstitution {drug.get('reconstitution', '')}",
+                 f"Further Dilution {drug.get('furtherDilution', '')}",
+                 f"Diluents {', '.join(drug.get('diluents', []))}",
+                 f"Administration {drug.get('administration', '')}",
+                 f"Storage and Stability {drug.get('storage', '')}",
+                 f"Remarks {drug.get('remarks', '')}",
+                 "References"]
+        pages.append((n, '\n'.join(lines)))
+    return pages
+
+
+def scale_csv(src, dst, scale, header_rows=4):
+    """The formulary CSV with its body rows repeated, copy k digit-shifted by k"""
+    with open(src, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        rows = list(csv.reader(f))
+    head, body = rows[:header_rows], rows[header_rows:]
+    with open(dst, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(head)
+        for k in range(scale):
+            writer.writerows([[shift_digits(cell, k) for cell in row] for row in body])
+
+
+def prepare(case, scale, workdir):
+    """Write the scaled corpus for a case; returns its path"""
+    from extracted_text import read_pages
+
+    if case == 'formulary_csv':
+        path = os.path.join(workdir, f'formulary_x{scale}.csv')
+        scale_csv(os.path.join(CORPORA, 'formulary.csv'), path, scale)
+        return path
+    if case in ('clean_text', 'frank_shann'):
+        pages = list(read_pages(os.path.join(CORPORA, 'frank_shann_extracted.txt')))
+    elif case == 'abx':
+        pages = list(read_pages(os.path.join(CORPORA, 'abx_extracted.txt')))
+    elif case == 'counseling':
+        from js_data import load_js_export
+        pages = render_counseling(load_js_export(os.path.join(ROOT, 'src/counselingData.js'),
+                                                 'COUNSELING_MEDICATIONS'))
+    else:
+        from create_complete_dataset import COMPLETE_DILUTION_DATA
+        pages = render_dilution(COMPLETE_DILUTION_DATA)
+    path = os.path.join(workdir, f'{case}_x{scale}.txt')
+    write_page_file(scale_pages(pages, scale), path)
+    return path
+
+
+def run_case(case, corpus, workdir, workers):
+    """Parse one corpus; returns the number of records produced"""
+    out = os.path.join(workdir, 'out.json')
+    if case == 'clean_text':
+        import parse_frank_shann as fs
+        with open(corpus, 'r', encoding='utf-8') as f:
+            entries = fs.split_entries(f.readlines())
+        for entry in entries:
+            fs.clean_text(entry['name'])
+            fs.clean_text(entry['dosage'])
+        return len(entries)
+    if case == 'frank_shann':
+        from parse_frank_shann import parse_frank_shann
+        return len(parse_frank_shann(corpus, output_file=out, workers=workers, index_root=workdir))
+    if case == 'counseling':
+        from parse_counseling_pdf import parse_counseling_text
+        return len(parse_counseling_text(corpus, output_file=out, index_root=workdir))
+    if case == 'formulary_csv':
+        from convert_csv_to_json import parse_csv_to_json
+        return parse_csv_to_json(corpus, out, index_root=workdir)
+    if case == 'abx':
+        from parse_abx_data import parse_abx_data
+        return len(parse_abx_data(corpus, output_file=out)['antibiotics'])
+    from extracted_text import read_pages
+    from parse_dilution import parse_dilution_pages
+    return len(parse_dilution_pages(read_pages(corpus)))
+
+
+CASES = ('clean_text', 'frank_shann', 'counseling', 'formulary_csv', 'abx', 'dilution')
+
+
+def measure(case, scale, repeat, workers):
+    """Prepare and time one case in this process; returns a result dict"""
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = prepare(case, scale, workdir)
+        size = os.path.getsize(corpus)
+        baseline = peak_rss_mb()
+        devnull = open(os.devnull, 'w')
+        stdout = sys.stdout
+        best = float('inf')
+        try:
+            # The parsers print progress; keep it out of the report
+            sys.stdout = devnull
+            # Best of `repeat` runs; the 100x corpora are slow enough for one
+            for _ in range(repeat if scale < 100 else 1):
+                start = time.perf_counter()
+                records = run_case(case, corpus, workdir, workers)
+                best = min(best, time.perf_counter() - start)
+            peak = peak_rss_mb()
+            tracemalloc.start()
+            run_case(case, corpus, workdir, workers)
+            heap = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+    return {
+        'case': case, 'scale': scale, 'inputBytes': size, 'records': records,
+        'seconds': round(best, 4),
+        'mbPerSec': round(size / best / 1e6, 2),
+        'recordsPerSec': round(records / best),
+        'peakRssMb': peak, 'baselineRssMb': baseline,
+        'peakHeapMb': round(heap / 1e6, 1),
+    }
+
+
+def main(cases, scales, repeat, workers, json_path):
+    results = []
+    print(f"{'case':<14} {'scale':>5} {'input MB':>9} {'records':>8} {'best s':>8} "
+          f"{'MB/s':>7} {'records/s':>10} {'RSS MB':>7} {'heap MB':>8}")
+    for case in cases:
+        for scale in scales:
+            # One process per case: a clean peak RSS and no warm caches
+            proc = subprocess.run(
+                [sys.executable, __file__, '--one', case, str(scale), '--repeat', str(repeat)]
+                + (['--workers', str(workers)] if workers else []),
+                capture_output=True, text=True, encoding='utf-8',
+                env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+            if proc.returncode != 0:
+                print(f"✗ {case} x{scale} failed:\n{proc.stderr[-2000:]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(f"{case:<14} {scale:>4}x {r['inputBytes'] / 1e6:>9.2f} {r['records']:>8} {r['seconds']:>8.3f} "
+                  f"{r['mbPerSec']:>7.2f} {r['recordsPerSec']:>10,} {r['peakRssMb'] or 0:>7.1f} "
+                  f"{r['peakHeapMb']:>8.1f}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results -> {json_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cases', default=','.join(CASES), help=f"comma-separated subset of {', '.join(CASES)}")
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)), help="comma-separated multipliers")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case below 100x, best kept (default 3)")
+    parser.add_argument('--workers', type=int, default=None, help="Frank Shann cleanup processes (default: auto)")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--one', nargs=2, metavar=('CASE', 'SCALE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        print(json.dumps(measure(args.one[0], int(args.one[1]), args.repeat, args.workers)))
+    else:
+        cases = args.cases.split(',')
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+        main(cases, [int(s) for s in args.scales.split(',')], args.repeat, args.workers, args.json)
@@ -0,0 +1,90 @@
+"""
+Load-test the query service: concurrent keep-alive clients, mixed queries.
+
+Server and clients share one event loop (one core), so the numbers are a
+floor for what a dedicated server process sustains.
+
+    python benchmarks/bench_query_service.py [--requests 20000] [--clients 32]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from query_service import Catalog, LatencyStats, QueryService, print_stats
+
+
+def make_targets(catalog, n, seed=11):
+    """A reproducible mix of search, by-id, by-ATC and by-category requests"""
+    rng = random.Random(seed)
+    ids = list(catalog.by_id)
+    words = [w for w in catalog.indexes['formulary']['tokens'] if len(w) > 3 and w.isalpha()]
+    codes = catalog.atc_codes
+    categories = [c for names in catalog.categories.values() for c in names.values()]
+    targets = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.5:
+            targets.append(f"/search?q={rng.choice(words)[:rng.randint(3, 6)]}&limit=10")
+        elif kind < 0.75:
+            targets.append(f"/id/{quote(rng.choice(ids))}")
+        elif kind < 0.9:
+            targets.append(f"/atc/{rng.choice(codes)[:3]}")
+        else:
+            targets.append(f"/category?name={quote(rng.choice(categories))}")
+    return targets
+
+
+async def client(port, targets, stats):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for target in targets:
+        start = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+        await writer.drain()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        stats.record('client', time.perf_counter() - start)
+    writer.close()
+
+
+async def main(n_requests, n_clients):
+    start = time.perf_counter()
+    service = QueryService(Catalog())
+    print(f"Catalog loaded in {time.perf_counter() - start:.2f}s")
+    server = await service.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    targets = make_targets(service.catalog, n_requests)
+    client_stats = LatencyStats(window=n_requests)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, targets[i::n_clients], client_stats) for i in range(n_clients)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+
+    print(f"{n_requests} requests, {n_clients} clients: {elapsed:.2f}s, {n_requests / elapsed:,.0f} req/s")
+    print("\nServer-side handling time:")
+    print_stats(service.stats)
+    print("\nClient round trip:")
+    print_stats(client_stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.clients))
@@ -0,0 +1,106 @@
+"""
+Time to first lookup: parsing a dataset's JSON versus memory-mapping its
+binary record file.
+
+Each measurement runs in a fresh process, with the modules already
+imported and the file in the page cache, and covers getting from a path to
+one record: json.load and a scan for the id, against RecordFile() and
+get(). Also reported: the RSS of that process after the lookup, and the per-lookup
+cost of 1,000 random lookups on a warm RecordFile (next to a dict keyed by
+id, built after parsing).
+
+    python benchmarks/bench_record_file.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from record_file import RecordFile, write_record_file
+
+DATASETS = {
+    'formulary': 'src/formularyData.json',
+    'frankShann': 'src/frankShannData.json',
+}
+
+# Both start from the same imports, so the RSS difference is the data
+PRELUDE = """
+import json, os, sys, time
+sys.path.insert(0, sys.argv[4])
+from record_file import RecordFile
+start = time.perf_counter()
+"""
+FIRST_LOOKUP = {
+    'json': """
+with open(sys.argv[1], 'r', encoding='utf-8') as f:
+    records = json.load(f)
+record = next(r for r in records if r['id'] == sys.argv[3])
+""",
+    'record file': """
+records = RecordFile(sys.argv[2])
+record = records.get(sys.argv[3])
+""",
+}
+# Current RSS from /proc: ru_maxrss would include the parent's, as it survives exec
+REPORT = """
+elapsed = time.perf_counter() - start
+try:
+    with open('/proc/self/statm') as f:
+        rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+except OSError:
+    rss = None
+print(elapsed, rss)
+"""
+
+
+def first_lookup(kind, json_path, bin_path, record_id, repeat):
+    """(best seconds, peak RSS MB) over `repeat` fresh processes"""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PRELUDE + FIRST_LOOKUP[kind] + REPORT,
+                              json_path, bin_path, record_id, ROOT],
+                             capture_output=True, text=True, check=True).stdout.split()
+        runs.append((float(out[0]), float(out[1]) if out[1] != 'None' else None))
+    return min(runs)
+
+
+def per_lookup_us(lookup, ids):
+    start = time.perf_counter()
+    for record_id in ids:
+        lookup(record_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON vs memory-mapped record file lookups")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh processes per measurement, best kept (default 5)")
+    args = parser.parse_args()
+
+    print(f"{'dataset':<11} {'format':<12} {'size KB':>8} {'first lookup ms':>16} {'RSS MB':>7} {'warm lookup us':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for dataset, json_path in DATASETS.items():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            bin_path = os.path.join(tmp, f"{dataset}.bin")
+            write_record_file(records, bin_path)
+            ids = [random.choice(records)['id'] for _ in range(1000)]
+            # The last record: the worst case for the JSON scan
+            target = records[-1]['id']
+
+            by_id = {r['id']: r for r in records}
+            with RecordFile(bin_path) as rf:
+                assert rf.get(target) == by_id[target]
+                warm = {'json': per_lookup_us(by_id.get, ids), 'record file': per_lookup_us(rf.get, ids)}
+            for kind, path in (('json', json_path), ('record file', bin_path)):
+                seconds, rss = first_lookup(kind, json_path, bin_path, target, args.repeat)
+                print(f"{dataset:<11} {kind:<12} {os.path.getsize(path) / 1e3:>8.1f} {seconds * 1000:>16.2f} "
+                      f"{rss or 0:>7.1f} {warm[kind]:>15.2f}")
+    print("\n✓ JSON warm lookups are dict hits on the parsed data; record file lookups decode the record each time")
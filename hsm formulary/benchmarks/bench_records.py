@@ -0,0 +1,80 @@
+"""
+Memory of the formulary, Frank Shann, counseling and dilution datasets held
+together as lists of dicts versus RecordTables sharing one string table.
+
+Retained memory is what tracemalloc still counts after loading and a
+garbage collection, i.e. what a long-running process such as
+query_service.py keeps. Every table is checked to read back the exact
+records it was built from.
+
+    python benchmarks/bench_records.py
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from js_data import load_js_export
+from records import RecordTable, StringTable, load_table
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+LOADERS = {
+    'formulary': lambda: _load_json('src/formularyData.json'),
+    'frankShann': lambda: _load_json('src/frankShannData.json'),
+    'counseling': lambda: load_js_export('src/counselingData.js', 'COUNSELING_MEDICATIONS'),
+    'dilution': lambda: load_js_export('src/dilutionData.js', 'DILUTION_DATA'),
+}
+
+
+def as_dicts():
+    return {name: load() for name, load in LOADERS.items()}
+
+
+def as_tables():
+    strings = StringTable()
+    tables = {name: RecordTable.from_records(load(), strings) for name, load in LOADERS.items()}
+    strings.freeze()
+    return tables
+
+
+def retained(build):
+    """(result, bytes still allocated once build() returns, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, size, elapsed
+
+
+if __name__ == "__main__":
+    dicts, dict_bytes, dict_seconds = retained(as_dicts)
+    tables, table_bytes, table_seconds = retained(as_tables)
+
+    for name, records in dicts.items():
+        assert list(tables[name].dicts()) == records, f"{name} does not round-trip"
+    # load_table() is what the loaders use; make sure it agrees too
+    assert list(load_table('src/formularyData.json').dicts()) == dicts['formulary']
+
+    strings = next(iter(tables.values())).strings
+    print(f"{sum(len(r) for r in dicts.values())} records "
+          f"({', '.join(f'{name} {len(r)}' for name, r in dicts.items())}), "
+          f"{len(strings)} distinct strings\n")
+    print(f"{'':<16} {'retained MB':>12} {'load s':>8}")
+    print(f"{'list of dicts':<16} {dict_bytes / 1e6:>12.2f} {dict_seconds:>8.2f}")
+    print(f"{'RecordTable':<16} {table_bytes / 1e6:>12.2f} {table_seconds:>8.2f}")
+    print(f"\n✓ {(1 - table_bytes / dict_bytes) * 100:.0f}% less memory, every record round-trips")
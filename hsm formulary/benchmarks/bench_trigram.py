@@ -0,0 +1,73 @@
+"""
+Benchmark trigram lookup against the front end's linear includes() search.
+
+Queries are real drug names, each also corrupted the way OCR corrupts them
+(a dropped letter, a split word, a substituted character). Reports hit rate
+(the intended record in the top 5) and per-query latency for both.
+
+    python benchmarks/bench_trigram.py
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from trigram_index import build_trigram_index
+
+OCR_SUBSTITUTIONS = {'l': '!', 'i': 'l', 'o': '0', 't': '!', 'e': 'c', 'm': 'rn'}
+
+
+def corrupt(name, rng):
+    """One OCR-style error: drop a letter, split the word, or swap a glyph"""
+    word = name.split(' ')[0]
+    if len(word) < 5:
+        return word
+    kind = rng.choice(('drop', 'split', 'swap'))
+    i = rng.randrange(1, len(word) - 1)
+    if kind == 'drop':
+        return word[:i] + word[i + 1:]
+    if kind == 'split':
+        return word[:i] + ' ' + word[i:]
+    for j in range(len(word)):
+        k = (i + j) % len(word)
+        if word[k] in OCR_SUBSTITUTIONS:
+            return word[:k] + OCR_SUBSTITUTIONS[word[k]] + word[k + 1:]
+    return word[:i] + word[i + 1:]
+
+
+def includes_search(names, query):
+    """What App.jsx does: lowercase every name and test includes() on each keystroke"""
+    q = query.lower()
+    return [key for key, name in names if q in name.lower()]
+
+
+def main(n_queries=500, seed=7):
+    index = build_trigram_index()
+    names = [((dataset, record_id), name) for dataset, record_id, _, name in index.entries]
+    rng = random.Random(seed)
+    sample = rng.sample(names, min(n_queries, len(names)))
+
+    for label, make_query in (('exact', lambda name: name.split(' ')[0]),
+                              ('OCR-noisy', lambda name: corrupt(name, rng))):
+        queries = [(key, make_query(name)) for key, name in sample]
+
+        start = time.perf_counter()
+        linear_hits = sum(key in includes_search(names, q)[:5] for key, q in queries)
+        linear = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        trigram_hits = sum(key in [(m['dataset'], m['id']) for m in index.query(q, limit=5)]
+                           for key, q in queries)
+        trigram = (time.perf_counter() - start) / len(queries)
+
+        print(f"{label} queries ({len(queries)}, {len(names)} names):")
+        print(f"  includes(): {linear * 1000:7.3f} ms/query  top-5 hit rate {linear_hits / len(queries):6.1%}")
+        print(f"  trigram   : {trigram * 1000:7.3f} ms/query  top-5 hit rate {trigram_hits / len(queries):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
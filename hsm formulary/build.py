@@ -0,0 +1,374 @@
+"""
+Rebuild every generated dataset from its sources in one command.
+
+Each stage is one of the existing scripts with its input and output files.
+The stages form a DAG through those files (a stage waits for whichever
+stage last writes each of its inputs), and independent branches (Frank
+Shann, counseling, ABX, dilution, formulary CSV) run concurrently as
+separate processes.
+
+A stage is skipped when the content hashes of its inputs, its script and
+the local modules the script imports are unchanged since it last succeeded
+and its outputs are still there. File hashes are cached by size and mtime
+in .build_state.json, so a no-op rebuild only stats files.
+
+Each run writes build_report.json with every stage's wall time, CPU time,
+peak RSS, output record counts and the sections its script reports (see
+build_report.py, which also compares two reports for regressions).
+
+A stage may also read optional inputs, files it uses when present (the
+counseling JSON before the shipped JS module): they order and key the
+stage like inputs, their absence being part of the key, but never make
+it unavailable.
+
+A stage whose input file is absent (e.g. a PDF that is not checked in)
+keeps its existing outputs, so downstream stages still run; without
+outputs either it is reported unavailable, and so are the stages that need
+them unless they have their own outputs to keep.
+
+    python build.py                     # everything that is out of date
+    python build.py crossref sqlite     # these stages and what they need
+    python build.py --force parse_abx   # rerun even if up to date
+    python build.py --dry-run           # show what would run
+    python build.py --list              # stages and their dependencies
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from build_report import (METRICS_ENV, REPORT_PATH, REPORT_VERSION, count_records, peak_rss_mb, read_events,
+                          write_report)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = '.build_state.json'
+STATE_VERSION = 1
+
+
+class Stage:
+    """
+    One script run: python <script> <args>, reading inputs (and optional
+    inputs, when they exist), writing outputs
+    """
+
+    def __init__(self, name, script, inputs, outputs, args=(), optional=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.optional = list(optional)
+
+
+# In dependency order: a stage reading a file depends on the last stage
+# listed before it that writes that file
+STAGES = [
+    # Frank Shann
+    Stage('extract_frank_shann', 'extract_frank_shann.py',
+          ['public/Frank Shann 17th Edition 2017.pdf'], ['frank_shann_extracted.txt']),
+    Stage('parse_frank_shann', 'parse_frank_shann.py',
+          ['frank_shann_extracted.txt'],
+          ['src/frankShannData.json', 'public/data/frankShann.index.json', '.frank_shann_state.json']),
+    # fix_frank_data -> cleanup_frank_data_v2 -> cleanup_frank_final in one pass, in place
+    Stage('clean_frank_shann', 'clean_frank_shann.py',
+          ['src/frankShannData.json'], ['src/frankShannData.json']),
+    # Counseling
+    Stage('extract_counseling', 'extract_pdf_text.py',
+          ['public/borang-penilaian-kemahiran-kaunseling-pegawai-farmasi.pdf'], ['counseling_pdf_content.txt']),
+    Stage('parse_counseling', 'parse_counseling_pdf.py',
+          ['counseling_pdf_content.txt'], ['counseling_data_extracted.json', 'public/data/counseling.index.json']),
+    Stage('counseling_js', 'update_counseling_js.py',
+          ['counseling_data_extracted.json'], ['src/counselingData.js']),
+    # ABX
+    Stage('extract_abx', 'extract_abx_pdf.py',
+          ['public/Abx Regime HSM 2017.pdf'], ['abx_extracted.txt']),
+    Stage('parse_abx', 'parse_abx_data.py',
+          ['abx_extracted.txt'], ['src/abxData.json']),
+    # Dilution
+    Stage('extract_dilution', 'extract_pdf.py',
+          ['public/dilution guideline.pdf'], ['dilution_extracted.txt']),
+    Stage('parse_dilution', 'parse_dilution.py',
+          ['dilution_extracted.txt'], ['dilution_data.json']),
+    # Formulary CSV
+    Stage('formulary_csv', 'convert_csv_to_json.py',
+          ['public/formulary.csv'], ['src/formularyData.json', 'public/data/formulary.index.json']),
+    # Derived from several branches
+    Stage('trigram_index', 'trigram_index.py',
+          ['src/formularyData.json', 'src/frankShannData.json'], ['public/data/trigram.index.json'], ['build']),
+    Stage('dose_rules', 'dose_rules.py',
+          ['src/frankShannData.json'], ['public/data/frankShann.doseRules.json'], ['build']),
+    # Both read counseling_data_extracted.json instead of the JS module when it exists
+    Stage('crossref', 'link_entities.py',
+          ['src/formularyData.json', 'src/abxData.json', 'src/counselingData.js', 'src/frankShannData.json'],
+          ['public/data/crossref.json'], ['build'], optional=['counseling_data_extracted.json']),
+    Stage('sqlite', 'export_sqlite.py',
+          ['src/formularyData.json', 'src/abxData.json', 'src/counselingData.js', 'src/frankShannData.json'],
+          ['formulary.sqlite'], ['build'], optional=['counseling_data_extracted.json']),
+    Stage('record_files', 'record_file.py',
+          ['src/formularyData.json', 'src/abxData.json', 'src/counselingData.js', 'src/frankShannData.json'],
+          ['record_files/formulary.bin', 'record_files/frankShann.bin', 'record_files/abx.bin',
+           'record_files/dilution.bin', 'record_files/counseling.bin'], ['build']),
+]
+
+
+def dependencies(stages):
+    """{stage name: set of stage names it waits for}"""
+    writer = {}
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = {writer[path] for path in stage.inputs + stage.optional if path in writer}
+        for path in stage.outputs:
+            writer[path] = stage.name
+    return deps
+
+
+def select(stages, targets, deps):
+    """The target stages and everything upstream of them, in order"""
+    wanted = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [s for s in stages if s.name in wanted]
+
+
+IMPORT = re.compile(r'^\s*(?:from\s+(\w+)(?:\.\w+)*\s+import|import\s+([\w ,.]+))', re.MULTILINE)
+
+
+_modules = {}
+
+
+def local_modules(script):
+    """The script and every module of this directory it imports, transitively"""
+    if script in _modules:
+        return _modules[script]
+    found = []
+    todo = [script]
+    while todo:
+        path = todo.pop()
+        if path in found or not os.path.exists(path):
+            continue
+        found.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        for m in IMPORT.finditer(source):
+            names = [m.group(1)] if m.group(1) else [n.split()[0].split('.')[0] for n in m.group(2).split(',')]
+            todo.extend(f"{name}.py" for name in names if name)
+    _modules[script] = sorted(found)
+    return _modules[script]
+
+
+class BuildState:
+    """Cached file hashes and the key of each stage's last successful run"""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.files = {}
+        self.stages = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                self.files = state['files']
+                self.stages = state['stages']
+
+    def file_hash(self, path):
+        """SHA-256 of a file, reused while its size and mtime are unchanged"""
+        st = os.stat(path)
+        with self.lock:
+            cached = self.files.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        with self.lock:
+            self.files[path] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def stage_key(self, stage):
+        """Hash of everything a stage's result depends on"""
+        digest = hashlib.sha256(json.dumps([stage.script, stage.args]).encode())
+        for path in sorted(set(stage.inputs) | set(local_modules(stage.script))):
+            digest.update(f"\0{path}\0{self.file_hash(path)}".encode())
+        for path in sorted(stage.optional):
+            digest.update(f"\0{path}\0{self.file_hash(path) if os.path.exists(path) else 'absent'}".encode())
+        return digest.hexdigest()
+
+    def save(self):
+        with self.lock:
+            state = {'version': STATE_VERSION, 'files': self.files, 'stages': self.stages}
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=1, sort_keys=True)
+            os.replace(self.path + '.tmp', self.path)
+
+
+def run_stage(stage, state, force=False, dry_run=False, verbose=False):
+    """Run one stage if it is out of date; return (status, seconds, output, metrics)"""
+    missing = [p for p in stage.inputs if not os.path.exists(p)]
+    if missing:
+        if all(os.path.exists(p) for p in stage.outputs):
+            return 'kept', 0.0, f"{missing[0]} not found, keeping existing outputs", {}
+        return 'unavailable', 0.0, f"{missing[0]} not found", {}
+
+    key = state.stage_key(stage)
+    up_to_date = (state.stages.get(stage.name) == key and all(os.path.exists(p) for p in stage.outputs))
+    if up_to_date and not force:
+        return 'skipped', 0.0, '', {}
+    if dry_run:
+        return 'would run', 0.0, '', {}
+
+    metrics_path = f"{STATE_PATH}.{stage.name}.metrics"
+    if os.path.exists(metrics_path):
+        os.remove(metrics_path)
+    env = dict(os.environ, PYTHONIOENCODING='utf-8', **{METRICS_ENV: os.path.abspath(metrics_path)})
+    start = time.perf_counter()
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as log:
+        proc = subprocess.Popen([sys.executable, stage.script, *stage.args],
+                                stdout=log, stderr=subprocess.STDOUT, env=env)
+        if hasattr(os, 'wait4'):
+            # wait4 gives this child's own CPU time and peak RSS, even with
+            # other stages running concurrently
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            proc.wait()
+            usage = None
+        elapsed = time.perf_counter() - start
+        log.seek(0)
+        output = log.read()
+
+    metrics = {'wall': round(elapsed, 4)}
+    if usage is not None:
+        metrics.update(cpu=round(usage.ru_utime + usage.ru_stime, 4), cpuUser=round(usage.ru_utime, 4),
+                       cpuSystem=round(usage.ru_stime, 4), peakRssMb=peak_rss_mb(usage))
+    metrics.update(read_events(metrics_path))
+    if os.path.exists(metrics_path):
+        os.remove(metrics_path)
+    if proc.returncode != 0:
+        return 'failed', elapsed, output, metrics
+    metrics['records'] = {path: n for path in stage.outputs if (n := count_records(path)) is not None}
+
+    # Key the stage on its inputs as they are now: an in-place stage has
+    # just rewritten one of them
+    with state.lock:
+        state.stages.pop(stage.name, None)
+    key = state.stage_key(stage)
+    with state.lock:
+        state.stages[stage.name] = key
+    state.save()
+    return 'ran', elapsed, output if verbose else '', metrics
+
+
+def build(stages=STAGES, targets=None, jobs=None, force=False, dry_run=False, verbose=False,
+          report_path=REPORT_PATH):
+    """
+    Run the selected stages, independent ones concurrently; return {name: status}.
+    Unless this is a dry run, per-stage metrics are written to report_path.
+    """
+    deps = dependencies(stages)
+    names = {s.name for s in stages}
+    for target in targets or ():
+        if target not in names:
+            raise ValueError(f"Unknown stage: {target} (known: {', '.join(sorted(names))})")
+    selected = select(stages, targets, deps) if targets else list(stages)
+    forced = set(targets) if force and targets else names if force else set()
+
+    state = BuildState()
+    results = {}
+    stage_metrics = {}
+    jobs = jobs or os.cpu_count() or 1
+    started = datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+    pending = list(selected)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for stage in list(pending):
+                waiting_on = deps[stage.name] & {s.name for s in selected}
+                if any(results.get(d) in ('failed', 'blocked') for d in waiting_on):
+                    results[stage.name] = 'blocked'
+                    pending.remove(stage)
+                    print(f"✗ {stage.name:<20} blocked by a failed stage")
+                elif all(d in results for d in waiting_on):
+                    pending.remove(stage)
+                    running[pool.submit(run_stage, stage, state, stage.name in forced,
+                                        dry_run, verbose)] = stage
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                status, elapsed, output, metrics = future.result()
+                results[stage.name] = status
+                stage_metrics[stage.name] = {'status': status, **metrics}
+                mark = {'failed': '✗', 'unavailable': '-'}.get(status, '✓')
+                timing = f" in {elapsed:.2f}s" if status == 'ran' else ''
+                note = f" ({output})" if status in ('kept', 'unavailable') else ''
+                print(f"{mark} {stage.name:<20} {status}{timing}{note}")
+                if output and status in ('failed', 'ran'):
+                    print('\n'.join('    ' + line for line in output.rstrip().splitlines()[-40:]))
+
+    counts = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    summary = ', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+    elapsed = time.perf_counter() - start
+    print(f"{'✗' if 'failed' in counts or 'blocked' in counts else '✓'} Build finished in "
+          f"{elapsed:.2f}s: {summary}")
+
+    if not dry_run and report_path:
+        for name, status in results.items():
+            stage_metrics.setdefault(name, {'status': status})
+        write_report({
+            'version': REPORT_VERSION,
+            'started': started,
+            'wall': round(elapsed, 4),
+            'jobs': jobs,
+            'python': sys.version.split()[0],
+            # In stage order, not completion order
+            'stages': {s.name: stage_metrics[s.name] for s in selected},
+        }, report_path)
+        print(f"✓ Build report -> {report_path}")
+    return results
+
+
+def print_stages(stages=STAGES):
+    deps = dependencies(stages)
+    for stage in stages:
+        after = f"  (after {', '.join(sorted(deps[stage.name]))})" if deps[stage.name] else ''
+        print(f"{stage.name:<20} {' '.join([stage.script] + stage.args)}{after}")
+        optional = ''.join(f", [{path}]" for path in stage.optional)
+        print(f"{'':<20}   {', '.join(stage.inputs)}{optional} -> {', '.join(stage.outputs)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the generated datasets, skipping unchanged stages")
+    parser.add_argument('targets', nargs='*', help="stages to build with their upstream stages (default: all)")
+    parser.add_argument('--force', action='store_true', help="rerun the targets (or every stage) even if up to date")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="stages run at once (default: all cores)")
+    parser.add_argument('--dry-run', '-n', action='store_true', help="show what would run")
+    parser.add_argument('--verbose', '-v', action='store_true', help="print each stage's output")
+    parser.add_argument('--list', action='store_true', help="list stages and their dependencies")
+    parser.add_argument('--report', default=REPORT_PATH, help=f"build metrics report (default: {REPORT_PATH})")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if args.list:
+        print_stages()
+    else:
+        results = build(targets=args.targets, jobs=args.jobs, force=args.force,
+                        dry_run=args.dry_run, verbose=args.verbose, report_path=args.report)
+        sys.exit(1 if any(s in ('failed', 'blocked') for s in results.values()) else 0)
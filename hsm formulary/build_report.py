@@ -0,0 +1,228 @@
+"""
+Build metrics: per-stage timing, memory and record counts, and regression checks.
+
+build.py runs every stage with BUILD_METRICS pointing at a scratch file.
+Stage scripts mark their expensive parts with section() and their record
+counts with record_count(); both are no-ops when BUILD_METRICS is unset,
+so the scripts behave the same when run by hand.
+
+    with section('clean_entries'):
+        ...
+    record_count('entries', len(final_data))
+
+build.py adds the whole process's wall time, CPU time and peak RSS (from
+os.wait4) and the record count of each output file, and writes everything
+to build_report.json:
+
+    python build_report.py show build_report.json
+    python build_report.py compare old.json new.json [--threshold 0.2]
+
+compare exits non-zero when a stage or section got slower or bigger than
+the threshold allows, so it can gate a CI run.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+METRICS_ENV = 'BUILD_METRICS'
+REPORT_PATH = 'build_report.json'
+REPORT_VERSION = 1
+
+# Regressions smaller than these are noise whatever the ratio
+MIN_SECONDS = 0.1
+MIN_RSS_MB = 5.0
+
+# JSON keys holding the records of a wrapped dataset or index
+RECORD_KEYS = ('antibiotics', 'drugs', 'entities', 'entries', 'ids')
+
+
+def peak_rss_mb(usage=None):
+    """
+    Peak resident set size in MB of this process, or of the process an
+    os.wait4() rusage belongs to (ru_maxrss is KB on Linux, bytes on macOS)
+    """
+    if usage is None:
+        if resource is None:
+            return None
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _append(event):
+    path = os.environ.get(METRICS_ENV)
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + '\n')
+
+
+@contextmanager
+def section(name):
+    """Time a named part of a stage (wall and CPU) and note the peak RSS after it"""
+    if not os.environ.get(METRICS_ENV):
+        yield
+        return
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        _append({'section': name,
+                 'wall': time.perf_counter() - wall,
+                 'cpu': time.process_time() - cpu,
+                 'peakRssMb': peak_rss_mb()})
+
+
+def record_count(name, n):
+    """Report how many records a stage produced or consumed"""
+    _append({'count': name, 'n': n})
+
+
+def read_events(path):
+    """{'sections': {name: totals}, 'counts': {name: n}} from a metrics file"""
+    sections = {}
+    counts = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                event = json.loads(line)
+                if 'section' in event:
+                    s = sections.setdefault(event['section'], {'wall': 0.0, 'cpu': 0.0, 'calls': 0, 'peakRssMb': 0.0})
+                    s['wall'] += event['wall']
+                    s['cpu'] += event['cpu']
+                    s['calls'] += 1
+                    s['peakRssMb'] = max(s['peakRssMb'], event['peakRssMb'] or 0.0)
+                else:
+                    counts[event['count']] = event['n']
+    for s in sections.values():
+        s['wall'] = round(s['wall'], 4)
+        s['cpu'] = round(s['cpu'], 4)
+    return {'sections': sections, 'counts': counts}
+
+
+def count_records(path):
+    """Number of records in a generated file, or None if it has no record structure"""
+    # Hidden files (.frank_shann_state.json) are caches, not datasets
+    if not os.path.exists(path) or os.path.basename(path).startswith('.'):
+        return None
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            for key in RECORD_KEYS:
+                if isinstance(data.get(key), list):
+                    return len(data[key])
+        return len(data)
+    if path.endswith('.bin'):
+        from record_file import RecordFile
+        with RecordFile(path) as records:
+            return len(records)
+    if path.endswith('.sqlite'):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT count(*) FROM records").fetchone()[0]
+        finally:
+            conn.close()
+    return None
+
+
+def write_report(report, path=REPORT_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ran(report):
+    return {name: s for name, s in report['stages'].items() if s['status'] == 'ran'}
+
+
+def _check(rows, where, metric, old, new, threshold, floor):
+    if old is None or new is None:
+        return
+    if new > old * (1 + threshold) and new - old > floor:
+        rows.append((where, metric, old, new))
+
+
+def compare(old, new, threshold=0.2):
+    """
+    (regressions, count changes) between two reports. A regression is a
+    stage or section, run in both builds, whose wall time, CPU time or peak
+    RSS grew by more than threshold (and by more than the noise floor).
+    """
+    regressions = []
+    changes = []
+    old_stages, new_stages = _ran(old), _ran(new)
+    for name in sorted(set(old_stages) & set(new_stages)):
+        a, b = old_stages[name], new_stages[name]
+        for metric in ('wall', 'cpu'):
+            _check(regressions, name, metric, a.get(metric), b.get(metric), threshold, MIN_SECONDS)
+        _check(regressions, name, 'peakRssMb', a.get('peakRssMb'), b.get('peakRssMb'), threshold, MIN_RSS_MB)
+        for section_name in sorted(set(a['sections']) & set(b['sections'])):
+            sa, sb = a['sections'][section_name], b['sections'][section_name]
+            for metric in ('wall', 'cpu'):
+                _check(regressions, f"{name}/{section_name}", metric, sa[metric], sb[metric],
+                       threshold, MIN_SECONDS)
+        for what in ('records', 'counts'):
+            for key in sorted(set(a[what]) | set(b[what])):
+                if a[what].get(key) != b[what].get(key):
+                    changes.append((name, key, a[what].get(key), b[what].get(key)))
+    return regressions, changes
+
+
+def _mb(value):
+    return f"{value:>7.1f}" if value else f"{'-':>7}"
+
+
+def print_report(report):
+    print(f"Build {report['started']}: {report['wall']:.2f}s wall, {report['jobs']} job(s)")
+    print(f"{'stage':<20} {'status':<11} {'wall s':>7} {'cpu s':>7} {'rss MB':>7}  records")
+    for name, s in report['stages'].items():
+        if s['status'] != 'ran':
+            print(f"{name:<20} {s['status']:<11}")
+            continue
+        records = ', '.join(f"{os.path.basename(k)}={v}" for k, v in s['records'].items())
+        print(f"{name:<20} {s['status']:<11} {s['wall']:>7.2f} {s['cpu']:>7.2f} {_mb(s['peakRssMb'])}  {records}")
+        for section_name, t in s['sections'].items():
+            print(f"  {section_name:<29} {t['wall']:>7.2f} {t['cpu']:>7.2f} {_mb(t['peakRssMb'])}")
+
+
+def print_comparison(regressions, changes, threshold):
+    for where, metric, old, new in regressions:
+        print(f"✗ {where:<36} {metric:<10} {old:>9.3f} -> {new:>9.3f} (+{(new / old - 1) * 100 if old else 0:.0f}%)")
+    for stage, key, old, new in changes:
+        print(f"  {stage:<20} {key} count {old} -> {new}")
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) over {threshold * 100:.0f}%")
+    else:
+        print(f"✓ No regressions over {threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or compare build metric reports")
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('show', help="per-stage table of one report")
+    show.add_argument('report', nargs='?', default=REPORT_PATH)
+    cmp = sub.add_parser('compare', help="flag regressions between two reports")
+    cmp.add_argument('old')
+    cmp.add_argument('new')
+    cmp.add_argument('--threshold', type=float, default=0.2, help="allowed relative growth (default 0.2)")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        print_report(load_report(args.report))
+    else:
+        regressions, changes = compare(load_report(args.old), load_report(args.new), args.threshold)
+        print_comparison(regressions, changes, args.threshold)
+        sys.exit(1 if regressions else 0)
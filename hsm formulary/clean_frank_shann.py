@@ -0,0 +1,95 @@
+"""
+Single-pass Frank Shann post-processing.
+
+Loads src/frankShannData.json once, runs the requested phases of the shared
+rule table (frank_shann_rules.py) over every entry, saves once and reports
+how often each rule fired so dead rules can be dropped.
+
+    python clean_frank_shann.py                 # fix -> cleanup_v2 -> final
+    python clean_frank_shann.py fix cleanup     # any phases, in the order given
+    OCR_PROFILE=1 python clean_frank_shann.py   # + per-rule timing profile
+"""
+import json
+import sys
+
+from build_report import record_count, section
+from frank_shann_rules import PHASES, PIPELINE, compile_phase
+from ocr_engine import finish_profile, profile_from_env
+
+DATA_PATH = 'src/frankShannData.json'
+
+
+def compile_pipeline(phases):
+    """[(phase, field, RuleSet, strip)] in execution order"""
+    steps = []
+    for phase in phases:
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase: {phase}")
+        for field in ('name', 'dosage'):
+            steps.append((phase, field, compile_phase(phase, field), PHASES[phase]))
+    return steps
+
+
+def clean_entries(entries, steps):
+    """Apply compiled steps to every entry in place; return number changed"""
+    changed = 0
+    for entry in entries:
+        original = (entry['name'], entry['dosage'])
+        for phase, field, rules, strip in steps:
+            value = rules.apply(entry[field])
+            entry[field] = value.strip() if strip else value
+        if (entry['name'], entry['dosage']) != original:
+            changed += 1
+    return changed
+
+
+def hit_report(steps):
+    """Per-rule hit counts as (hits, phase, field, pattern) rows"""
+    rows = []
+    for phase, field, rules, _ in steps:
+        for rule in rules.rules:
+            rows.append((rule.hits, phase, field, rule.pattern))
+    return rows
+
+
+def print_hit_report(steps):
+    rows = hit_report(steps)
+    print("\nRule hits:")
+    for hits, phase, field, pattern in sorted(rows, key=lambda r: -r[0]):
+        if hits:
+            print(f"  {hits:6d}  {phase:<10} {field:<6} {pattern}")
+    dead = [r for r in rows if not r[0]]
+    print(f"\n{len(dead)} of {len(rows)} rules never fired:")
+    for _, phase, field, pattern in dead:
+        print(f"  {phase:<10} {field:<6} {pattern}")
+
+
+def run(phases=PIPELINE, path=DATA_PATH, report=True):
+    """Load, transform and save the Frank Shann data in one pass"""
+    with section('load_json'), open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    print(f"Processing {len(data)} entries through phases: {', '.join(phases)}")
+    steps = compile_pipeline(phases)
+    profile = profile_from_env()
+    if profile is not None:
+        for _, _, rules, _ in steps:
+            profile.attach(rules)
+    with section('apply_rules'):
+        changed = clean_entries(data, steps)
+
+    with section('write_json'), open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    record_count('entries', len(data))
+    record_count('changed', changed)
+
+    print(f"✓ Applied fixes to {changed} entries")
+    print(f"✓ Saved to {path}")
+    if report:
+        print_hit_report(steps)
+    finish_profile(profile)
+    return data
+
+
+if __name__ == "__main__":
+    run(tuple(sys.argv[1:]) or PIPELINE)
@@ -1,22 +1,23 @@
+import argparse
 import csv
-import json
+import itertools
 import re
-import os
 
-def parse_csv_to_json(csv_path, json_output_path):
-    print(f"Reading CSV from {csv_path}...")
-    
-    with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
-        # Read all lines first to handle multi-line cells if possible, 
-        # but standard csv module handles quoted multi-line fields well.
-        reader = csv.reader(f)
-        rows = list(reader)
+from json_writer import (COMPACT_ROOT, by_chapter, columnar_path, write_columnar, write_json_array,
+                         write_json_lines, write_shards)
+from build_report import record_count, section
+from search_index import IndexBuilder, write_index
 
+# Rows searched for the header; only this many are ever buffered
+HEADER_WINDOW = 20
+
+def detect_header(window):
+    """Find the header row in the first rows; returns (header_idx, col_map)"""
     # Find header row
     header_idx = -1
     col_map = {'atc': 0, 'name': 1, 'ind': 2, 'dose': 3, 'cat': 4, 'dept': 5, 'notes': 6, 'brand': 7, 'price': 8}
     
-    for i, row in enumerate(rows[:20]):
+    for i, row in enumerate(window):
         row_str = " ".join(row).upper()
         if "ATC" in row_str and ("GENERIK" in row_str or "GENERIC" in row_str or "NAME" in row_str):
             header_idx = i
@@ -58,12 +59,13 @@ def parse_csv_to_json(csv_path, json_output_path):
         print("Could not find header row. Using default mapping.")
         header_idx = 4 # Based on file view
 
-    start_row = header_idx + 1
+    return header_idx, col_map
+
+def iter_drugs(rows, col_map):
+    """Yield drug records from (row_index, row) pairs following the header"""
     current_section = "Others"
-    drugs = []
 
-    for i in range(start_row, len(rows)):
-        row = rows[i]
+    for i, row in rows:
         if not row: continue
         
         # Check for section header (e.g., "1.0 ALIMENTARY SYSTEM")
@@ -111,16 +113,66 @@ def parse_csv_to_json(csv_path, json_output_path):
             "highAlert": False, # Could infer from notes if needed
             "notes": full_notes.strip(),
             "price": price_val,
-            "prescriberCat": row[col_map['cat']].strip() if len(row) > col_map['cat'] else "N/A"
+            "prescriberCat": row[col_map['cat']].strip() if len(row) > col_map['cat'] else "N/A",
+            "atc": row[col_map['atc']].strip() if len(row) > col_map['atc'] else ""
         }
         
-        drugs.append(drug)
+        yield drug
+
+def parse_csv_to_json(csv_path, json_output_path, json_lines=False, compact=False, columnar=False,
+                      index_root=COMPACT_ROOT):
+    """
+    Convert the formulary CSV export to the app's drug JSON, streaming.
 
-    print(f"Extracted {len(drugs)} drugs.")
+    Only the header look-ahead window and the current row are held in memory;
+    records go straight to a JSON array (or JSON Lines) writer. With compact,
+    they go to minified per-chapter shards under public/data/formulary/ instead;
+    with columnar, to public/data/formulary.columnar.json (held in memory).
+    """
+    print(f"Reading CSV from {csv_path}...")
     
-    with open(json_output_path, 'w', encoding='utf-8') as f:
-        json.dump(drugs, f, indent=4, ensure_ascii=False)
+    with open(csv_path, 'r', encoding='utf-8', errors='replace') as f:
+        # The csv module handles quoted multi-line fields as it streams
+        reader = csv.reader(f)
+        window = list(itertools.islice(reader, HEADER_WINDOW))
+        header_idx, col_map = detect_header(window)
+
+        start_row = header_idx + 1
+        rows = itertools.chain(
+            enumerate(window[start_row:], start_row),
+            enumerate(reader, max(start_row, len(window)))
+        )
+        # Index records as they stream through to the writer
+        index = IndexBuilder('formulary', ('genericName', 'brandName', 'category'))
+        drugs = index.feed(iter_drugs(rows, col_map))
+        # Reading, converting and writing are interleaved, so one section
+        with section('convert'):
+            if compact:
+                count = write_shards(drugs, 'formulary', by_chapter('category'))['total']
+                json_output_path = COMPACT_ROOT + '/formulary'
+            elif columnar:
+                json_output_path = columnar_path('formulary')
+                count = write_columnar(drugs, json_output_path)
+            elif json_lines:
+                count = write_json_lines(drugs, json_output_path)
+            else:
+                count = write_json_array(drugs, json_output_path, indent=4)
+
+    print(f"Extracted {count} drugs.")
     print(f"Saved to {json_output_path}")
+    with section('build_index'):
+        write_index(index.build(), index_root)
+    record_count('drugs', count)
+    return count
 
 if __name__ == "__main__":
-    parse_csv_to_json('public/formulary.csv', 'src/formularyData.json')
+    parser = argparse.ArgumentParser(description="Convert public/formulary.csv to src/formularyData.json")
+    parser.add_argument('csv_path', nargs='?', default='public/formulary.csv')
+    parser.add_argument('json_output_path', nargs='?', default='src/formularyData.json')
+    parser.add_argument('--jsonl', action='store_true', help="write JSON Lines instead of a JSON array")
+    parser.add_argument('--compact', action='store_true', help="write minified per-chapter shards + manifest")
+    parser.add_argument('--columnar', action='store_true', help="write dictionary-encoded columns instead")
+    args = parser.parse_args()
+
+    parse_csv_to_json(args.csv_path, args.json_output_path, json_lines=args.jsonl, compact=args.compact,
+                      columnar=args.columnar)
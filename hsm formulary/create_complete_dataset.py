@@ -476,12 +476,13 @@ COMPLETE_DILUTION_DATA = [
     }
 ]
 
-print(f"✅ Complete dataset created with {len(COMPLETE_DILUTION_DATA)} injectable drugs")
-print("\nDrugs by category:")
-categories = {}
-for drug in COMPLETE_DILUTION_DATA:
-    cat = drug['category']
-    categories[cat] = categories.get(cat, 0) + 1
+if __name__ == "__main__":
+    print(f"✅ Complete dataset created with {len(COMPLETE_DILUTION_DATA)} injectable drugs")
+    print("\nDrugs by category:")
+    categories = {}
+    for drug in COMPLETE_DILUTION_DATA:
+        cat = drug['category']
+        categories[cat] = categories.get(cat, 0) + 1
 
-for cat, count in sorted(categories.items()):
-    print(f"  {cat}: {count}")
+    for cat, count in sorted(categories.items()):
+        print(f"  {cat}: {count}")
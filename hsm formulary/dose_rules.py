@@ -0,0 +1,406 @@
+"""
+Structured weight-based dose rules from Frank Shann dosage text.
+
+parse_dose_rules() pulls every per-kg dose out of a dosage string:
+
+    "50mg/kg (adult 2g) daily for 2 days oral"
+    -> {low: 50, high: 50, unit: 'mg', per: 'dose', cap: 2000, capLow: 2000,
+        capKind: 'adult', dailyCap: None, capPerKg: None, dailyCapPerKg: None,
+        unsafe: False, intervalHours: [24, 24], route: 'oral'}
+
+Ranges ("0.15-0.2mg/kg"), rates ("mcg/kg/min"), OCR's "meg" for mcg and
+"l" for "/" ("15mglkg"), the route and "8H"/"6-12H"/daily/nocte intervals are recognised; "for 48H",
+"x 3H" and "over 4H" are durations, not intervals. Caps are read anywhere
+in the clause: per dose ("(adult 20mg)", "(adult 500mg-1g)", "max 35mg/kg")
+and per day ("(max 5g/day)", "(max 100mg/kg/day)"). A daily cap limits
+each dose by the most frequent interval. Caps are converted to the rule's
+unit when both are masses. A per-kg dose that is itself a limit ("max
+60mg/kg", "up to 90mg/kg") is not a rule.
+
+A rule whose clause mentions a max or adult dose that could not be read,
+or that has a daily cap but no interval, is marked unsafe: the calculator
+gives no number for it, only "check reference".
+
+DoseCalculator evaluates the rules with NumPy: one rule for an array of
+patient weights, or every rule for one weight, in a single batched call.
+
+    python dose_rules.py build                 # src/frankShannData.json -> public/data/frankShann.doseRules.json
+    python dose_rules.py dose Tinidazole 12.5  # doses for a 12.5 kg child
+    python dose_rules.py check                 # the REGRESSIONS cases below
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from build_report import record_count, section
+from json_writer import COMPACT_ROOT
+
+RULES_PATH = os.path.join(COMPACT_ROOT, 'frankShann.doseRules.json')
+
+UNITS = {'mg': 'mg', 'mcg': 'mcg', 'meg': 'mcg', 'g': 'g', 'ng': 'ng', 'u': 'u', 'iu': 'u',
+         'ml': 'ml', 'mmol': 'mmol', 'umol': 'umol', 'micromol': 'umol', 'kiu': 'kiu'}
+# Mass units in milligrams, so caps can be converted to the dose unit
+MASS_MG = {'g': 1000.0, 'mg': 1.0, 'mcg': 0.001, 'ng': 0.000001}
+UNIT_PATTERN = r'(mg|mcg|meg|g|ng|u|iu|ml|mmol|umol|micromol|kiu)'
+# "0.5", "40,000": thousands separators are part of the number
+NUMBER = r'(\d{1,3}(?:,\d{3})+(?![\d,])(?:\.\d+)?|\d+(?:\.\d+)?)'
+
+PER_KG = re.compile(
+    NUMBER + r'(?:\s*-{1,2}\s*' + NUMBER + r')?\s*' + UNIT_PATTERN +
+    r'\s*[/l]\s*kg(?:\s*/\s*(min|hr|h|day|d)\b)?', re.IGNORECASE)
+# "adult 20mg", "adult 500mg-1g", "adult 75-200mg", "max 35mg/kg", "max 5g/day",
+# "max 4glday" (OCR), "max 100mg/kg/day", "max 5mg/kg/hr"
+CAP = re.compile(
+    r'\b(adult|max(?:imum)?)\b\.?[\s:]*' + NUMBER + r'\s*' + UNIT_PATTERN + r'?(?:\s*-{1,2}\s*' + NUMBER +
+    r')?\s*' + UNIT_PATTERN + r'(?!(?!l(?:kg|day|d)\b)[a-z])(?:\s*[/l]\s*(kg)\b)?'
+    r'(?:\s*[/l]\s*(day|d|24\s*H|hr|h|min)\b|\s+(daily|a day|per day)\b)?', re.IGNORECASE)
+CAP_HINT = re.compile(r'\b(?:adult|max(?:imum)?)\b', re.IGNORECASE)
+# A per-kg amount that is a limit, not a dose: "max 60mg/kg", "up to 90mg/kg"
+LIMIT_LEAD = re.compile(r'(?:\bmax(?:imum)?|\bup to)\.?\s*$', re.IGNORECASE)
+INTERVAL = re.compile(r'\b(\d+)(?:\s*-\s*(\d+))?\s*H\b')
+# "for 48H", "x 3H", "over 4H": a duration
+DURATION_LEAD = re.compile(r'(?:\bfor|\bx|\bover|\bafter|\bwithin)\s*$', re.IGNORECASE)
+# Where a clause ends: ';' or a sentence break (not a decimal point)
+CLAUSE_END = re.compile(r';|\.\s+(?=[A-Z<>(])')
+ROUTES = {'oral': 'oral', 'po': 'oral', 'iv': 'IV', 'im': 'IM', 'sc': 'SC', 'rectal': 'rectal',
+          'pr': 'rectal', 'sl': 'SL', 'neb': 'nebulised', 'nebulised': 'nebulised',
+          'inhaled': 'inhaled', 'topical': 'topical', 'intranasal': 'intranasal', 'it': 'intrathecal'}
+ROUTE = re.compile(r'\b(' + '|'.join(ROUTES) + r')\b', re.IGNORECASE)
+DAILY = re.compile(r'\b(daily|nocte|mane)\b', re.IGNORECASE)
+PER_SUFFIX = {'min': 'min', 'hr': 'hr', 'h': 'hr', 'day': 'day', 'd': 'day'}
+# Hours per rule period, for turning a daily cap into a rate cap
+PERIOD_HOURS = {'min': 1 / 60, 'hr': 1.0, 'day': 24.0}
+
+
+def _number(text):
+    return float(text.replace(',', ''))
+
+
+def _convert(value, from_unit, to_unit):
+    """A cap in the rule's unit, or None when the units do not convert"""
+    if from_unit == to_unit:
+        return value
+    if from_unit in MASS_MG and to_unit in MASS_MG:
+        return value * MASS_MG[from_unit] / MASS_MG[to_unit]
+    return None
+
+
+def _interval(span):
+    """[low, high] hours between doses, skipping durations such as "for 48H" """
+    for m in INTERVAL.finditer(span):
+        if not DURATION_LEAD.search(span[:m.start()]):
+            return [float(m.group(1)), float(m.group(2) or m.group(1))]
+    if DAILY.search(span):
+        return [24.0, 24.0]
+    return None
+
+
+def _read_caps(span, unit, per):
+    """
+    The caps in a clause, in the rule's unit: {cap, capLow, capKind,
+    capPerKg, dailyCap, dailyCapPerKg}, and whether any cap went unread
+    """
+    caps = dict.fromkeys(('cap', 'capLow', 'capKind', 'capPerKg', 'dailyCap', 'dailyCapPerKg'))
+    read = 0
+    for m in CAP.finditer(span):
+        kind, first, first_unit, second, unit_text, per_kg, period, daily = m.groups()
+        cap_unit = UNITS[unit_text.lower()]
+        high = _convert(_number(second or first), cap_unit, unit)
+        low = _convert(_number(first), UNITS[first_unit.lower()] if first_unit else cap_unit, unit)
+        if high is None or low is None:
+            continue
+        period = (period or '').lower().replace(' ', '')
+        if daily or period in ('day', 'd', '24h'):
+            key = 'dailyCapPerKg' if per_kg else 'dailyCap'
+        elif period in ('hr', 'h', 'min'):
+            # A rate cap: only limits a rate in the same period
+            if PER_SUFFIX[period] == per:
+                key = 'capPerKg' if per_kg else 'cap'
+            else:
+                read += 1
+                continue
+        else:
+            key = 'capPerKg' if per_kg else 'cap'
+        read += 1
+        if caps[key] is None or high < caps[key]:
+            caps[key] = high
+            if key == 'cap':
+                caps['capLow'] = low
+                caps['capKind'] = 'adult' if kind.lower() == 'adult' else 'max'
+    return caps, read < len(CAP_HINT.findall(span))
+
+
+def parse_dose_rules(dosage):
+    """Every per-kg dose rule in a dosage string, in order"""
+    rules = []
+    matches = [m for m in PER_KG.finditer(dosage) if not LIMIT_LEAD.search(dosage[:m.start()])]
+    for n, m in enumerate(matches):
+        low = _number(m.group(1))
+        high = _number(m.group(2)) if m.group(2) else low
+        unit = UNITS[m.group(3).lower()]
+        per = PER_SUFFIX[m.group(4).lower()] if m.group(4) else 'dose'
+
+        # The rest of this clause: up to the next per-kg dose, ';' or the end of the sentence
+        end = matches[n + 1].start() if n + 1 < len(matches) else len(dosage)
+        span = CLAUSE_END.split(dosage[m.end():end])[0]
+        # The start of this clause, for a leading "Oral:" or "IV:"
+        start = max(dosage.rfind(';', 0, m.start()), dosage.rfind('. ', 0, m.start()),
+                    dosage.rfind(',', 0, m.start()), matches[n - 1].end() if n else -1)
+        lead = dosage[start + 1:m.start()]
+
+        caps, unread = _read_caps(span, unit, per)
+        # A cap further on, before the next dose ("10mg/kg 8H. Max 1g."), may
+        # limit this rule but is not read as its cap: check the reference
+        stray = bool(CAP_HINT.search(dosage[m.end() + len(span):end]))
+        interval = _interval(span) if per == 'dose' else None
+        has_daily = caps['dailyCap'] is not None or caps['dailyCapPerKg'] is not None
+
+        route_match = ROUTE.search(span) or ROUTE.search(lead)
+        rules.append({
+            'low': low,
+            'high': high,
+            'unit': unit,
+            'per': per,
+            **{key: round(value, 6) if isinstance(value, float) else value for key, value in caps.items()},
+            # A zero amount is a misread number, never a dose
+            'unsafe': unread or stray or low <= 0 or (has_daily and per == 'dose' and interval is None),
+            'intervalHours': interval,
+            'route': ROUTES[route_match.group(1).lower()] if route_match else None,
+            'text': dosage[m.start():m.end() + len(span)].strip()[:120],
+        })
+    return rules
+
+
+def rule_limits(rule):
+    """
+    (low per kg, high per kg, low cap, high cap) of a rule with every cap
+    applied; caps are inf when absent. None for an unsafe rule.
+
+    Daily caps become per-dose caps at the rule's most frequent interval,
+    or per-period caps for rates.
+    """
+    if rule.get('unsafe'):
+        return None
+    inf = float('inf')
+    low, high = rule['low'], rule['high']
+    cap_high = rule['cap'] if rule.get('cap') is not None else inf
+    cap_low = rule['capLow'] if rule.get('capLow') is not None else cap_high
+    if rule.get('capPerKg') is not None:
+        low, high = min(low, rule['capPerKg']), min(high, rule['capPerKg'])
+    daily, daily_per_kg = rule.get('dailyCap'), rule.get('dailyCapPerKg')
+    if daily is not None or daily_per_kg is not None:
+        if rule['per'] == 'dose':
+            share = rule['intervalHours'][0] / 24
+        else:
+            share = PERIOD_HOURS[rule['per']] / 24
+        if daily is not None:
+            cap_high = min(cap_high, daily * share)
+            cap_low = min(cap_low, daily * share)
+        if daily_per_kg is not None:
+            low, high = min(low, daily_per_kg * share), min(high, daily_per_kg * share)
+    return low, high, cap_low, cap_high
+
+
+def build_dose_rules(entries):
+    """{entry id: [rules]} for every entry with at least one per-kg dose"""
+    table = {}
+    for entry in entries:
+        rules = parse_dose_rules(entry['dosage'])
+        if rules:
+            table[entry['id']] = {'name': entry['name'], 'rules': rules}
+    return table
+
+
+class DoseCalculator:
+    """
+    Dose rules flattened into NumPy arrays.
+
+    for_weights(): one rule, many patients (weights array)
+    for_weight():  every rule (many drugs), one patient
+
+    Doses of unsafe rules are NaN.
+    """
+
+    def __init__(self, table):
+        self.ids = []
+        self.names = {}
+        self.rules = []
+        rule_entry = []
+        for entry_id, item in table.items():
+            self.names[entry_id] = item['name']
+            for rule in item['rules']:
+                rule_entry.append(len(self.ids))
+                self.rules.append(rule)
+            self.ids.append(entry_id)
+        self.rule_entry = np.array(rule_entry, dtype=np.int64)
+        self.high = np.array([r['high'] for r in self.rules], dtype=float)
+        limits = np.array([rule_limits(r) or (np.nan,) * 4 for r in self.rules], dtype=float).reshape(-1, 4)
+        self.low_per_kg, self.high_per_kg, self.cap_low, self.cap = limits.T
+        self.unsafe = np.isnan(self.high_per_kg)
+        self.first_rule = {}
+        for i, e in enumerate(rule_entry):
+            self.first_rule.setdefault(self.ids[e], i)
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find(self, name):
+        """Entry id for an id or a case-insensitive name"""
+        if name in self.names:
+            return name
+        key = name.lower()
+        for entry_id, entry_name in self.names.items():
+            if entry_name.lower() == key:
+                return entry_id
+        raise KeyError(f"no dose rules for {name!r}")
+
+    def rule_indices(self, entry_id):
+        start = self.first_rule[entry_id]
+        end = start
+        while end < len(self.rules) and self.ids[self.rule_entry[end]] == entry_id:
+            end += 1
+        return range(start, end)
+
+    def for_weights(self, entry_id, weights, rule=0):
+        """Low/high dose (capped) for an array of weights under one of an entry's rules"""
+        indices = self.rule_indices(self.find(entry_id))
+        if not 0 <= rule < len(indices):
+            raise IndexError(f"{entry_id!r} has {len(indices)} dose rules, no rule {rule}")
+        i = indices[rule]
+        weights = np.asarray(weights, dtype=float)
+        low = np.minimum(self.low_per_kg[i] * weights, self.cap_low[i])
+        high = np.minimum(self.high_per_kg[i] * weights, self.cap[i])
+        return {'low': low, 'high': high, 'capped': high < self.high[i] * weights,
+                'unsafe': bool(self.unsafe[i]), 'rule': self.rules[i]}
+
+    def for_weight(self, weight):
+        """Low/high dose (capped) of every rule of every entry for one weight"""
+        low = np.minimum(self.low_per_kg * weight, self.cap_low)
+        high = np.minimum(self.high_per_kg * weight, self.cap)
+        return {'low': low, 'high': high, 'capped': high < self.high * weight,
+                'unsafe': self.unsafe, 'entry': self.rule_entry}
+
+
+# (dosage, weight kg, rule, expected (low, high) or None for "check reference",
+# expected intervalHours): strings the calculator once got unsafely wrong
+REGRESSIONS = [
+    # Daily cap after the interval: 30mg/kg 6H at 70kg would be 8.4g/day
+    ("Rectal: 40mg/kg stat, then 30mg/kg 6H (max 5g/day).", 70, 1, (1250, 1250), [6, 6]),
+    ("15mg/kg 4-6H (max 4glday)", 70, 0, (666.667, 666.667), [4, 6]),
+    # A duration is not an interval
+    ("60mg/kg (up to 90mg/kg for 48H)", 70, 0, (4200, 4200), None),
+    ("20mg/kg 12H for 48H", 10, 0, (200, 200), [12, 12]),
+    ("5mg/kg over 4H, then 2mg/kg 8H", 10, 0, (50, 50), None),
+    # Adult range: both ends cap
+    ("Oral: 15-25mg/kg (adult 500mg-1g) 8H.", 70, 0, (500, 1000), [8, 8]),
+    ("1.5-4mg/kg (adult 75-200mg) 6H", 70, 0, (75, 200), [6, 6]),
+    # Per-kg caps: the limit is not a rule of its own
+    ("25mg/kg 8H (max 100mg/kg/day) oral.", 20, 0, (500, 500), [8, 8]),
+    ("0.2mg/kg 4-6H (max 0.8 mg/kg/day or 40mg/day).", 10, 0, (1.33333, 1.33333), [4, 6]),
+    ("15mg/kg 8H oral, max 35 mg/kg 8H (max 4g/day) oral.", 100, 0, (1333.33, 1333.33), [8, 8]),
+    # A cap that cannot be read, or a daily cap without an interval
+    ("0.02-0.05mg/kg (adult 1 | 2mg) 4-6H.", 70, 0, None, [4, 6]),
+    ("2mg/kg (max 6ml) IV", 70, 0, None, None),
+    ("10mg/kg IV (max 1g/day).", 70, 0, None, None),
+    # A cap in a later sentence or clause than the dose
+    ("10mg/kg 8H. Max 1g.", 70, 0, None, [8, 8]),
+    ("Oral, IV: 15mg/kg 4-6H; child usual daily max 60mg/kg (up to 90mg/kg for 48H).", 10, 0, None, [4, 6]),
+    # Thousands separators: 40,000u/kg is not 0u/kg
+    ("1,000u/kg IV", 10, 0, (10000, 10000), None),
+    ("30,000u/kg IV 8H", 2, 0, (60000, 60000), [8, 8]),
+    ("Loading 2,000 u/kg IV, then 10,000u/kg/hr", 10, 1, (100000, 100000), None),
+    ("40,000u/kg (adult 2 million u) 8H", 70, 0, None, [8, 8]),
+    ("0u/kg IV", 10, 0, None, None),
+    ("00-225iu/kg daily", 10, 0, None, [24, 24]),
+]
+
+
+def check_regressions():
+    """Run REGRESSIONS; returns the failures as messages"""
+    failures = []
+    for dosage, weight, n, expected, interval in REGRESSIONS:
+        rules = parse_dose_rules(dosage)
+        calc = DoseCalculator({'case': {'name': dosage, 'rules': rules}})
+        result = calc.for_weights('case', [weight], rule=n)
+        got = None if result['unsafe'] else (float(result['low'][0]), float(result['high'][0]))
+        ok = (got is None) == (expected is None) and rules[n]['intervalHours'] == interval
+        if ok and expected is not None:
+            ok = np.allclose(got, expected, rtol=1e-4)
+        if not ok:
+            failures.append(f"{dosage!r} at {weight:g} kg, rule {n}: got {got}, every {rules[n]['intervalHours']}; "
+                            f"expected {expected}, every {interval}")
+    try:
+        DoseCalculator({'case': {'name': 'x', 'rules': parse_dose_rules("1mg/kg 8H")}}).for_weights('case', [10], rule=1)
+        failures.append("for_weights(rule=1) on a one-rule entry did not raise IndexError")
+    except IndexError:
+        pass
+    return failures
+
+
+def _describe_caps(rule):
+    caps = []
+    if rule.get('cap') is not None:
+        caps.append(f"{rule['capKind']} {rule['cap']:g}{rule['unit']}")
+    if rule.get('capPerKg') is not None:
+        caps.append(f"max {rule['capPerKg']:g}{rule['unit']}/kg")
+    if rule.get('dailyCap') is not None:
+        caps.append(f"max {rule['dailyCap']:g}{rule['unit']}/day")
+    if rule.get('dailyCapPerKg') is not None:
+        caps.append(f"max {rule['dailyCapPerKg']:g}{rule['unit']}/kg/day")
+    return ', '.join(caps)
+
+
+def _format_dose(low, high, rule):
+    amount = f"{low:.4g}" if low == high else f"{low:.4g}-{high:.4g}"
+    unit = rule['unit'] + ('' if rule['per'] == 'dose' else f"/{rule['per']}")
+    every = ''
+    if rule['intervalHours']:
+        a, b = rule['intervalHours']
+        every = f" every {a:g}H" if a == b else f" every {a:g}-{b:g}H"
+    return f"{amount} {unit}{every}{' ' + rule['route'] if rule['route'] else ''}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frank Shann weight-based dose rules")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help=f"parse src/frankShannData.json into {RULES_PATH}")
+    build.add_argument('--data', default='src/frankShannData.json')
+    dose = sub.add_parser('dose', help="doses of one drug for a weight")
+    dose.add_argument('name')
+    dose.add_argument('weight', type=float)
+    sub.add_parser('check', help="run the regression cases")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with section('parse_rules'), open(args.data, 'r', encoding='utf-8') as f:
+            table = build_dose_rules(json.load(f))
+        os.makedirs(COMPACT_ROOT, exist_ok=True)
+        with section('write_json'), open(RULES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+        n_rules = sum(len(t['rules']) for t in table.values())
+        record_count('rules', n_rules)
+        print(f"✓ {n_rules} dose rules for {len(table)} entries -> {RULES_PATH}")
+    elif args.command == 'check':
+        failures = check_regressions()
+        for failure in failures:
+            print(f"✗ {failure}")
+        if failures:
+            parser.exit(1, f"✗ {len(failures)} of {len(REGRESSIONS) + 1} regression cases failed\n")
+        print(f"✓ {len(REGRESSIONS) + 1} regression cases pass")
+    else:
+        calc = DoseCalculator.from_file()
+        entry_id = calc.find(args.name)
+        print(f"{calc.names[entry_id]} for {args.weight:g} kg:")
+        for n, i in enumerate(calc.rule_indices(entry_id)):
+            result = calc.for_weights(entry_id, [args.weight], rule=n)
+            rule = result['rule']
+            if result['unsafe']:
+                print(f"  check reference    <- {rule['text']}")
+                continue
+            cap = f" (capped: {_describe_caps(rule)})" if result['capped'][0] else ''
+            print(f"  {_format_dose(result['low'][0], result['high'][0], rule)}{cap}    <- {rule['text']}")
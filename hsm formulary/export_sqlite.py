@@ -0,0 +1,202 @@
+"""
+Export every dataset into one SQLite database with FTS5 full-text search.
+
+  records      - one row per record: dataset, id, name, brand, category,
+                 atc, prescriber_cat, searchable body and the full record as
+                 JSON; indexed on ATC code, category and prescriber category
+  records_fts  - external-content FTS5 index over name, brand, category, body
+
+    python export_sqlite.py build
+    python export_sqlite.py query "amoxicillin syrup" [--dataset formulary]
+    python export_sqlite.py query "cef" --atc J01 --prescriber "A*"
+
+Queries are ranked with bm25, weighting name matches above brand, category
+and body text, and only touch the rows they return.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+
+from build_report import record_count, section
+from create_complete_dataset import COMPLETE_DILUTION_DATA
+from js_data import load_js_export
+
+DB_PATH = 'formulary.sqlite'
+
+# bm25 column weights: name, brand, category, body
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE records (
+    rowid INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    brand TEXT,
+    category TEXT,
+    atc TEXT,
+    prescriber_cat TEXT,
+    body TEXT,
+    data TEXT NOT NULL,
+    UNIQUE (dataset, id)
+);
+CREATE INDEX idx_records_atc ON records (atc);
+CREATE INDEX idx_records_category ON records (category);
+CREATE INDEX idx_records_prescriber_cat ON records (prescriber_cat);
+CREATE VIRTUAL TABLE records_fts USING fts5(
+    name, brand, category, body,
+    content='records', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _join(*parts):
+    return '\n'.join(p for p in parts if p)
+
+
+def _load_json(path, key=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data[key] if key else data
+
+
+def load_counseling():
+    """parse_counseling_pdf.py output if present, else the shipped JS module"""
+    if os.path.exists('counseling_data_extracted.json'):
+        return _load_json('counseling_data_extracted.json')
+    return load_js_export('src/counselingData.js', 'COUNSELING_MEDICATIONS')
+
+
+def formulary_row(r):
+    return (r['genericName'], r['brandName'], r['category'], r.get('atc'), r['prescriberCat'],
+            _join(r['indications'], r['dosing'], r['notes']))
+
+
+def frank_shann_row(r):
+    return (r['name'], None, None, None, None, r['dosage'])
+
+
+def abx_row(r):
+    renal = '\n'.join(f"CrCl {d['crcl']}: {d['adjustment']}" for d in r.get('renalDosing', []))
+    return (r['name'], None, r.get('category'), None, None,
+            _join(r.get('route'), r.get('usualDose'), renal, r.get('notes'), ' '.join(r.get('matchKeywords', []))))
+
+
+def dilution_row(r):
+    return (r['genericName'], r.get('brandName'), r.get('category'), None, None,
+            _join(r.get('reconstitution'), r.get('furtherDilution'), ' '.join(r.get('diluents', [])),
+                  r.get('administration'), r.get('storage'), r.get('remarks')))
+
+
+def counseling_row(r):
+    return (r['name'], None, r.get('pharmacologicalGroup'), None, None,
+            _join(r.get('indication'), r.get('dosage'), r.get('methodOfAdministration'),
+                  ' '.join(r.get('sideEffects', []))))
+
+
+# dataset -> (loader, row builder); the loaders read each generator's output
+SOURCES = {
+    'formulary': (lambda: _load_json('src/formularyData.json'), formulary_row),
+    'frankShann': (lambda: _load_json('src/frankShannData.json'), frank_shann_row),
+    'abx': (lambda: _load_json('src/abxData.json', 'antibiotics'), abx_row),
+    'dilution': (lambda: COMPLETE_DILUTION_DATA, dilution_row),
+    'counseling': (load_counseling, counseling_row),
+}
+
+
+def build_database(path=DB_PATH, sources=SOURCES):
+    """Build the database in a temp file and swap it in when complete"""
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(SCHEMA)
+    counts = {}
+    with conn:
+        for dataset, (load, to_row) in sources.items():
+            with section('load_sources'):
+                records = load()
+            with section('insert_rows'):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (dataset, id, name, brand, category, atc, prescriber_cat, body, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((dataset, r['id'], *to_row(r), json.dumps(r, ensure_ascii=False)) for r in records)
+                )
+            counts[dataset] = len(records)
+            record_count(dataset, len(records))
+        with section('fts_rebuild'):
+            conn.execute("INSERT INTO records_fts (records_fts) VALUES ('rebuild')")
+    with section('vacuum'):
+        conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, path)
+    print(f"✓ {', '.join(f'{n} {d}' for d, n in counts.items())} -> {path}")
+    return counts
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{w}"*' for w in words)
+
+
+def query(conn, text, dataset=None, atc=None, category=None, prescriber=None, limit=10, raw=False):
+    """Ranked matches as (dataset, id, name, category, snippet, score) rows"""
+    match = text if raw else fts_query(text)
+    if not match:
+        return []
+    sql = [f"""
+        SELECT r.dataset, r.id, r.name, r.category,
+               snippet(records_fts, 3, '[', ']', '…', 12),
+               bm25(records_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score
+        FROM records_fts JOIN records r ON r.rowid = records_fts.rowid
+        WHERE records_fts MATCH ?"""]
+    params = [match]
+    if dataset:
+        sql.append("AND r.dataset = ?")
+        params.append(dataset)
+    if atc:
+        sql.append("AND r.atc LIKE ?")
+        params.append(atc.upper() + '%')
+    if category:
+        sql.append("AND r.category LIKE ?")
+        params.append(f"%{category}%")
+    if prescriber:
+        sql.append("AND r.prescriber_cat = ?")
+        params.append(prescriber)
+    sql.append("ORDER BY score LIMIT ?")
+    params.append(limit)
+    return conn.execute('\n'.join(sql), params).fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite FTS5 export of all formulary datasets")
+    parser.add_argument('--db', default=DB_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help="load every generated dataset into the database")
+    q = sub.add_parser('query', help="ranked full-text query")
+    q.add_argument('text')
+    q.add_argument('--dataset', choices=sorted(SOURCES))
+    q.add_argument('--atc', help="ATC code prefix, e.g. J01C")
+    q.add_argument('--category', help="category substring")
+    q.add_argument('--prescriber', help="prescriber category, e.g. A*")
+    q.add_argument('--limit', type=int, default=10)
+    q.add_argument('--raw', action='store_true', help="pass the text through as FTS5 query syntax")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_database(args.db)
+    else:
+        conn = sqlite3.connect(args.db)
+        start = time.perf_counter()
+        rows = query(conn, args.text, args.dataset, args.atc, args.category, args.prescriber,
+                     args.limit, args.raw)
+        elapsed = time.perf_counter() - start
+        for ds, record_id, name, category, snippet, score in rows:
+            print(f"{score:8.2f}  {ds:<10} {record_id:<16} {' '.join(name.split())}")
+            print(f"          {' '.join(snippet.split())[:110]}")
+        print(f"{len(rows)} result(s) in {elapsed * 1000:.1f} ms")
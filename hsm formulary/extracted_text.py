@@ -0,0 +1,163 @@
+"""
+Readers for the *_extracted.txt files written by the extract_*.py scripts.
+
+Pages are streamed one at a time from the === PAGE n === markers, so parsers
+never hold more than a single page of text in memory.
+
+Each text file can have a sidecar page index, <name>.pages.json, with the
+byte range of every page's text. pdf_extract.py writes it next to every
+file it extracts; for other files (the *_medications.txt excerpts) it is
+built on first use. read_pages(path, first, last) uses it to seek straight
+to a page range instead of scanning the whole file:
+
+    for num, text in read_pages('paediatric_5th_edition_extracted.txt', 169, 200):
+        ...
+
+    python extracted_text.py index *_extracted.txt *_medications.txt
+    python extracted_text.py pages paediatric_5th_edition_extracted.txt 169-175
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+
+PAGE_MARKER = re.compile(r'^\s*=== PAGE (\d+) ===')
+MARKER_TEXT = re.compile(rb'=== PAGE')
+INDEX_VERSION = 1
+
+
+def iter_page_lines(lines):
+    """Group an iterable of lines into (page_number, text) pairs"""
+    page_num = None
+    buffer = []
+    for line in lines:
+        marker = PAGE_MARKER.match(line)
+        if marker:
+            if page_num is not None:
+                yield page_num, ''.join(buffer)
+            page_num = int(marker.group(1))
+            buffer = []
+        elif page_num is not None:
+            buffer.append(line)
+    if page_num is not None:
+        yield page_num, ''.join(buffer)
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + '.pages.json'
+
+
+def build_page_index(path):
+    """
+    {version, size, mtimeNs, pages: [[page_number, start, end], ...]} for a
+    text file: the byte range of each page's text, after its marker line
+    """
+    stat = os.stat(path)
+    pages = []
+    if stat.st_size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            line_end = 0
+            for candidate in MARKER_TEXT.finditer(data):
+                if candidate.start() < line_end:
+                    continue
+                # The candidate's whole line; a lone \r ends a line too in
+                # text mode (universal newlines)
+                start = max(data.rfind(b'\n', 0, candidate.start()), data.rfind(b'\r', 0, candidate.start())) + 1
+                ends = [i for i in (data.find(b'\n', candidate.end()), data.find(b'\r', candidate.end())) if i >= 0]
+                line_end = min(ends) + 1 if ends else len(data)
+                if data[line_end - 1:line_end + 1] == b'\r\n':
+                    line_end += 1
+                # Only marker candidates are decoded
+                marker = PAGE_MARKER.match(data[start:line_end].decode('utf-8'))
+                if marker:
+                    if pages:
+                        pages[-1][2] = start
+                    pages.append([int(marker.group(1)), line_end, None])
+    if pages:
+        pages[-1][2] = stat.st_size
+    return {'version': INDEX_VERSION, 'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns, 'pages': pages}
+
+
+def write_page_index(path):
+    """Build and save the sidecar index of a text file; returns it"""
+    index = build_page_index(path)
+    with open(index_path(path), 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return index
+
+
+def load_page_index(path):
+    """
+    The sidecar index of a text file, rebuilt (and saved, where the
+    directory is writable) if it is missing or the file has changed since
+    """
+    try:
+        with open(index_path(path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        stat = os.stat(path)
+        if (index.get('version') == INDEX_VERSION and index['size'] == stat.st_size
+                and index['mtimeNs'] == stat.st_mtime_ns):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        return write_page_index(path)
+    except OSError:
+        return build_page_index(path)
+
+
+def read_page_range(path, first=None, last=None):
+    """
+    Yield (page_number, text) for the pages numbered first..last (inclusive,
+    either end open), seeking to each through the page index
+    """
+    index = load_page_index(path)
+    with open(path, 'rb') as f:
+        for num, start, end in index['pages']:
+            if (first is not None and num < first) or (last is not None and num > last):
+                continue
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8')
+            if '\r' in text:
+                # What text mode (universal newlines) would have returned
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            yield num, text
+
+
+def read_pages(path, first=None, last=None):
+    """
+    Yield (page_number, text) lazily from an extracted text file; with first
+    and/or last, only that page range, read through the page index
+    """
+    if first is not None or last is not None:
+        yield from read_page_range(path, first, last)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_page_lines(f)
+
+
+def _page_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Page indexes for extracted text files")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('index', help="write the .pages.json sidecar of each file")
+    build.add_argument('paths', nargs='+')
+    show = sub.add_parser('pages', help="print a page range, e.g. 169-200")
+    show.add_argument('path')
+    show.add_argument('range', type=_page_range)
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        for path in args.paths:
+            index = write_page_index(path)
+            nums = [p[0] for p in index['pages']]
+            span = f", pages {min(nums)}-{max(nums)}" if nums else ''
+            print(f"✓ {path}: {len(nums)} pages{span} -> {index_path(path)}")
+    else:
+        for num, text in read_pages(args.path, *args.range):
+            print(f"=== PAGE {num} ===\n{text}")
@@ -0,0 +1,382 @@
+"""
+Declarative OCR correction table shared by every Frank Shann cleaner.
+
+Each rule names the phase it belongs to, the entry fields it applies to,
+its pattern/replacement (plus optional re flags) and an optional `when`
+guard: the rule only runs on a field containing one of those substrings.
+
+Phases mirror the scripts the rules were collected from:
+  parse       clean_text() in parse_frank_shann.py (every name and dosage)
+  fix         fix_frank_data.py
+  cleanup     cleanup_frank_data.py
+  cleanup_v2  cleanup_frank_data_v2.py
+  final       cleanup_frank_final.py
+"""
+import re
+from collections import namedtuple
+
+from ocr_engine import Rule, RuleSet
+
+NAME = ('name',)
+DOSAGE = ('dosage',)
+BOTH = ('name', 'dosage')
+
+TableRule = namedtuple('TableRule', 'phase fields pattern repl flags when')
+
+# phase -> whether both fields are str.strip()ped after the phase's rules
+PHASES = {
+    'parse': False,
+    'fix': True,
+    'cleanup': True,
+    'cleanup_v2': True,
+    'final': False,
+}
+
+# Post-parse phases, in data refresh order, run by clean_frank_shann.py
+PIPELINE = ('fix', 'cleanup_v2', 'final')
+
+
+def rule(phase, fields, pattern, repl, flags=0, when=None):
+    return TableRule(phase, fields, pattern, repl, flags, when)
+
+
+RULES = [
+    # ----- parse_frank_shann.py: clean_text() -----
+    # Remove page artifacts and headers/footers
+    rule('parse', BOTH, r'=== PAGE \d+ ===', ' '),
+    rule('parse', BOTH, r'\$\d+\.\d+ \+ postage from orders@drugdoses\.com Page \d+', ' '),
+    rule('parse', BOTH, r'drugdoses\.com', ' '),
+    rule('parse', BOTH, r'Page \d+', ' '),
+
+    # Fix common OCR character confusions - UNITS (comprehensive)
+    # mg variations
+    rule('parse', BOTH, r'(?<=\d)\s*rng\b', 'mg'),
+    rule('parse', BOTH, r'(?<=\d)\s*rn\s*g\b', 'mg'),
+    rule('parse', BOTH, r'(?<=\d)\s*rnq\b', 'mg'),
+    rule('parse', BOTH, r'\brng\b', 'mg'),
+    rule('parse', BOTH, r'\bmg\s+(?=\d)', 'mg/'),  # "mg 12" -> "mg/12"
+
+    # mcg variations
+    rule('parse', BOTH, r'(?<=\d)\s*rncg\b', 'mcg'),
+    rule('parse', BOTH, r'(?<=\d)\s*mc\s*g\b', 'mcg'),
+    rule('parse', BOTH, r'\brncg\b', 'mcg'),
+
+    # kg variations (extensive)
+    rule('parse', BOTH, r'(?<=\d)\s*l<g\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*1<g\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*I<g\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*k\(J\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*1\(g\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*k\[J\b', 'kg'),
+    rule('parse', BOTH, r'(?<=\d)\s*kq\b', 'kg'),
+    rule('parse', BOTH, r'\bl<g\b', 'kg'),
+    rule('parse', BOTH, r'\bI<g\b', 'kg'),
+    rule('parse', BOTH, r'\bk\(J\b', 'kg'),
+    rule('parse', BOTH, r'\bk\[J\b', 'kg'),
+    rule('parse', BOTH, r'\bkq\b', 'kg'),
+
+    # ml variations
+    rule('parse', BOTH, r'(?<=\d)\s*rnl\b', 'ml'),
+    rule('parse', BOTH, r'(?<=\d)\s*rn I\b', 'ml'),
+    rule('parse', BOTH, r'\brnl\b', 'ml'),
+    rule('parse', BOTH, r'\bm\s+l\b', 'ml'),
+    rule('parse', BOTH, r'\bmll\b', 'ml'),
+
+    # min/hr/H variations
+    rule('parse', BOTH, r'(?<=\d)\s*rnin\b', 'min'),
+    rule('parse', BOTH, r'\brnin\b', 'min'),
+    rule('parse', BOTH, r'\bllr\b', 'hr'),
+    rule('parse', BOTH, r'\blhr\b', 'hr'),
+    rule('parse', BOTH, r'\b1hr\b', '1hr'),
+    rule('parse', BOTH, r'(?<=\d)\s*/H\b', 'H'),  # "6-12/H" -> "6-12H"
+    rule('parse', BOTH, r'\bti-1\s*/H\b', '6-12H'),  # Common pattern
+    rule('parse', BOTH, r'\b8-l2H\b', '8-12H'),
+
+    # Fix spacing around numbers and units
+    rule('parse', BOTH, r'(\d+)\s+(\.\s*\d+)', r'\1\2'),  # "0 . 5" -> "0.5"
+    rule('parse', BOTH, r'(\d+)\s*\.\s*(\d+)', r'\1.\2'),  # "0 . 5" -> "0.5"
+    rule('parse', BOTH, r'0_\s*1', '0.1'),  # "0_ 1" -> "0.1"
+    rule('parse', BOTH, r'(\d+)\s*_\s*(\d+)', r'\1.\2'),  # "0_ 1" -> "0.1"
+
+    # Common word OCR errors
+    rule('parse', BOTH, r'\bornl\b', 'oral', re.IGNORECASE),
+    rule('parse', BOTH, r'\boml\b', 'oral', re.IGNORECASE),
+    rule('parse', BOTH, r'\borul\b', 'oral', re.IGNORECASE),
+    rule('parse', BOTH, r'\bOrnin\b', '0min'),
+    rule('parse', BOTH, r'\bOmin\b', '0min'),
+    rule('parse', BOTH, r'\bbeforo\b', 'before'),
+    rule('parse', BOTH, r'\btl1on\b', 'then'),
+    rule('parse', BOTH, r'\btl1en\b', 'then'),
+    rule('parse', BOTH, r'\bparacetarno1\b', 'paracetamol', re.IGNORECASE),
+    rule('parse', BOTH, r'\bparacetarnol\b', 'paracetamol', re.IGNORECASE),
+    rule('parse', BOTH, r'\bangioplasly\b', 'angioplasty'),
+    rule('parse', BOTH, r'\bsoltn\b', 'solution'),
+    rule('parse', BOTH, r'\bintratrac:l1eal\b', 'intratracheal'),
+    rule('parse', BOTH, r'\bumoi\b', 'umol'),
+    rule('parse', BOTH, r'\bumolll\b', 'umol/L'),
+    rule('parse', BOTH, r'\burnoi\b', 'umol'),
+    rule('parse', BOTH, r'\brnux\b', 'max'),
+    rule('parse', BOTH, r'\brnax\b', 'max'),
+    rule('parse', BOTH, r'\btub\b', 'tab'),
+    rule('parse', BOTH, r'\brepoat\b', 'repeat'),
+    rule('parse', BOTH, r'\bdni!y\b', 'daily'),
+    rule('parse', BOTH, r'\bdnily\b', 'daily'),
+
+    # IV/IM variations
+    rule('parse', BOTH, r'\bUlV\b', 'IV'),
+    rule('parse', BOTH, r'\bIVl\b', 'IM'),
+    rule('parse', BOTH, r'\blVl\b', 'IM'),
+
+    # Common letter/number confusions in dosages
+    rule('parse', BOTH, r'\b1\s*!\s*i\s*0', '150'),  # "1!i0" -> "150"
+    rule('parse', BOTH, r'\b!\s*i', '5'),  # "!i" -> "5"
+    # Fix exclamation marks and special character confusions FIRST (before other substitutions)
+    # Most ! should be 't', but need to handle special cases
+    rule('parse', BOTH, r'!i', '5i'),  # Temporarily mark "!i" pattern  
+    rule('parse', BOTH, r'!', 't'),  # Convert remaining ! to t
+    rule('parse', BOTH, r'5i', 'ti'),  # Convert back, now it's "ti"
+    rule('parse', BOTH, r'ti-1', '6-1'),  # Fix "ti-1" -> "6-1"
+
+    # Common letter/number confusions in dosages (do early)
+    rule('parse', BOTH, r'\b1\s*0\s*-\s*/\s*0', '10-20'),  # "1 0-/0" or "10-/0" -> "10-20"
+    rule('parse', BOTH, r'\b([12]?\d)-/0', r'\1-20'),  # "X-/0" -> "X-20"  
+    rule('parse', BOTH, r'/0mg', '20mg'),  # "/0mg" -> "20mg"
+    rule('parse', BOTH, r'\b1 OO\s*(?=mg|mcg|ml|kg)', '100'),
+    rule('parse', BOTH, r'\b1 O\s*(?=mg|mcg|ml|kg)', '10'),
+    rule('parse', BOTH, r'\b0\s*\.\s*1\b', '0.1'),
+    rule('parse', BOTH, r'\b0\s*\.\s*2\b', '0.2'),
+    rule('parse', BOTH, r'\b0\s*\.\s*5\b', '0.5'),
+    rule('parse', BOTH, r'\b1\s*\.\s*0\b', '1.0'),
+    rule('parse', BOTH, r'\b2\.\s*5', '2.5'),
+
+    # Time intervals cleanup
+    rule('parse', BOTH, r'\b8-24ft\b', '8-24H'),
+    rule('parse', BOTH, r'\b6-12JI\b', '6-12H'),
+    rule('parse', BOTH, r'\b4wl<\b', '4wk'),
+    rule('parse', BOTH, r'\b2wl<\b', '2wk'),
+    rule('parse', BOTH, r'\b(\d+)wl<\b', r'\1wk'),
+    rule('parse', BOTH, r'\bwl<\b', 'wk'),
+    rule('parse', BOTH, r'\b(\d+)hr\b', r'\1H'),  # Standardize to H
+    rule('parse', BOTH, r'\b21lr\b', '2hr'),
+    rule('parse', BOTH, r'\b241lr\b', '24hr'),
+
+    # Fix "See X" references
+    rule('parse', BOTH, r'\bSee\s+([a-z])', r'See \1'),
+    rule('parse', BOTH, r'\bSec\s+', 'See '),
+    rule('parse', BOTH, r'\bSoo\s+', 'See '),
+    rule('parse', BOTH, r'\bSeu\s+', 'See '),
+
+    # Clean up common garbage patterns
+    rule('parse', BOTH, r'\b[A-Z]{1}\\\\\w+\b', ''),  # Remove patterns like "A\\dtJit"
+    rule('parse', BOTH, r'\\u00b7', '-'),
+    rule('parse', BOTH, r'~', '-'),
+    rule('parse', BOTH, r'--+', '-'),
+
+    # Remove soft hyphens and other invisible characters
+    rule('parse', BOTH, r'[\u00ad\u200b\u200c\u200d]', ''),
+
+    # Remove obvious garbage patterns
+    rule('parse', BOTH, r'\$\d+\.\d+\s+\+\s+po;;lnqc.*?drugd?u?sos\.com', '', re.IGNORECASE),
+    rule('parse', BOTH, r'from\s+oniom.*?drugdosos\.com', '', re.IGNORECASE),
+    rule('parse', BOTH, r'ordors@.*?\.com', ''),
+    rule('parse', BOTH, r'Pane\s+\d+', ''),
+    rule('parse', BOTH, r'turnourlysis:', 'tumour lysis:'),
+
+    # Fix double periods
+    rule('parse', BOTH, r'\.\.+', '.'),
+
+    # Normalize whitespace
+    rule('parse', BOTH, r'\s+', ' '),
+    rule('parse', BOTH, r'\s+\.', '.'),
+    rule('parse', BOTH, r'\.\s+\.', '.'),
+
+    # ----- fix_frank_data.py -----
+    # ===== DRUG NAME FIXES =====
+    # Fix specific drug name OCR errors
+    rule('fix', NAME, r'5n\b', 'tin'),  # "Alitre5noin" → "Alitretinoin"
+    rule('fix', NAME, r'5\b', 't', when='Aloglip'),  # "Aloglip5n" → "Alogliptin"
+    rule('fix', NAME, r'\b5\b', 't', when=('Aloglip', 'Ceft')),
+    rule('fix', NAME, r'Ace!ylcysteine', 'Acetylcysteine'),
+    rule('fix', NAME, r'Acetylcysteinu', 'Acetylcysteine'),
+    rule('fix', NAME, r'\s+\+\s+', ' + '),  # Normalize spacing around +
+    rule('fix', NAME, r'idovudine', 'zidovudine', when='lamivudine'),
+    rule('fix', NAME, r'\s+g\b', 'g'),  # "300m g" → "300mg"
+    rule('fix', NAME, r'(\d+)m\s+g\b', r'\1mg'),  # "300m g" → "300mg"
+    # ===== DOSAGE FIXES =====
+    # Fix common number OCR errors
+    rule('fix', DOSAGE, r'\b1\s*OO\s*(?=mg|mcg|ml)', '100'),  # "1 OO" or "1OO" → "100"
+    rule('fix', DOSAGE, r'\b1\s*O\s*(?=mg|mcg|ml)', '10'),  # "1 O" → "10"
+    rule('fix', DOSAGE, r'\b2\s*O\s*(?=mg|mcg|ml)', '20'),  # "2 O" → "20"
+    rule('fix', DOSAGE, r'\b5\s*O\s*(?=mg|mcg|ml)', '50'),  # "5 O" → "50"
+    rule('fix', DOSAGE, r'1\s*OOrng', '100mg'),  # "1 OOrng" → "100mg"
+    rule('fix', DOSAGE, r'1\s*Orng', '10mg'),  # "1 Orng" → "10mg"
+    rule('fix', DOSAGE, r'(\d+)\s*rng\b', r'\1mg'),  # "100rng" → "100mg"
+    rule('fix', DOSAGE, r'(\d+)\s*rnq\b', r'\1mg'),  # "100rnq" → "100mg"
+    # Fix spacing issues with units
+    rule('fix', DOSAGE, r'(\d+)\s*m\s+g\b', r'\1mg'),  # "300m g" → "300mg"
+    rule('fix', DOSAGE, r'(\d+)m\s+g\b', r'\1mg'),  # "300m g" → "300mg"
+    rule('fix', DOSAGE, r'(\d+)\s*g\s*\.\s*', r'\1g. '),  # "300g ." → "300g. "
+    rule('fix', DOSAGE, r'g\s*\.\s+', 'g. '),  # Normalize "g ." → "g. "
+    # Fix frequency/interval errors
+    rule('fix', DOSAGE, r'6-1H\b', '6-12H'),  # "6-1H" → "6-12H"
+    rule('fix', DOSAGE, r'(\d+)-1H\b', r'\1-12H'),  # "8-1H" → "8-12H"
+    rule('fix', DOSAGE, r'ti-1', '6-1'),  # "ti-1" → "6-1"
+    rule('fix', DOSAGE, r'12\.ti', '12.5'),  # "12.ti" → "12.5"
+    rule('fix', DOSAGE, r'/2S\b', '/2'),  # "/2S" → "/2" (tablet half)
+    rule('fix', DOSAGE, r'(\d+)H\s+oral', r'\1H oral'),  # Normalize spacing
+    rule('fix', DOSAGE, r'8H\s+oral', '8H oral'),
+    rule('fix', DOSAGE, r'12H\s+oral', '12H oral'),
+    # Fix common abbreviations and words
+    rule('fix', DOSAGE, r'\bqv\b', '(qv)'),  # Mark cross-references
+    rule('fix', DOSAGE, r'\btub\b', 'tab'),  # "tub" → "tab"
+    rule('fix', DOSAGE, r'\bornl\b', 'oral', re.IGNORECASE),
+    rule('fix', DOSAGE, r'\boml\b', 'oral', re.IGNORECASE),
+    rule('fix', DOSAGE, r'\borul\b', 'oral', re.IGNORECASE),
+    rule('fix', DOSAGE, r'\btl1en\b', 'then'),
+    rule('fix', DOSAGE, r'\btl1on\b', 'then'),
+    rule('fix', DOSAGE, r'\brnax\b', 'max'),
+    rule('fix', DOSAGE, r'\brnin\b', 'min'),
+    rule('fix', DOSAGE, r'\brnane\b', 'mane'),
+    rule('fix', DOSAGE, r'\bnocle\b', 'nocte'),
+    # Fix "Adult, NOT/kg" patterns
+    rule('fix', DOSAGE, r'Adult,\s*NOT/kg:', 'Adult, NOT/kg:'),
+    rule('fix', DOSAGE, r'NOT\s*/\s*kg', 'NOT/kg'),
+    # Fix decimal points
+    rule('fix', DOSAGE, r'(\d+)\s*\.\s*(\d+)', r'\1.\2'),  # "0 . 5" → "0.5"
+    rule('fix', DOSAGE, r'(\d+)_(\d+)', r'\1.\2'),  # "0_5" → "0.5"
+    # Fix percentage and special characters
+    rule('fix', DOSAGE, r'([)%])\s*\.(\s+[A-Z])', r'\1.\n\2'),  # Separate sentences
+    rule('fix', DOSAGE, r'umoi', 'umol'),
+    rule('fix', DOSAGE, r'umolll', 'umol/L'),
+    rule('fix', DOSAGE, r'urnol', 'umol'),
+    # Fix time patterns
+    rule('fix', DOSAGE, r'\b(\d+)wl\u003c\b', r'\1wk'),  # "4wl<" → "4wk"
+    rule('fix', DOSAGE, r'\bwl\u003c\b', 'wk'),
+    rule('fix', DOSAGE, r'(\d+)\s*hr\b', r'\1H'),  # Standardize to "H"
+    rule('fix', DOSAGE, r'lH\b', 'H'),  # "1H" trailing issues
+    # Fix common word fragments
+    rule('fix', DOSAGE, r'beforo\b', 'before'),
+    rule('fix', DOSAGE, r'paracetarnol', 'paracetamol', re.IGNORECASE),
+    rule('fix', DOSAGE, r'paracetarno1', 'paracetamol', re.IGNORECASE),
+    rule('fix', DOSAGE, r'angioplasly', 'angioplasty'),
+    rule('fix', DOSAGE, r'intratrac:l1eal', 'intratracheal'),
+    rule('fix', DOSAGE, r'narar,r,tclt\.', 'paracetamol'),
+    # Fix spacing and punctuation
+    rule('fix', DOSAGE, r'\s+', ' '),  # Normalize whitespace
+    rule('fix', DOSAGE, r'\s+\.', '.'),  # Remove space before period
+    rule('fix', DOSAGE, r'\.+', '.'),  # Multiple periods → single period
+    rule('fix', DOSAGE, r'\s+,', ','),  # Remove space before comma
+
+
+    # ----- cleanup_frank_data.py -----
+    # DRUG NAME FIXES
+    # Fix specific patterns
+    rule('cleanup', NAME, r'z\.idovudine', 'zidovudine'),
+    rule('cleanup', NAME, r'Abaca vir', 'Abacavir'),
+    rule('cleanup', NAME, r'Abalacept', 'Abatacept'),
+    rule('cleanup', NAME, r'Acernetacin', 'Acemetacin'),
+    rule('cleanup', NAME, r'Acetylcysteinu', 'Acetylcysteine'),
+    rule('cleanup', NAME, r'Acetyl<:ysteine', 'Acetylcysteine'),
+    rule('cleanup', NAME, r'\s+\.', '.'),  # Remove space before period
+    rule('cleanup', NAME, r'\.\s+$', ''),  # Remove trailing period + space
+    rule('cleanup', NAME, r'\s+$', ''),  # Remove trailing space
+    # DOSAGE FIXES
+    # Fix number patterns
+    rule('cleanup', DOSAGE, r'10Omg', '100mg'),
+    rule('cleanup', DOSAGE, r'z\.idovudine', 'zidovudine'),
+    rule('cleanup', DOSAGE, r'rntJ', 'mg'),
+    rule('cleanup', DOSAGE, r'1\\\\biraterone', 'Abiraterone'),
+    # Fix remaining OCR errors
+    rule('cleanup', DOSAGE, r'narar\.r,tclt', 'paracetamol'),
+    rule('cleanup', DOSAGE, r'intratrac:l1eal', 'intratracheal'),
+    rule('cleanup', DOSAGE, r'angioplasly', 'angioplasty'),
+    rule('cleanup', DOSAGE, r'SH\\.', '8H.'),
+    rule('cleanup', DOSAGE, r'oraL', 'oral'),
+    rule('cleanup', DOSAGE, r' \\.\\. ', ' '),  # Remove orphan periods
+    rule('cleanup', DOSAGE, r'\\\\', ''),  # Remove backslashes
+    # Clean up multiple spaces and periods
+    rule('cleanup', DOSAGE, r'\s+', ' '),
+    rule('cleanup', DOSAGE, r'\.\.+', '.'),
+    rule('cleanup', DOSAGE, r'\s+\.', '.'),
+    rule('cleanup', DOSAGE, r'\.\s+\.', '.'),
+
+
+    # ----- cleanup_frank_data_v2.py -----
+    # DRUG NAME FIXES
+    # Fix remaining spacing/OCR errors
+    rule('cleanup_v2', NAME, r'\s+', ' '),  # Multiple spaces
+    rule('cleanup_v2', NAME, r'\.+$', ''),  # Trailing periods
+    rule('cleanup_v2', NAME, r'^\s*\.+\s*', ''),  # Leading periods
+    # DOSAGE FIXES - More aggressive patterns
+    # Fix H patterns (time intervals) - COMPREHENSIVE
+    rule('cleanup_v2', DOSAGE, r'\b121-1\b', '12H'),  # "121-1" → "12H"
+    rule('cleanup_v2', DOSAGE, r'\b81-1\b', '8H'),    # "81-1" → "8H"  
+    rule('cleanup_v2', DOSAGE, r'\b61-1\b', '6H'),    # "61-1" → "6H"
+    rule('cleanup_v2', DOSAGE, r'\b241-1\b', '24H'),  # "241-1" → "24H"
+    rule('cleanup_v2', DOSAGE, r'\b(\d+)1-1\b', r'\1H'),  # Generic "X1-1" → "XH"
+    # Fix other H patterns
+    rule('cleanup_v2', DOSAGE, r'\bBH\b', '8H'),  # "BH" → "8H"
+    rule('cleanup_v2', DOSAGE, r'\b811\b', '8H'),  # "811" → "8H"
+    rule('cleanup_v2', DOSAGE, r'\b12hr\b', '12H'),  # "12hr" → "12H"
+    rule('cleanup_v2', DOSAGE, r'\b24hr\b', '24H'),  # "24hr" → "24H"
+    rule('cleanup_v2', DOSAGE, r'\b(\d+)ft\b', r'\1H'),  # "Xft" → "XH"
+    rule('cleanup_v2', DOSAGE, r'\b(\d+)JI\b', r'\1H'),  # "XJI" → "XH"
+    # Fix "See" patterns
+    rule('cleanup_v2', DOSAGE, r'\bsy\b', 'See', re.IGNORECASE),  # "sy" → "See"
+    rule('cleanup_v2', DOSAGE, r'\bSy\b', 'See'),  # "Sy" → "See"
+    rule('cleanup_v2', DOSAGE, r'\bsee\b', 'See'),  # "see" → "See"
+    # Fix number + unit spacing
+    rule('cleanup_v2', DOSAGE, r'(\d+)\s*rng\b', r'\1mg'),
+    rule('cleanup_v2', DOSAGE, r'(\d+)\s*rnl\b', r'\1ml'),
+    rule('cleanup_v2', DOSAGE, r'(\d+)\s*kfJ\b', r'\1kg'),
+    rule('cleanup_v2', DOSAGE, r'(\d+)\s*l<g\b', r'\1kg'),
+    # Fix common OCR character confusions
+    rule('cleanup_v2', DOSAGE, r'\b1 0\b', '10'),  # "1 0" → "10"
+    rule('cleanup_v2', DOSAGE, r'\b2 0\b', '20'),  # "2 0" → "20"
+    rule('cleanup_v2', DOSAGE, r'\b5 0\b', '50'),  # "5 0" → "50"
+    rule('cleanup_v2', DOSAGE, r'\b1OO\b', '100'),  # "1OO" → "100"
+    rule('cleanup_v2', DOSAGE, r'\b10O\b', '100'),  # "10O" → "100"
+    rule('cleanup_v2', DOSAGE, r'\b1 OO\b', '100'),  # "1 OO" → "100"
+    # Fix decimal patterns
+    rule('cleanup_v2', DOSAGE, r'(\d+)\s+\.\s*(\d+)', r'\1.\2'),  # "1 . 5" → "1.5"
+    rule('cleanup_v2', DOSAGE, r'\.\.+', '.'),  # Multiple periods
+    rule('cleanup_v2', DOSAGE, r'(\d+)\.(\d+)\.(\d+)', r'\1.\2-\3'),  # "0.5.1" → "0.5-1"
+    # Fix "Adult, NOT/kg" spacing
+    rule('cleanup_v2', DOSAGE, r'Adult,\s*NOT\s*/\s*kg', 'Adult, NOT/kg'),
+    # Fix percentage/concentration patterns
+    rule('cleanup_v2', DOSAGE, r'·(\d+)', r'-\1'),  # "·5" → "-5"
+    rule('cleanup_v2', DOSAGE, r'(\d+)~(\d+)', r'\1-\2'),  # "4~8" → "4-8"
+    # Fix remaining word errors
+    rule('cleanup_v2', DOSAGE, r'\boraL\b', 'oral'),
+    rule('cleanup_v2', DOSAGE, r'\boral\s*\.', 'oral.'),
+    rule('cleanup_v2', DOSAGE, r'\bmrJ\b', 'mg'),
+    rule('cleanup_v2', DOSAGE, r'\brn2\b', 'm2'),
+    rule('cleanup_v2', DOSAGE, r'\brnl\b', 'ml'),
+    rule('cleanup_v2', DOSAGE, r'\brncg\b', 'mcg'),
+    rule('cleanup_v2', DOSAGE, r'\b1hr\b', '1H'),
+    rule('cleanup_v2', DOSAGE, r'\b2hr\b', '2H'),
+    # Fix spacing around periods
+    rule('cleanup_v2', DOSAGE, r'\.\s+([a-z])', r'. \1'),  # Ensure single space after period
+    rule('cleanup_v2', DOSAGE, r'\s+\.', '.'),  # Remove space before period
+    # Normalize whitespace
+    rule('cleanup_v2', DOSAGE, r'\s+', ' '),
+
+
+    # ----- cleanup_frank_final.py -----
+    # Apply all H-pattern fixes to BOTH fields
+    # Time interval fixes
+    rule('final', BOTH, r'\b121-1\b', '12H'),
+    rule('final', BOTH, r'\b81-1\b', '8H'),
+    rule('final', BOTH, r'\b61-1\b', '6H'),
+    rule('final', BOTH, r'\b241-1\b', '24H'),
+    rule('final', BOTH, r'\b(\d+)1-1\b', r'\1H'),
+]
+
+
+def compile_phase(phase, field=None):
+    """Compile the rules of one phase (optionally only those for one field)"""
+    return RuleSet([
+        Rule(r.pattern, r.repl, r.flags, r.when, label=f"{phase}/{field or 'all'}")
+        for r in RULES
+        if r.phase == phase and (field is None or field in r.fields)
+    ])
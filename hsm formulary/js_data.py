@@ -0,0 +1,96 @@
+"""
+Read the data literals out of the generated src/*.js modules.
+
+dilutionData.js and counselingData.js hold plain object/array literals
+(`export const DILUTION_DATA = [...]`) written with bare keys and trailing
+commas. js_literal_to_json() rewrites such a literal into JSON so Python
+build steps can load it without a JavaScript runtime.
+"""
+import json
+import re
+
+IDENT = re.compile(r'[A-Za-z_$][\w$]*')
+KEYWORDS = {'true', 'false', 'null'}
+
+
+def js_literal_to_json(src):
+    """Convert a JS object/array literal (bare keys, trailing commas, comments) to JSON text"""
+    out = []
+    i = 0
+    n = len(src)
+    while i < n:
+        c = src[i]
+        if c in '"\'':
+            # Copy a string, re-quoting single-quoted ones
+            j = i + 1
+            chars = []
+            while src[j] != c:
+                if src[j] == '\\':
+                    chars.append(src[j:j + 2])
+                    j += 2
+                    continue
+                chars.append('\\"' if src[j] == '"' else src[j])
+                j += 1
+            text = ''.join(chars)
+            if c == "'":
+                text = text.replace("\\'", "'")
+            out.append('"' + text + '"')
+            i = j + 1
+        elif src.startswith('//', i):
+            i = src.find('\n', i)
+            i = n if i == -1 else i
+        elif src.startswith('/*', i):
+            i = src.index('*/', i) + 2
+        elif c == ',':
+            # Drop trailing commas before a closing bracket
+            j = i + 1
+            while j < n and src[j].isspace():
+                j += 1
+            if j < n and src[j] not in ']}':
+                out.append(',')
+            i += 1
+        else:
+            ident = IDENT.match(src, i)
+            if ident and ident.group(0) not in KEYWORDS:
+                # A bare key: quote it
+                out.append('"' + ident.group(0) + '"')
+                i = ident.end()
+            elif ident:
+                out.append(ident.group(0))
+                i = ident.end()
+            else:
+                out.append(c)
+                i += 1
+    return ''.join(out)
+
+
+def _literal_end(src, start):
+    """Index just past the bracketed literal starting at src[start]"""
+    depth = 0
+    i = start
+    while i < len(src):
+        c = src[i]
+        if c in '"\'':
+            i += 1
+            while src[i] != c:
+                i += 2 if src[i] == '\\' else 1
+        elif c in '[{':
+            depth += 1
+        elif c in ']}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError("unterminated literal")
+
+
+def load_js_export(path, name):
+    """Parse `export const <name> = <literal>;` from a JS module"""
+    with open(path, 'r', encoding='utf-8') as f:
+        src = f.read()
+    match = re.search(rf'export\s+const\s+{re.escape(name)}\s*=\s*', src)
+    if match is None:
+        raise KeyError(f"{name} not exported by {path}")
+    end = _literal_end(src, match.end())
+    # strict=False: OCR text can carry raw control characters inside strings
+    return json.loads(js_literal_to_json(src[match.end():end]), strict=False)
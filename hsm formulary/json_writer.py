@@ -0,0 +1,234 @@
+"""
+Incremental JSON writers for the generator scripts.
+
+Records are serialised one at a time as they arrive, so a converter never has
+to hold its whole output in memory. write_json_array() produces exactly what
+json.dump(records, f, indent=indent) would.
+
+write_shards() is the compact build profile: minified JSON split into
+per-letter or per-chapter shards under public/data/<dataset>/ plus a small
+manifest.json, so the app can lazy-load only the shard it needs.
+
+write_columnar() is the columnar profile: one array per field instead of
+one object per record, with repetitive fields (categories, "Not specified",
+"Check guidelines", form lists) dictionary-encoded as small integer codes.
+decode_columnar() here and decodeColumnar() in src/columnar.js turn it back
+into the exact records.
+"""
+import json
+import os
+import re
+
+# Where compact builds go; Vite serves public/ as-is
+COMPACT_ROOT = 'public/data'
+
+COLUMNAR_FORMAT = 'columnar'
+COLUMNAR_VERSION = 1
+
+
+def write_json_array(records, path, indent=None, ensure_ascii=False):
+    """Stream records into a JSON array file; returns the record count"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        if indent is None:
+            opener, separator, closer = '[', ', ', ']'
+        else:
+            pad = ' ' * indent
+            opener, separator, closer = '[\n' + pad, ',\n' + pad, '\n]'
+
+        for record in records:
+            text = json.dumps(record, indent=indent, ensure_ascii=ensure_ascii)
+            if indent is not None:
+                text = text.replace('\n', '\n' + pad)
+            f.write(separator if count else opener)
+            f.write(text)
+            count += 1
+        f.write(closer if count else '[]')
+    return count
+
+
+def write_json_lines(records, path, ensure_ascii=False):
+    """Stream records into a JSON Lines file (one compact object per line)"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=ensure_ascii, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def by_letter(field):
+    """Shard key: first letter of a field, '_' for anything else"""
+    def key(record):
+        first = record[field][:1].upper()
+        return first if 'A' <= first <= 'Z' else '_'
+    return key
+
+
+def by_chapter(field):
+    """Shard key: first line of a field, e.g. '1.0 ALIMENTARY SYSTEM'"""
+    def key(record):
+        return record[field].split('\n')[0].strip() or 'Others'
+    return key
+
+
+def shard_name(key):
+    """File-safe shard name: '1.0 ALIMENTARY SYSTEM' -> '1-0-alimentary-system'"""
+    return re.sub(r'[^a-z0-9_]+', '-', key.lower()).strip('-') or '_'
+
+
+def write_shards(records, dataset, shard_key, root=COMPACT_ROOT):
+    """
+    Stream records into minified per-shard JSON arrays plus a manifest.
+
+    Each shard file is open only while records are arriving, so memory stays
+    at one record. Returns the manifest dict.
+    """
+    out_dir = os.path.join(root, dataset)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        if name.endswith('.json'):
+            os.remove(os.path.join(out_dir, name))
+
+    files = {}
+    shards = {}
+    try:
+        for record in records:
+            key = shard_key(record)
+            shard = shards.get(key)
+            if shard is None:
+                name = shard_name(key)
+                while f"{name}.json" in (s['file'] for s in shards.values()):
+                    name += '_'
+                shard = shards[key] = {'key': key, 'file': f"{name}.json", 'count': 0}
+                files[key] = open(os.path.join(out_dir, shard['file']), 'w', encoding='utf-8')
+                files[key].write('[')
+            elif shard['count']:
+                files[key].write(',')
+            files[key].write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            shard['count'] += 1
+    finally:
+        for f in files.values():
+            f.write(']')
+            f.close()
+
+    for shard in shards.values():
+        shard['bytes'] = os.path.getsize(os.path.join(out_dir, shard['file']))
+    manifest = {
+        'dataset': dataset,
+        'total': sum(s['count'] for s in shards.values()),
+        'shards': list(shards.values()),
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"✓ {manifest['total']} records in {len(shards)} shards under {out_dir}")
+    return manifest
+
+
+def columnar_path(dataset, root=COMPACT_ROOT):
+    return os.path.join(root, f"{dataset}.columnar.json")
+
+
+def _encode_column(name, values):
+    """
+    A column as plain values or as a dictionary plus codes, whichever is
+    smaller minified. Dictionary entries are ordered by frequency, so the
+    common values get the short codes.
+    """
+    texts = [json.dumps(v, ensure_ascii=False, separators=(',', ':')) for v in values]
+    counts = {}
+    for text, value in zip(texts, values):
+        entry = counts.get(text)
+        if entry is None:
+            counts[text] = [1, value]
+        else:
+            entry[0] += 1
+    ranked = sorted(counts, key=lambda t: -counts[t][0])
+    codes = {text: code for code, text in enumerate(ranked)}
+
+    plain = sum(len(t) + 1 for t in texts)
+    encoded = sum(len(t) + 1 for t in ranked) + sum(len(str(codes[t])) + 1 for t in texts)
+    if encoded < plain:
+        return {'name': name, 'dict': [counts[t][1] for t in ranked], 'codes': [codes[t] for t in texts]}
+    return {'name': name, 'values': values}
+
+
+def to_columnar(records):
+    """
+    Records as {format, version, count, columns[, absent]}. Columns follow
+    the order fields first appear in, which is also the key order of every
+    decoded record; `absent` lists, per field, the records that lack it
+    (they hold a null placeholder in the column).
+    """
+    fields = {}
+    absent = {}
+    count = 0
+    for record in records:
+        for field in record:
+            if field not in fields:
+                fields[field] = [None] * count
+                absent[field] = list(range(count))
+        for field, column in fields.items():
+            if field in record:
+                column.append(record[field])
+            else:
+                column.append(None)
+                absent[field].append(count)
+        count += 1
+
+    data = {
+        'format': COLUMNAR_FORMAT,
+        'version': COLUMNAR_VERSION,
+        'count': count,
+        'columns': [_encode_column(name, values) for name, values in fields.items()],
+    }
+    absent = {field: positions for field, positions in absent.items() if positions}
+    if absent:
+        data['absent'] = absent
+    return data
+
+
+def write_columnar(records, path):
+    """
+    Write records in the columnar profile (minified, via a temp file
+    swapped in when complete); returns the record count. Unlike the other
+    writers this holds every column in memory.
+    """
+    data = to_columnar(records)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return data['count']
+
+
+def decode_columnar(data):
+    """
+    The records of a columnar document. Dictionary-encoded lists and dicts
+    are shared between the records that had equal values.
+    """
+    if data.get('format') != COLUMNAR_FORMAT or data.get('version') != COLUMNAR_VERSION:
+        raise ValueError(f"not a columnar v{COLUMNAR_VERSION} document")
+    count = data['count']
+    absent = data.get('absent', {})
+    records = [{} for _ in range(count)]
+    for column in data['columns']:
+        name = column['name']
+        if 'dict' in column:
+            lookup = column['dict']
+            values = [lookup[code] for code in column['codes']]
+        else:
+            values = column['values']
+        skip = set(absent.get(name, ()))
+        for position, (record, value) in enumerate(zip(records, values)):
+            if position not in skip:
+                record[name] = value
+    return records
+
+
+def read_columnar(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return decode_columnar(json.load(f))
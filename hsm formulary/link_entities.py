@@ -0,0 +1,460 @@
+"""
+Cross-source drug entity linking.
+
+The same molecule is spelled differently in every source:
+
+    formulary   "Amoxicillin 500mg Capsule", brand "Amoxil"
+    frankShann  "Amoxycillin"
+    abx         "Augmentin (Amoxycillin 1g/Clavulanate 200mg)"
+    dilution    "Amoxicillin & Clavulanate"
+    counseling  "Acyclovir, Topical"
+
+Each record name is reduced to its ingredients: strength, dosage form,
+salt and bracketed text are dropped, combinations split on + / & "and",
+and each ingredient folded to a spelling key (y->i, ph->f, doubled letters
+collapsed), so "Amoxycillin" and "Amoxicillin" share a key outright.
+
+The remaining spelling differences and OCR damage are matched fuzzily by
+trigram Dice score, but only between keys in the same block (same first
+three letters, or same last four), never all pairs. Keys whose single-letter
+group or type words differ ("hepatitis a" / "hepatitis b", "meningococcus
+gp a" / "gp b") are never matched. Keys that match are
+merged (union-find) into one entity; a formulary brand name is an alias of
+its generic's entity. Combinations are entities of their own, keyed by
+their sorted ingredient entities.
+
+Writes public/data/crossref.json: entities with every source's record ids,
+and an alias table from spelling key to entity.
+
+    python link_entities.py build
+    python link_entities.py lookup amoxycillin
+    python link_entities.py check      # the REGRESSIONS pairs below
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from itertools import combinations
+
+from build_report import record_count, section
+from create_complete_dataset import COMPLETE_DILUTION_DATA
+from json_writer import COMPACT_ROOT
+from search_index import normalize
+from trigram_index import SKIP_NAMES, trigrams
+
+CROSSREF_PATH = os.path.join(COMPACT_ROOT, 'crossref.json')
+
+
+def _load_json(path, key=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data[key] if key else data
+
+
+def load_counseling():
+    if os.path.exists('counseling_data_extracted.json'):
+        return _load_json('counseling_data_extracted.json')
+    from js_data import load_js_export
+    return load_js_export('src/counselingData.js', 'COUNSELING_MEDICATIONS')
+
+
+# dataset -> (loader, name field, brand field); earlier datasets name the entity
+SOURCES = {
+    'formulary': (lambda: _load_json('src/formularyData.json'), 'genericName', 'brandName'),
+    'dilution': (lambda: COMPLETE_DILUTION_DATA, 'genericName', 'brandName'),
+    'abx': (lambda: _load_json('src/abxData.json', 'antibiotics'), 'name', None),
+    'counseling': (load_counseling, 'name', None),
+    'frankShann': (lambda: _load_json('src/frankShannData.json'), 'name', None),
+}
+
+# Words that end the molecule part of a name
+FORMS = {
+    'tablet', 'tablets', 'tab', 'capsule', 'capsules', 'cap', 'injection', 'inj', 'infusion',
+    'syrup', 'suspension', 'susp', 'mixture', 'solution', 'soln', 'elixir', 'drops', 'drop',
+    'cream', 'ointment', 'gel', 'lotion', 'spray', 'inhaler', 'nebuliser', 'nebulizer',
+    'suppository', 'suppositories', 'patch', 'powder', 'granules', 'sachet', 'lozenge',
+    'vial', 'ampoule', 'respules', 'turbuhaler', 'accuhaler', 'evohaler', 'mdi', 'pessary',
+    'enema', 'paste', 'shampoo', 'emulsion', 'concentrate', 'film', 'coated', 'delayed',
+    'extended', 'modified', 'sustained', 'controlled', 'prolonged', 'release', 'retard',
+    'chewable', 'dispersible', 'effervescent', 'oral', 'topical', 'eye', 'ear', 'nasal',
+    'intravenous', 'iv', 'im', 'sc', 'for', 'in', 'with', 'w', 'bp', 'usp', 'cr', 'mr', 'sr',
+    'xr', 'xl', 'la',
+}
+# Salt and ester qualifiers, dropped unless they are the drug ("Sodium Bicarbonate")
+SALTS = {
+    'hcl', 'hci', 'hydrochloride', 'hydrobromide', 'dihydrochloride', 'sulphate', 'sulfate',
+    'phosphate', 'acetate', 'citrate', 'maleate', 'mesylate', 'mesilate', 'besylate',
+    'besilate', 'tartrate', 'bitartrate', 'fumarate', 'succinate', 'hemifumarate',
+    'dihydrate', 'monohydrate', 'trihydrate', 'anhydrous', 'lactobionate', 'stearate',
+    'propionate', 'dipropionate', 'valerate', 'butyrate', 'furoate', 'pamoate', 'embonate',
+    'hyclate', 'bromide', 'nitrate', 'disodium', 'trometamol', 'sodium', 'potassium',
+}
+# Mineral cations that head a name are the drug itself
+MINERALS = {'sodium', 'potassium', 'calcium', 'magnesium', 'zinc', 'ferrous', 'iron',
+            'aluminium', 'aluminum', 'lithium', 'ammonium'}
+
+# Names that differ by a short affix yet are different drugs (names differing
+# by a group or type letter are told apart by type_tokens())
+DISTINCT = [
+    ('prednisolone', 'prednisone'), ('hydroxyprogesterone', 'medroxyprogesterone'),
+    ('calcium polystyrene sulfonate', 'sodium polystyrene sulfonate'),
+    ('sodium citrate', 'sodium citrotartrate'), ('sodium biphosphate', 'sodium phosphate'),
+    ('interferon alfacon', 'interferon alfa-n'),
+]
+# Affixes that do not change the drug: plurals and stereo prefixes
+SAME_SUFFIXES = {'s', 'e'}
+SAME_PREFIXES = {'l', 'd', 'dl'}
+
+# "Augmentin (Amoxycillin 1g/Clavulanate 200mg)": a brand naming its combination
+BRAND_COMBINATION = re.compile(r'^\s*([a-z]+)\s*\(([^)]*\d[^)]*[/+&][^)]*)\)')
+BRACKETED = re.compile(r'\([^)]*\)?|\[[^\]]*\]?')
+COMBINATION = re.compile(r'\s*(?:\+|/|&|\band\b|\bwith\b)\s*')
+WORD = re.compile(r'[a-z][a-z\-]*|\d[\d.,]*')
+# A serogroup, type or vitamin letter: "gp a", "type b", "vitamin k", "w135"
+GROUP_TOKEN = re.compile(r'^(?:[a-z]|[a-z]?\d+[a-z]?)$')
+
+# Fuzzy link threshold (trigram Dice) and the blocking key lengths
+MIN_SCORE = 0.8
+PREFIX_BLOCK = 3
+SUFFIX_BLOCK = 4
+
+
+def molecule(text):
+    """The molecule words of one ingredient: no strength, form or salt"""
+    words = []
+    for word in WORD.findall(text):
+        if word[0].isdigit() or word in FORMS:
+            break
+        words.append(word.strip('-'))
+    if words and words[0] not in MINERALS:
+        kept = [w for w in words if w not in SALTS]
+        words = kept or words
+    return ' '.join(w for w in words if w)
+
+
+def spelling_key(text):
+    """Fold away spelling variants: y->i, ph->f, ae/oe->e, doubled letters"""
+    key = re.sub(r'[^a-z]', '', text)
+    key = key.replace('ph', 'f').replace('ae', 'e').replace('oe', 'e').replace('y', 'i')
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+def _strip(name):
+    return BRACKETED.sub(' ', normalize(name)).split(',')[0]
+
+
+def _ingredients(text):
+    """(spelling key, molecule) per distinct ingredient, leaving out unit
+    and strength fragments ("ml" of "10mg/ml") and non-drug names"""
+    seen = set()
+    for key, words in _molecules(text):
+        if len(key) >= 3 and key not in SKIP_NAMES and key not in seen:
+            seen.add(key)
+            yield key, words
+
+
+def display_name(name):
+    return ' + '.join(words for _, words in _ingredients(_strip(name)))
+
+
+def _molecules(text):
+    """(spelling key, molecule) per ingredient of a name"""
+    for part in COMBINATION.split(text):
+        words = molecule(part)
+        yield spelling_key(words), words
+
+
+def _keys(text):
+    return [key for key, _ in _ingredients(text)]
+
+
+def brand_combination(name):
+    """(brand key, ingredient keys) for "Brand (A 1g/B 200mg)" names, else None"""
+    m = BRAND_COMBINATION.match(normalize(name))
+    if m:
+        keys = _keys(m.group(2))
+        if len(keys) > 1:
+            return spelling_key(m.group(1)), keys
+    return None
+
+
+def ingredients(name):
+    """Spelling keys of the ingredients of a record name"""
+    branded = brand_combination(name)
+    if branded:
+        return branded[1]
+    return _keys(_strip(name))
+
+
+def type_tokens(name):
+    """
+    Spelling key -> the group/type words of that ingredient of a record
+    name: "Hepatitis B vaccine" -> {'hepatitisbvacine': {'b'}}. A leading
+    stereo prefix ("d penicillamine") is not a type.
+    """
+    branded = BRAND_COMBINATION.match(normalize(name)) if brand_combination(name) else None
+    text = branded.group(2) if branded else _strip(name)
+    types = {}
+    for key, words in _molecules(text):
+        words = words.split()
+        types.setdefault(key, set()).update(
+            w for i, w in enumerate(words) if GROUP_TOKEN.match(w) and not (i == 0 and w in SAME_PREFIXES))
+    return types
+
+
+DISTINCT_KEYS = {frozenset(_keys(a) + _keys(b)) for a, b in DISTINCT}
+
+
+def same_drug(a, b, types=None):
+    """
+    Veto fuzzy matches that are really a different drug. types: spelling
+    key -> its group/type words (type_tokens()); keys whose types differ
+    are different vaccines, toxins or vitamins.
+    """
+    if frozenset((a, b)) in DISTINCT_KEYS:
+        return False
+    if types is not None and types.get(a, set()) != types.get(b, set()):
+        return False
+    short, long = sorted((a, b), key=len)
+    if short in long:
+        # vitamin / vitaminc, enalapril / enalaprilat, pegfilgrastim / lipegfilgrastim
+        if long.startswith(short):
+            return long[len(short):] in SAME_SUFFIXES
+        if long.endswith(short):
+            return long[:-len(short)] in SAME_PREFIXES
+        return False
+    return True
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent
+        parent.setdefault(x, x)
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # Keep the shorter (usually cleaner) key as the root
+            if (len(b), b) < (len(a), a):
+                a, b = b, a
+            self.parent[b] = a
+
+
+def blocks(keys):
+    """Candidate groups: keys sharing a prefix or a suffix"""
+    groups = {}
+    for key in keys:
+        groups.setdefault(('^', key[:PREFIX_BLOCK]), []).append(key)
+        groups.setdefault(('$', key[-SUFFIX_BLOCK:]), []).append(key)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+def fuzzy_pairs(keys, min_score=MIN_SCORE, blocked=True, types=None):
+    """
+    Key pairs whose trigram Dice score reaches min_score, and the number of
+    comparisons made. blocked=False compares all pairs (for benchmarking).
+    types: passed on to same_drug()
+    """
+    grams = {k: trigrams(k) for k in keys}
+    seen = set()
+    pairs = []
+    compared = 0
+    groups = blocks(keys) if blocked else [sorted(keys)]
+    for group in groups:
+        for a, b in combinations(group, 2):
+            if blocked:
+                # A pair sharing both a prefix and a suffix is compared once
+                if (a, b) in seen:
+                    continue
+                seen.add((a, b))
+            compared += 1
+            ga, gb = grams[a], grams[b]
+            if 2 * len(ga & gb) / (len(ga) + len(gb)) >= min_score and same_drug(a, b, types):
+                pairs.append((a, b))
+    return pairs, compared
+
+
+def link(sources=SOURCES, blocked=True):
+    """Build the cross-reference table from every source"""
+    # (dataset, id, name, ingredient keys) per record
+    mentions = []
+    # brand key -> Counter of the ingredient keys it was seen naming
+    brand_votes = {}
+    generic_keys = set()
+    types = {}
+    for dataset, (load, name_field, brand_field) in sources.items():
+        for record in load():
+            name = record.get(name_field)
+            keys = ingredients(name) if name else []
+            if not keys:
+                continue
+            mentions.append((dataset, record['id'], name, keys))
+            for key, tokens in type_tokens(name).items():
+                types.setdefault(key, set()).update(tokens)
+            branded = brand_combination(name)
+            brands = [branded[0]] if branded else []
+            if brand_field:
+                generic_keys.update(keys)
+                brands += _keys(_strip(record.get(brand_field) or ''))[:1]
+            for brand in brands:
+                if len(brand) >= 4:
+                    brand_votes.setdefault(brand, Counter())[tuple(keys)] += 1
+
+    singles = {k for _, _, _, keys in mentions for k in keys}
+    uf = UnionFind()
+    for key in singles:
+        uf.find(key)
+    pairs, compared = fuzzy_pairs(singles, blocked=blocked, types=types)
+    for a, b in pairs:
+        uf.union(a, b)
+
+    # A brand stands for the generic it most often names ("Augmentin" ->
+    # amoxicillin+clavulanate), unless it is itself a generic name
+    brands = {brand: list(votes.most_common(1)[0][0]) for brand, votes in brand_votes.items()
+              if brand not in generic_keys}
+
+    def entity_key(keys):
+        expanded = [g for k in keys for g in brands.get(k, [k])]
+        return '+'.join(sorted({uf.find(k) for k in expanded}))
+
+    entities = {}
+    for dataset, record_id, name, keys in mentions:
+        key = entity_key(keys)
+        entity = entities.setdefault(key, {'id': key, 'name': None, 'names': Counter(), 'records': {}})
+        entity['names'][(dataset, display_name(name))] += 1
+        ids = entity['records'].setdefault(dataset, [])
+        if record_id not in ids:
+            ids.append(record_id)
+
+    order = list(sources)
+    for entity in entities.values():
+        (dataset, name), _ = min(entity.pop('names').items(),
+                                 key=lambda item: (order.index(item[0][0]), -item[1], len(item[0][1])))
+        entity['name'] = name.title()
+        if '+' in entity['id']:
+            entity['components'] = entity['id'].split('+')
+
+    # Spelling key (or brand) -> entity id
+    aliases = {key: uf.find(key) for key in sorted(singles)}
+    for brand in sorted(brands):
+        aliases[brand] = entity_key([brand])
+
+    table = {
+        'entities': sorted(entities.values(), key=lambda e: e['id']),
+        'aliases': aliases,
+    }
+    return table, {'mentions': len(mentions), 'keys': len(singles), 'compared': compared,
+                   'fuzzyLinks': len(pairs)}
+
+
+# (name, name, should link): pairs fuzzy matching once merged wrongly
+REGRESSIONS = [
+    ("Meningococcus gp A, C, W135, Y conjugate vaccines", "Meningococcus gp B, conjugate vaccine (Bexsero)", False),
+    ("Meningococcus gp A, C, W135, Y conjugate vaccines", "Meningococcus gp B, conjugate vaccine (Trumenba)", False),
+    ("Hepatitis A", "Hepatitis B", False),
+    ("Hepatitis A vaccine", "Hepatitis B vaccine", False),
+    ("Botulinum toxin type A", "Botulinum toxin type B", False),
+    ("Vitamin E", "Vitamin", False),
+    ("Hepatitis B immunoglobulin", "Hepatitis B immune globulin", True),
+    ("Abaca vir", "Abacavir", True),
+]
+
+# (record name, entity display name)
+DISPLAY_NAMES = [
+    ("Vitamin K 10mg/ml", "vitamin k"),
+    ("Insulin 100u/ml", "insulin"),
+    ("Amoxicillin + clavulanate", "amoxicillin + clavulanate"),
+]
+
+
+def fuzzy_linked(name_a, name_b, min_score=MIN_SCORE):
+    """Whether link() would merge the first ingredients of two names"""
+    a, b = ingredients(name_a)[0], ingredients(name_b)[0]
+    if a == b:
+        return True
+    types = {**type_tokens(name_a), **type_tokens(name_b)}
+    ga, gb = trigrams(a), trigrams(b)
+    return 2 * len(ga & gb) / (len(ga) + len(gb)) >= min_score and same_drug(a, b, types)
+
+
+def check_regressions():
+    """Run REGRESSIONS and DISPLAY_NAMES; returns the failures as messages"""
+    failures = [f"{a!r} / {b!r}: {'not ' if expected else ''}linked"
+                for a, b, expected in REGRESSIONS if fuzzy_linked(a, b) != expected]
+    failures += [f"{name!r}: displayed as {display_name(name)!r}, expected {expected!r}"
+                 for name, expected in DISPLAY_NAMES if display_name(name) != expected]
+    return failures
+
+
+def write_crossref(table, path=CROSSREF_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_crossref(path=CROSSREF_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def lookup(table, name):
+    """Every source's entry for a drug name (or None)"""
+    by_id = {e['id']: e for e in table['entities']}
+    keys = ingredients(name)
+    if not keys:
+        return None
+    # A brand alias may stand for a whole combination
+    roots = sorted({root for k in keys for root in table['aliases'].get(k, k).split('+')})
+    return by_id.get('+'.join(roots))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link drug records across every dataset")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help=f"link the generated datasets into {CROSSREF_PATH}")
+    find = sub.add_parser('lookup', help="every source's records for a drug")
+    find.add_argument('name')
+    sub.add_parser('check', help="run the regression pairs")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        with section('link'):
+            table, stats = link()
+        elapsed = time.perf_counter() - start
+        with section('write_json'):
+            write_crossref(table)
+        record_count('records', stats['mentions'])
+        record_count('comparisons', stats['compared'])
+        n = stats['keys']
+        linked = sum(1 for e in table['entities'] if len(e['records']) > 1)
+        print(f"✓ {stats['mentions']} records -> {len(table['entities'])} entities "
+              f"({linked} in more than one source) in {elapsed:.2f}s")
+        print(f"✓ {stats['compared']:,} fuzzy comparisons instead of {n * (n - 1) // 2:,} "
+              f"({stats['fuzzyLinks']} links) -> {CROSSREF_PATH}")
+    elif args.command == 'check':
+        failures = check_regressions()
+        for failure in failures:
+            print(f"✗ {failure}")
+        if failures:
+            parser.exit(1, f"✗ {len(failures)} of {len(REGRESSIONS) + len(DISPLAY_NAMES)} regression cases failed\n")
+        print(f"✓ {len(REGRESSIONS)} regression pairs and {len(DISPLAY_NAMES)} display names pass")
+    else:
+        entity = lookup(load_crossref(), args.name)
+        if entity is None:
+            print(f"No entity for {args.name!r}")
+        else:
+            print(f"{entity['name']} ({entity['id']})")
+            for dataset, ids in entity['records'].items():
+                print(f"  {dataset:<11} {', '.join(ids)}")
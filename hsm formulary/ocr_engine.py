@@ -0,0 +1,378 @@
+"""
+Compiled OCR correction engine.
+
+A correction table is an ordered list of (pattern, replacement[, flags])
+rules that used to be applied as a cascade of re.sub() calls. compile_rules()
+turns the table into as few passes as possible while giving exactly the same
+result as the cascade:
+
+  * runs of consecutive whole-word literal rules (r'\\brng\\b' -> 'mg') are
+    merged into one alternation pass with a dict lookup, as long as no rule's
+    replacement produces a word that a later rule in the run would rewrite;
+  * every other rule is a precompiled regex pass guarded by a literal that any
+    match must contain (e.g. 'drugdoses' for r'drugdoses\\.com'), so the pass is
+    skipped with a cheap substring test when it cannot match.
+
+A rule may also carry a `when` guard: a substring (or tuple of substrings) the
+text must contain for the rule to run, e.g. when='Aloglip'. Every rule counts
+its substitutions in `hits`, so dead rules show up in reports.
+
+For finer detail, attach a RuleProfile (opt-in, e.g. OCR_PROFILE=1) to record
+per-rule invocations, matches, characters changed and wall time.
+"""
+import json
+import os
+import re
+import time
+
+# The literal prefilter reads the regex parse tree, which the re module only
+# exposes privately (re._parser from 3.11, sre_parse before). Without either,
+# every pass simply runs unguarded.
+try:
+    import re._constants as sre_constants
+    import re._parser as sre_parse
+except ImportError:
+    try:
+        import sre_constants
+        import sre_parse
+    except ImportError:
+        sre_constants = sre_parse = None
+
+WORD_RULE = re.compile(r'\\b(\w+)\\b')
+WORD_TOKEN = re.compile(r'\w+')
+
+
+class Rule:
+    """One ordered substitution from a correction table"""
+
+    def __init__(self, pattern, repl, flags=0, when=None, label=None):
+        self.pattern = pattern
+        self.repl = repl
+        self.flags = flags
+        self.when = (when,) if isinstance(when, str) else when
+        self.regex = re.compile(pattern, flags)
+        self.required = required_literal(pattern, flags)
+        self.hits = 0
+        # Where the rule came from (e.g. "fix/name"), for reports
+        self.label = label
+
+        word = WORD_RULE.fullmatch(pattern)
+        if word and flags in (0, re.IGNORECASE) and '\\' not in repl and not self.when:
+            self.word = word.group(1)
+        else:
+            self.word = None
+
+    @property
+    def ignorecase(self):
+        return bool(self.flags & re.IGNORECASE)
+
+    def __repr__(self):
+        return f"Rule({self.pattern!r}, {self.repl!r})"
+
+
+def _literal_runs(items):
+    """Collect runs of consecutive literal characters every match must contain"""
+    runs = []
+    current = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+            continue
+        if current:
+            runs.append(''.join(current))
+            current = []
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, _, body = av
+            if low >= 1 and len(body) == 1 and body[0][0] is sre_constants.LITERAL:
+                runs.append(chr(body[0][1]) * low)
+        elif op is sre_constants.SUBPATTERN:
+            runs.extend(_literal_runs(av[-1]))
+    if current:
+        runs.append(''.join(current))
+    return runs
+
+
+def required_literal(pattern, flags=0):
+    """
+    Longest literal substring that any match of the pattern must contain,
+    or None when there is none or the parse tree is unavailable
+    """
+    if sre_parse is None:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    runs = _literal_runs(list(parsed))
+    if not runs:
+        return None
+    return max(runs, key=len)
+
+
+class WordPass:
+    """Several whole-word literal rules applied in a single scan"""
+
+    def __init__(self, rules, first_index):
+        self.rules = rules
+        self.first_index = first_index
+        self.exact = {}
+        self.folded = {}
+        for offset, rule in enumerate(rules):
+            table = self.folded if rule.ignorecase else self.exact
+            key = rule.word.lower() if rule.ignorecase else rule.word
+            table.setdefault(key, offset)
+        # The dicts fold with str.lower(), which agrees with re's IGNORECASE
+        # for ASCII only (re also folds e.g. 'ſ' to 's')
+        self.ascii = all(rule.word.isascii() for rule in rules)
+
+        alternatives = []
+        for rule in sorted(rules, key=lambda r: -len(r.word)):
+            word = re.escape(rule.word)
+            alternatives.append(f"(?i:{word})" if rule.ignorecase else word)
+        self.regex = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b')
+
+    def lookup(self, word):
+        """Index (within this pass) of the first rule that rewrites `word`"""
+        if not (self.ascii and word.isascii()):
+            # Match each rule's own regex, in table order, as the cascade would
+            for offset, rule in enumerate(self.rules):
+                if rule.regex.fullmatch(word):
+                    return offset
+            return None
+        hit = self.exact.get(word)
+        folded = self.folded.get(word.lower()) if self.folded else None
+        if folded is not None and (hit is None or folded < hit):
+            hit = folded
+        return hit
+
+    def apply(self, text):
+        def replace(match):
+            rule = self.rules[self.lookup(match.group(0))]
+            rule.hits += 1
+            return rule.repl
+        return self.regex.sub(replace, text)
+
+    def apply_profiled(self, text, profile):
+        def replace(match):
+            rule = self.rules[self.lookup(match.group(0))]
+            rule.hits += 1
+            profile.record_match(rule, match.group(0), rule.repl)
+            return rule.repl
+
+        start = time.perf_counter()
+        text = self.regex.sub(replace, text)
+        # One scan serves every rule in the pass; split its time evenly
+        share = (time.perf_counter() - start) / len(self.rules)
+        for rule in self.rules:
+            profile.record_call(rule, share, scanned=True)
+        return text
+
+
+class RegexPass:
+    """A single precompiled rule with a literal prefilter"""
+
+    def __init__(self, rule, index):
+        self.rule = rule
+        self.index = index
+        self.required = rule.required
+        # Case-insensitive prefilter is only exact for ASCII text
+        self.folded = rule.ignorecase
+        if self.required and self.folded:
+            self.required = self.required.lower()
+
+    def can_skip(self, text):
+        """True when the guard or literal prefilter rules out any match"""
+        rule = self.rule
+        if rule.when and not any(w in text for w in rule.when):
+            return True
+        required = self.required
+        if required:
+            if self.folded:
+                return text.isascii() and required not in text.lower()
+            return required not in text
+        return False
+
+    def apply(self, text):
+        if self.can_skip(text):
+            return text
+        text, count = self.rule.regex.subn(self.rule.repl, text)
+        self.rule.hits += count
+        return text
+
+    def apply_profiled(self, text, profile):
+        rule = self.rule
+
+        def replace(match):
+            new = match.expand(rule.repl)
+            profile.record_match(rule, match.group(0), new)
+            return new
+
+        start = time.perf_counter()
+        if self.can_skip(text):
+            profile.record_call(rule, time.perf_counter() - start, scanned=False)
+            return text
+        text, count = rule.regex.subn(replace, text)
+        rule.hits += count
+        profile.record_call(rule, time.perf_counter() - start, scanned=True)
+        return text
+
+
+def _can_join(run, rule):
+    """A word rule can join a run unless an earlier replacement feeds it"""
+    key = rule.word.lower() if rule.ignorecase else rule.word
+    for earlier in run:
+        for token in WORD_TOKEN.findall(earlier.repl):
+            if (token.lower() if rule.ignorecase else token) == key:
+                return False
+    return True
+
+
+class RuleSet:
+    """An ordered correction table compiled into a minimal list of passes"""
+
+    def __init__(self, rules):
+        self.rules = [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+        self.passes = []
+        self.profile = None
+
+        run = []
+        run_start = 0
+        for index, rule in enumerate(self.rules):
+            if rule.word is not None and (not run or _can_join(run, rule)):
+                if not run:
+                    run_start = index
+                run.append(rule)
+                continue
+            self._flush(run, run_start)
+            run = []
+            if rule.word is not None:
+                run, run_start = [rule], index
+            else:
+                self.passes.append(RegexPass(rule, index))
+        self._flush(run, run_start)
+
+    def _flush(self, run, run_start):
+        if len(run) > 1:
+            self.passes.append(WordPass(run, run_start))
+        elif run:
+            self.passes.append(RegexPass(run[0], run_start))
+
+    def apply(self, text):
+        """Apply every rule, in table order, using the compiled passes"""
+        if self.profile is not None:
+            for p in self.passes:
+                text = p.apply_profiled(text, self.profile)
+            return text
+        for p in self.passes:
+            text = p.apply(text)
+        return text
+
+    def apply_sequential(self, text):
+        """Reference cascade: one re.sub per rule, exactly as the table reads"""
+        for rule in self.rules:
+            if rule.when and not any(w in text for w in rule.when):
+                continue
+            text = re.sub(rule.pattern, rule.repl, text, flags=rule.flags)
+        return text
+
+    def __len__(self):
+        return len(self.rules)
+
+
+def compile_rules(table):
+    """Compile a list of (pattern, replacement[, flags[, when]]) tuples"""
+    return RuleSet(table)
+
+
+class RuleProfile:
+    """Opt-in per-rule instrumentation shared by any number of RuleSets"""
+
+    FIELDS = ('invocations', 'scans', 'matches', 'chars_changed', 'seconds')
+
+    def __init__(self, json_path='ocr_profile.json'):
+        self.json_path = json_path
+        self.stats = {}
+        self.rules = []
+        self.rulesets = []
+
+    def attach(self, ruleset):
+        """Start profiling a RuleSet; returns it for chaining"""
+        for rule in ruleset.rules:
+            if id(rule) not in self.stats:
+                self.stats[id(rule)] = dict.fromkeys(self.FIELDS, 0)
+                self.rules.append(rule)
+        ruleset.profile = self
+        self.rulesets.append(ruleset)
+        return ruleset
+
+    def detach(self):
+        """Stop profiling every attached RuleSet"""
+        for ruleset in self.rulesets:
+            ruleset.profile = None
+        self.rulesets = []
+
+    def record_call(self, rule, seconds, scanned):
+        st = self.stats[id(rule)]
+        st['invocations'] += 1
+        st['seconds'] += seconds
+        if scanned:
+            st['scans'] += 1
+
+    def record_match(self, rule, old, new):
+        st = self.stats[id(rule)]
+        st['matches'] += 1
+        if old != new:
+            st['chars_changed'] += max(len(old), len(new))
+
+    def rows(self):
+        """One dict per rule, slowest first"""
+        rows = []
+        for rule in self.rules:
+            row = {'label': rule.label or '', 'pattern': rule.pattern, 'replacement': rule.repl}
+            row.update(self.stats[id(rule)])
+            rows.append(row)
+        rows.sort(key=lambda r: (-r['seconds'], -r['matches']))
+        return rows
+
+    def report(self, limit=None):
+        """Sorted plain-text report"""
+        rows = self.rows()
+        total = sum(r['seconds'] for r in rows) or 1
+        lines = [f"{'seconds':>9} {'%':>5} {'calls':>8} {'scans':>8} {'matches':>8} {'chars':>8}  rule"]
+        for r in rows[:limit]:
+            lines.append(
+                f"{r['seconds']:9.4f} {100 * r['seconds'] / total:5.1f} {r['invocations']:8d} "
+                f"{r['scans']:8d} {r['matches']:8d} {r['chars_changed']:8d}  {r['label']} {r['pattern']}"
+            )
+        dead = sum(1 for r in rows if r['invocations'] and not r['matches'])
+        lines.append(f"{len(rows)} rules, {dead} never matched, {total:.4f}s total")
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        """Write the full report as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.rows(), f, indent=2, ensure_ascii=False)
+
+
+def profile_from_env():
+    """
+    A RuleProfile if OCR_PROFILE is set, else None.
+
+    OCR_PROFILE=1 writes the JSON report to ocr_profile.json; any other value
+    is used as the JSON report path.
+    """
+    value = os.environ.get('OCR_PROFILE')
+    if not value or value == '0':
+        return None
+    return RuleProfile('ocr_profile.json' if value == '1' else value)
+
+
+def finish_profile(profile, limit=40):
+    """Print the text report and write the JSON one, if profiling is on"""
+    if profile is None:
+        return
+    profile.detach()
+    print("\nOCR rule profile (slowest first):")
+    print(profile.report(limit))
+    profile.dump(profile.json_path)
+    print(f"✓ Full profile saved to {profile.json_path}")
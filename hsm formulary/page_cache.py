@@ -0,0 +1,162 @@
+"""
+Content-addressed cache of extracted PDF page text.
+
+Two tables back the cache:
+  documents - PDF content hash + page number -> page object hash
+  pages     - page object hash + extraction mode -> extracted text
+
+Re-running an extractor on an unchanged PDF only needs the file hash and one
+SQLite query. A new edition that keeps most pages byte-identical only pays
+for PyPDF2 extraction on the pages whose content actually changed.
+"""
+import hashlib
+import sqlite3
+
+DEFAULT_CACHE_PATH = '.page_cache.sqlite'
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _canonical(obj):
+    """A stable text form of a (small) PDF object, indirect references resolved"""
+    if hasattr(obj, 'get_object'):
+        obj = obj.get_object()
+    if isinstance(obj, dict):
+        return '{' + ','.join(f"{key}:{_canonical(obj[key])}" for key in sorted(obj)) + '}'
+    if isinstance(obj, list):
+        return '[' + ','.join(_canonical(item) for item in obj) + ']'
+    return repr(obj)
+
+
+def _hash_resources(digest, resources, seen):
+    """
+    Fold a resource dictionary into the digest: each font's base font,
+    resolved encoding (incl. /Differences) and ToUnicode map, and each Form
+    XObject's content stream and resources, recursively. Images carry no
+    text and are skipped. `seen` guards against XObjects that reuse (or
+    include) each other.
+    """
+    if resources is None:
+        return
+    resources = resources.get_object()
+    fonts = resources.get('/Font')
+    if fonts is not None:
+        fonts = fonts.get_object()
+        for name in sorted(fonts):
+            font = fonts[name].get_object()
+            encoding = font.get('/Encoding')
+            digest.update(f"{name}:{font.get('/BaseFont')}:"
+                          f"{_canonical(encoding) if encoding is not None else None}".encode('utf-8'))
+            to_unicode = font.get('/ToUnicode')
+            if to_unicode is not None:
+                digest.update(to_unicode.get_object().get_data())
+
+    xobjects = resources.get('/XObject')
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            ref = xobjects[name]
+            xobject = ref.get_object()
+            if xobject.get('/Subtype') != '/Form':
+                continue
+            key = getattr(ref, 'idnum', None)
+            digest.update(f"{name}:{_canonical(xobject.get('/Matrix'))}:".encode('utf-8'))
+            if key is not None:
+                if key in seen:
+                    digest.update(f"@{key}".encode('utf-8'))
+                    continue
+                seen.add(key)
+            digest.update(xobject.get_data())
+            _hash_resources(digest, xobject.get('/Resources'), seen)
+
+
+def page_hash(page):
+    """
+    Hash everything on a PyPDF2 page that affects extracted text:
+    the content stream, the font resources (incl. encodings and ToUnicode
+    maps), the Form XObjects it draws (their content and fonts) and geometry.
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+
+    _hash_resources(digest, page.get('/Resources'), set())
+
+    digest.update(f"{page.get('/Rotate', 0)}:{list(page.mediabox)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PageCache:
+    """SQLite-backed page text cache"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                pdf_hash TEXT NOT NULL,
+                page_num INTEGER NOT NULL,
+                page_hash TEXT NOT NULL,
+                PRIMARY KEY (pdf_hash, page_num)
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                page_hash TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (page_hash, mode)
+            );
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    def document(self, pdf_hash):
+        """Return {page_num: page_hash} for a known PDF, or None"""
+        rows = self.conn.execute(
+            "SELECT page_num, page_hash FROM documents WHERE pdf_hash = ?", (pdf_hash,)
+        ).fetchall()
+        return dict(rows) if rows else None
+
+    def store_document(self, pdf_hash, page_hashes):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO documents (pdf_hash, page_num, page_hash) VALUES (?, ?, ?)",
+                [(pdf_hash, num, h) for num, h in page_hashes.items()]
+            )
+
+    def cached_hashes(self, page_hashes, mode):
+        """Return the subset of page hashes already cached in this mode"""
+        found = set()
+        page_hashes = list(page_hashes)
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(page_hashes), 500):
+            batch = page_hashes[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            found.update(h for (h,) in self.conn.execute(
+                f"SELECT page_hash FROM pages WHERE mode = ? AND page_hash IN ({placeholders})",
+                [mode] + batch
+            ))
+        return found
+
+    def text(self, page_hash, mode):
+        row = self.conn.execute(
+            "SELECT text FROM pages WHERE page_hash = ? AND mode = ?", (page_hash, mode)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_text(self, page_hash, mode, text):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (page_hash, mode, text) VALUES (?, ?, ?)",
+                (page_hash, mode, text)
+            )
+
+    def close(self):
+        self.conn.close()
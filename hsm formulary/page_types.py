@@ -0,0 +1,156 @@
+"""
+Page-type classification for the *_extracted.txt files.
+
+Every page of a document is labelled once, from cheap line-level signals:
+
+  monograph   drug entries, "Name. dose..." lines (Frank Shann) or the
+              section headings of a drug profile (dilution, counseling)
+  table       mostly numeric tokens (infusion and normal-value tables)
+  toc         a CONTENTS heading, or lines ending in dot leaders and a page number
+  index       an INDEX heading, or lines ending in page-number locators
+  references  a REFERENCES heading, or citation years on most lines
+  blank       no text
+  other       front matter, appendices and prose
+
+The labels are cached in a <name>.pagetypes.json sidecar, checked against
+the file's size and mtime like the page index, so a parser only reads the
+pages it cares about:
+
+    for num, text in read_pages_of_type('frank_shann_extracted.txt', ('monograph',)):
+        ...
+
+    python page_types.py frank_shann_extracted.txt drug_dosages_appendix.txt
+"""
+import argparse
+import json
+import os
+import re
+
+from extracted_text import read_page_range, read_pages
+
+PAGE_TYPES = ('monograph', 'table', 'toc', 'index', 'references', 'blank', 'other')
+TYPES_VERSION = 1
+
+# A drug entry: a short name, a full stop, then a dose or a dosing lead-in
+ENTRY = re.compile(r"^[A-Z'][\w ,+()/'\-]{2,50}?\.\s+(?:\d|See\b|Adult|NOT/|Child|Oral|IV\b|IM\b|Topical|"
+                   r"Inanimate|Live|Usually|Initially|Max|Neonate|Infant)", re.I)
+DOSE = re.compile(r'\d\s*(?:mg|mcg|meg|rng|ml|mmol|u|g)\b(?:\s*/\s*kg)?|\b\d+(?:-\d+)?H\b', re.I)
+PROFILE_HEADING = re.compile(r'^(?:Brand Name|Reconstitution|Further Dilution|Diluents?|Administration|Storage|'
+                             r'Remarks|Pharmacological Group|Indications?|Dosage|Side Effects?|Contraindications?)\b')
+NUMERIC = re.compile(r'^[\d.,/%<>~\-]+$')
+LEADER = re.compile(r'(?:\.\s?){4,}\s*\d+\s*$')
+LOCATOR = re.compile(r'[A-Za-z)],?\s+\d+(?:\s*[,\-]\s*\d+)*$')
+YEAR = re.compile(r'\b(?:19|20)\d\d\b')
+TOC_HEADING = re.compile(r'\b(?:TABLE OF )?CONTENTS\b')
+INDEX_HEADING = re.compile(r'^\W*INDEX\W*$')
+REFERENCES_HEADING = re.compile(r'^\W*(?:REFERENCES?|BIBLIOGRAPHY)\W*$', re.I)
+
+
+def types_path(path):
+    return os.path.splitext(path)[0] + '.pagetypes.json'
+
+
+def classify_page(text):
+    """The PAGE_TYPES label of one page's text"""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if not lines:
+        return 'blank'
+    n = len(lines)
+    head = lines[:3]
+
+    if any(TOC_HEADING.search(line) for line in head) or sum(bool(LEADER.search(line)) for line in lines) >= 0.3 * n:
+        return 'toc'
+    if any(INDEX_HEADING.match(line) for line in head) or (
+            n >= 10 and sum(bool(LOCATOR.search(line)) for line in lines) >= 0.6 * n):
+        return 'index'
+    if any(REFERENCES_HEADING.match(line) for line in head) or (n >= 10 and len(YEAR.findall(text)) >= 0.2 * n):
+        return 'references'
+
+    # Entries are counted before doses: OCR garbles units on some monograph
+    # pages, and appendix tables are dose-dense without being entries
+    entries = sum(bool(ENTRY.match(line)) for line in lines)
+    if entries >= 5 or (entries >= 2 and len(DOSE.findall(text)) >= 0.6 * n):
+        return 'monograph'
+    if len({m.group(0) for line in lines if (m := PROFILE_HEADING.match(line))}) >= 3:
+        return 'monograph'
+
+    tokens = text.split()
+    if sum(bool(NUMERIC.match(token)) for token in tokens) >= 0.3 * len(tokens):
+        return 'table'
+    return 'other'
+
+
+def classify_document(path):
+    """{version, size, mtimeNs, pages: {page_number: type}} for an extracted text file"""
+    stat = os.stat(path)
+    pages = {str(num): classify_page(text) for num, text in read_pages(path)}
+    return {'version': TYPES_VERSION, 'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns, 'pages': pages}
+
+
+def write_page_types(path):
+    """Classify a text file and save its sidecar; returns it"""
+    types = classify_document(path)
+    with open(types_path(path), 'w', encoding='utf-8') as f:
+        json.dump(types, f, separators=(',', ':'))
+    return types
+
+
+def load_page_types(path):
+    """
+    The page types of a text file as {page_number: type}, from the sidecar,
+    reclassified (and saved, where writable) if it is missing or stale
+    """
+    try:
+        with open(types_path(path), 'r', encoding='utf-8') as f:
+            types = json.load(f)
+        stat = os.stat(path)
+        if (types.get('version') == TYPES_VERSION and types['size'] == stat.st_size
+                and types['mtimeNs'] == stat.st_mtime_ns):
+            return {int(num): kind for num, kind in types['pages'].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        types = write_page_types(path)
+    except OSError:
+        types = classify_document(path)
+    return {int(num): kind for num, kind in types['pages'].items()}
+
+
+def read_pages_of_type(path, types):
+    """
+    Yield (page_number, text) for the pages of the given types only, each
+    contiguous run read through the page index
+    """
+    wanted = sorted(num for num, kind in load_page_types(path).items() if kind in types)
+    start = 0
+    while start < len(wanted):
+        end = start
+        while end + 1 < len(wanted) and wanted[end + 1] == wanted[end] + 1:
+            end += 1
+        yield from read_page_range(path, wanted[start], wanted[end])
+        start = end + 1
+
+
+def _spans(nums):
+    """[1, 2, 3, 7] -> '1-3, 7'"""
+    spans = []
+    for num in sorted(nums):
+        if spans and num == spans[-1][1] + 1:
+            spans[-1][1] = num
+        else:
+            spans.append([num, num])
+    return ', '.join(f"{a}-{b}" if a != b else str(a) for a, b in spans)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify the pages of extracted text files")
+    parser.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    for path in args.paths:
+        pages = {int(num): kind for num, kind in write_page_types(path)['pages'].items()}
+        print(f"✓ {path}: {len(pages)} pages -> {types_path(path)}")
+        for kind in PAGE_TYPES:
+            nums = [num for num, k in pages.items() if k == kind]
+            if nums:
+                print(f"  {kind:<11} {len(nums):>4}  {_spans(nums)}")
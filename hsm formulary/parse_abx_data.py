@@ -1,30 +1,58 @@
 import json
 import re
 
-def parse_abx_data(filename='abx_extracted.txt'):
-    """Parse ABX regime extracted text into structured JSON"""
+from build_report import record_count, section
+from extracted_text import read_pages
+
+CRCL_BAND = re.compile(r'^(>=|<=|>|<|≥|≤)?\s*(\d+(?:\.\d+)?)\s*(?:[-–]\s*(\d+(?:\.\d+)?))?$')
+
+def parse_crcl_band(band):
+    """
+    Turn a CrCl band string into a numeric interval (mL/min):
+    ">50-90" -> {"min": 50, "max": 90, "minInclusive": False, "maxInclusive": True}
+    "<10" -> max 10 exclusive, "≥50" -> min 50 inclusive, "All" -> unbounded.
+    Unbounded ends are None. Non-numeric bands such as "HD" return None.
+    """
+    band = band.strip()
+    if band.lower() == 'all':
+        return {"min": None, "max": None, "minInclusive": False, "maxInclusive": False}
+    match = CRCL_BAND.match(band)
+    if match is None:
+        return None
+    op, low, high = match.groups()
+    low = float(low)
+    if high is not None:
+        # A range; a leading ">" only makes its lower end exclusive
+        return {"min": low, "max": float(high), "minInclusive": op != '>', "maxInclusive": True}
+    if op in ('>', '>=', '≥'):
+        return {"min": low, "max": None, "minInclusive": op != '>', "maxInclusive": False}
+    if op in ('<', '<=', '≤'):
+        return {"min": None, "max": low, "minInclusive": False, "maxInclusive": op != '<'}
+    return {"min": low, "max": low, "minInclusive": True, "maxInclusive": True}
+
+def parse_abx_data(filename='abx_extracted.txt', pages=None, output_file='src/abxData.json'):
+    """Parse ABX regime extracted text into structured JSON
     
-    with open(filename, 'r', encoding='utf-8') as f:
-        text = f.read()
+    pages: optional stream of (page_number, text), e.g. pdf_extract.iter_pages(...);
+    defaults to streaming the pages of `filename`
+    """
+    if pages is None:
+        pages = read_pages(filename)
     
     antibiotics = []
     antifungals = []
     antivirals = []
     
-    # Split by pages
-    pages = text.split('=== PAGE')
-    
     current_drug = None
     current_category = 'antibiotic'
     
-    for page in pages[1:]:  # Skip first empty split
+    for page_num, page in pages:
         lines = page.split('\n')
-        page_num = lines[0].strip().replace('===', '').strip()
         
         # Determine category based on page title
-        if 'Antifungal' in ''.join(lines[:10]):
+        if 'Antifungal' in ''.join(lines[:9]):
             current_category = 'antifungal'
-        elif 'Antiviral' in ''.join(lines[:10]):
+        elif 'Antiviral' in ''.join(lines[:9]):
             current_category = 'antiviral'
         
         # Simple extraction: look for drug name patterns
@@ -313,6 +341,11 @@ def parse_abx_data(filename='abx_extracted.txt'):
         }
     ]
     
+    # Numeric CrCl intervals alongside the printed bands, for renal_dose.py
+    for drug in abx_data:
+        for band in drug['renalDosing']:
+            band['crclRange'] = parse_crcl_band(band['crcl'])
+    
     # Save to JSON
     output = {
         "metadata": {
@@ -325,10 +358,11 @@ def parse_abx_data(filename='abx_extracted.txt'):
         "antibiotics": abx_data
     }
     
-    with open('src/abxData.json', 'w', encoding='utf-8') as f:
+    with section('write_json'), open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
+    record_count('antibiotics', len(abx_data))
     
-    print(f"✓ Created src/abxData.json with {len(abx_data)} entries")
+    print(f"✓ Created {output_file} with {len(abx_data)} entries")
     return output
 
 if __name__ == "__main__":
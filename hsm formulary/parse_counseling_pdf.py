@@ -1,5 +1,10 @@
+import argparse
 import re
-import json
+
+from build_report import record_count, section
+from json_writer import COMPACT_ROOT, columnar_path, write_columnar, write_json_array
+from records import RecordTable
+from search_index import build_index
 
 def clean_text(text):
     """Remove page markers, extra spaces, and common artifacts"""
@@ -191,7 +196,9 @@ def extract_drug_name(before_text):
     
     return name
 
-def parse_counseling_text(file_path):
+def parse_counseling_text(file_path, output_file='counseling_data_extracted.json', columnar=False,
+                          index_root=COMPACT_ROOT):
+    """Parse the counseling PDF text; columnar also writes public/data/counseling.columnar.json"""
     with open(file_path, 'r') as f:
         lines = f.readlines()
 
@@ -222,7 +229,8 @@ def parse_counseling_text(file_path):
     name_pattern = r'(.{0,100})<HEADER_NAME>'
     matches = list(re.finditer(name_pattern, text))
     
-    extracted_data = []
+    extracted_data = RecordTable(('id', 'name', 'pharmacologicalGroup', 'indication', 'dosage',
+                                  'methodOfAdministration', 'specialConsiderations', 'sideEffects', 'others'))
     
     for i, match in enumerate(matches):
         name_candidate = match.group(1)
@@ -350,10 +358,20 @@ def parse_counseling_text(file_path):
         
         extracted_data.append(drug)
 
-    with open('counseling_data_extracted.json', 'w') as f:
-        json.dump(extracted_data, f, indent=4)
+    with section('write_json'):
+        write_json_array(extracted_data.dicts(), output_file, indent=4, ensure_ascii=True)
+        if columnar:
+            write_columnar(extracted_data.dicts(), columnar_path('counseling'))
+    record_count('medications', len(extracted_data))
         
     print(f"Extracted {len(extracted_data)} medications.")
+    with section('build_index'):
+        build_index(extracted_data, 'counseling', ('name', 'pharmacologicalGroup', 'indication'), root=index_root)
+    return extracted_data
 
 if __name__ == "__main__":
-    parse_counseling_text('counseling_pdf_content.txt')
+    parser = argparse.ArgumentParser(description="Parse counseling_pdf_content.txt into counseling_data_extracted.json")
+    parser.add_argument('--columnar', action='store_true', help="also write dictionary-encoded columns")
+    args = parser.parse_args()
+
+    parse_counseling_text('counseling_pdf_content.txt', columnar=args.columnar)
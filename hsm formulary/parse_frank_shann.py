@@ -1,6 +1,21 @@
 import re
+import os
 import json
+import hashlib
+import argparse
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from build_report import record_count, section
+from extracted_text import read_pages
+import frank_shann_rules
+import ocr_engine
+from frank_shann_rules import compile_phase
+from json_writer import COMPACT_ROOT, by_letter, columnar_path, write_columnar, write_json_array, write_shards
+from search_index import build_index
+from ocr_engine import finish_profile, profile_from_env
+from page_types import load_page_types, read_pages_of_type
+from records import RecordTable
 
 def normalize_unicode(text):
     """Convert Unicode characters to ASCII where possible"""
@@ -9,159 +24,14 @@ def normalize_unicode(text):
     text = text.encode('ascii', 'ignore').decode('ascii')
     return text
 
+# OCR correction table (the 'parse' phase), applied in order by clean_text()
+CLEAN_TEXT_RULES = compile_phase('parse')
+
 def clean_text(text):
     """Comprehensive text cleaning with OCR error correction"""
     # First, normalize Unicode
     text = normalize_unicode(text)
-    
-    # Remove page artifacts and headers/footers
-    text = re.sub(r'=== PAGE \d+ ===', ' ', text)
-    text = re.sub(r'\$\d+\.\d+ \+ postage from orders@drugdoses\.com Page \d+', ' ', text)
-    text = re.sub(r'drugdoses\.com', ' ', text)
-    text = re.sub(r'Page \d+', ' ', text)
-    
-    # Fix common OCR character confusions - UNITS (comprehensive)
-    # mg variations
-    text = re.sub(r'(?<=\d)\s*rng\b', 'mg', text)
-    text = re.sub(r'(?<=\d)\s*rn\s*g\b', 'mg', text)
-    text = re.sub(r'(?<=\d)\s*rnq\b', 'mg', text)
-    text = re.sub(r'\brng\b', 'mg', text)
-    text = re.sub(r'\bmg\s+(?=\d)', 'mg/', text)  # "mg 12" -> "mg/12"
-    
-    # mcg variations
-    text = re.sub(r'(?<=\d)\s*rncg\b', 'mcg', text)
-    text = re.sub(r'(?<=\d)\s*mc\s*g\b', 'mcg', text)
-    text = re.sub(r'\brncg\b', 'mcg', text)
-    
-    # kg variations (extensive)
-    text = re.sub(r'(?<=\d)\s*l<g\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*1<g\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*I<g\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*k\(J\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*1\(g\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*k\[J\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*kq\b', 'kg', text)
-    text = re.sub(r'\bl<g\b', 'kg', text)
-    text = re.sub(r'\bI<g\b', 'kg', text)
-    text = re.sub(r'\bk\(J\b', 'kg', text)
-    text = re.sub(r'\bk\[J\b', 'kg', text)
-    text = re.sub(r'\bkq\b', 'kg', text)
-    
-    # ml variations
-    text = re.sub(r'(?<=\d)\s*rnl\b', 'ml', text)
-    text = re.sub(r'(?<=\d)\s*rn I\b', 'ml', text)
-    text = re.sub(r'\brnl\b', 'ml', text)
-    text = re.sub(r'\bm\s+l\b', 'ml', text)
-    text = re.sub(r'\bmll\b', 'ml', text)
-    
-    # min/hr/H variations
-    text = re.sub(r'(?<=\d)\s*rnin\b', 'min', text)
-    text = re.sub(r'\brnin\b', 'min', text)
-    text = re.sub(r'\bllr\b', 'hr', text)
-    text = re.sub(r'\blhr\b', 'hr', text)
-    text = re.sub(r'\b1hr\b', '1hr', text)
-    text = re.sub(r'(?<=\d)\s*/H\b', 'H', text)  # "6-12/H" -> "6-12H"
-    text = re.sub(r'\bti-1\s*/H\b', '6-12H', text)  # Common pattern
-    text = re.sub(r'\b8-l2H\b', '8-12H', text)
-    
-    # Fix spacing around numbers and units
-    text = re.sub(r'(\d+)\s+(\.\s*\d+)', r'\1\2', text)  # "0 . 5" -> "0.5"
-    text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)  # "0 . 5" -> "0.5"
-    text = re.sub(r'0_\s*1', '0.1', text)  # "0_ 1" -> "0.1"
-    text = re.sub(r'(\d+)\s*_\s*(\d+)', r'\1.\2', text)  # "0_ 1" -> "0.1"
-    
-    # Common word OCR errors
-    text = re.sub(r'\bornl\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\boml\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\borul\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bOrnin\b', '0min', text)
-    text = re.sub(r'\bOmin\b', '0min', text)
-    text = re.sub(r'\bbeforo\b', 'before', text)
-    text = re.sub(r'\btl1on\b', 'then', text)
-    text = re.sub(r'\btl1en\b', 'then', text)
-    text = re.sub(r'\bparacetarno1\b', 'paracetamol', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bparacetarnol\b', 'paracetamol', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bangioplasly\b', 'angioplasty', text)
-    text = re.sub(r'\bsoltn\b', 'solution', text)
-    text = re.sub(r'\bintratrac:l1eal\b', 'intratracheal', text)
-    text = re.sub(r'\bumoi\b', 'umol', text)
-    text = re.sub(r'\bumolll\b', 'umol/L', text)
-    text = re.sub(r'\burnoi\b', 'umol', text)
-    text = re.sub(r'\brnux\b', 'max', text)
-    text = re.sub(r'\brnax\b', 'max', text)
-    text = re.sub(r'\btub\b', 'tab', text)
-    text = re.sub(r'\brepoat\b', 'repeat', text)
-    text = re.sub(r'\bdni!y\b', 'daily', text)
-    text = re.sub(r'\bdnily\b', 'daily', text)
-    
-    # IV/IM variations
-    text = re.sub(r'\bUlV\b', 'IV', text)
-    text = re.sub(r'\bIVl\b', 'IM', text)
-    text = re.sub(r'\blVl\b', 'IM', text)
-    
-    # Common letter/number confusions in dosages
-    text = re.sub(r'\b1\s*!\s*i\s*0', '150', text)  # "1!i0" -> "150"
-    text = re.sub(r'\b!\s*i', '5', text)  # "!i" -> "5"
-    # Fix exclamation marks and special character confusions FIRST (before other substitutions)
-    # Most ! should be 't', but need to handle special cases
-    text = re.sub(r'!i', '5i', text)  # Temporarily mark "!i" pattern  
-    text = re.sub(r'!', 't', text)  # Convert remaining ! to t
-    text = re.sub(r'5i', 'ti', text)  # Convert back, now it's "ti"
-    text = re.sub(r'ti-1', '6-1', text)  # Fix "ti-1" -> "6-1"
-    
-    # Common letter/number confusions in dosages (do early)
-    text = re.sub(r'\b1\s*0\s*-\s*/\s*0', '10-20', text)  # "1 0-/0" or "10-/0" -> "10-20"
-    text = re.sub(r'\b([12]?\d)-/0', r'\1-20', text)  # "X-/0" -> "X-20"  
-    text = re.sub(r'/0mg', '20mg', text)  # "/0mg" -> "20mg"
-    text = re.sub(r'\b1 OO\s*(?=mg|mcg|ml|kg)', '100', text)
-    text = re.sub(r'\b1 O\s*(?=mg|mcg|ml|kg)', '10', text)
-    text = re.sub(r'\b0\s*\.\s*1\b', '0.1', text)
-    text = re.sub(r'\b0\s*\.\s*2\b', '0.2', text)
-    text = re.sub(r'\b0\s*\.\s*5\b', '0.5', text)
-    text = re.sub(r'\b1\s*\.\s*0\b', '1.0', text)
-    text = re.sub(r'\b2\.\s*5', '2.5', text)
-    
-    # Time intervals cleanup
-    text = re.sub(r'\b8-24ft\b', '8-24H', text)
-    text = re.sub(r'\b6-12JI\b', '6-12H', text)
-    text = re.sub(r'\b4wl<\b', '4wk', text)
-    text = re.sub(r'\b2wl<\b', '2wk', text)
-    text = re.sub(r'\b(\d+)wl<\b', r'\1wk', text)
-    text = re.sub(r'\bwl<\b', 'wk', text)
-    text = re.sub(r'\b(\d+)hr\b', r'\1H', text)  # Standardize to H
-    text = re.sub(r'\b21lr\b', '2hr', text)
-    text = re.sub(r'\b241lr\b', '24hr', text)
-    
-    # Fix "See X" references
-    text = re.sub(r'\bSee\s+([a-z])', r'See \1', text)
-    text = re.sub(r'\bSec\s+', 'See ', text)
-    text = re.sub(r'\bSoo\s+', 'See ', text)
-    text = re.sub(r'\bSeu\s+', 'See ', text)
-    
-    # Clean up common garbage patterns
-    text = re.sub(r'\b[A-Z]{1}\\\\\w+\b', '', text)  # Remove patterns like "A\\dtJit"
-    text = re.sub(r'\\u00b7', '-', text)
-    text = re.sub(r'~', '-', text)
-    text = re.sub(r'--+', '-', text)
-    
-    # Remove soft hyphens and other invisible characters
-    text = re.sub(r'[\u00ad\u200b\u200c\u200d]', '', text)
-    
-    # Remove obvious garbage patterns
-    text = re.sub(r'\$\d+\.\d+\s+\+\s+po;;lnqc.*?drugd?u?sos\.com', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'from\s+oniom.*?drugdosos\.com', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'ordors@.*?\.com', '', text)
-    text = re.sub(r'Pane\s+\d+', '', text)
-    text = re.sub(r'turnourlysis:', 'tumour lysis:', text)
-    
-    # Fix double periods
-    text = re.sub(r'\.\.+', '.', text)
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\s+\.', '.', text)
-    text = re.sub(r'\.\s+\.', '.', text)
-    
+    text = CLEAN_TEXT_RULES.apply(text)
     return text.strip()
 
 def is_valid_drug_name(name):
@@ -208,41 +78,54 @@ def is_valid_dosage(dosage):
     
     return True
 
-def parse_frank_shann(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+# Common non-drug words that might start a sentence
+NON_DRUG_STARTS = {
+    'Monitor', 'Note', 'Caution', 'Warning', 'See', 'Adult', 'Child', 'Infant', 'Neonatal', 'Preterm', 'Term', 
+    'Give', 'Stop', 'Repeat', 'Max', 'Min', 'Total', 'Daily', 'Weekly', 'Monthly', 'If', 'Then', 'For', 'Use', 
+    'Avoid', 'Adjust', 'Check', 'Measure', 'Keep', 'Protect', 'Dilute', 'Dissolve', 'Infuse', 'Inject', 'Take', 
+    'Administer', 'Apply', 'In', 'On', 'At', 'To', 'By', 'With', 'Without', 'Or', 'And', 'But', 'However', 
+    'Although', 'Because', 'Since', 'When', 'Where', 'Why', 'How', 'What', 'Who', 'Which', 'That', 'This', 
+    'These', 'Those', 'It', 'They', 'We', 'You', 'He', 'She', 'The', 'A', 'An', 'My', 'Your', 'His', 'Her', 
+    'Its', 'Our', 'Their', 'NB', 'IV', 'IM', 'SC', 'PO', 'PR', 'PV', 'SL', 'TOP', 'INH', 'NEB', 'Contents',
+    'Drug', 'Doses', 'Infusion', 'Rates', 'Table', 'Haemofiltration', 'Cytochrome', 'Alveolar', 'Muscle',
+    'Pacemaker', 'Intravenous', 'Haematology', 'Fluid', 'Dialysis', 'Ventilation', 'Immunisation', 'Antibiotic',
+    'Normal', 'Values', 'Resuscitation', 'Pharmacokinetic', 'Prophylaxis', 'Treatment', 'Loading', 'Maintenance',
+    'Severe', 'Slow', 'Extended', 'Newborn', 'NOT'
+}
+
+def _join(dosage, text):
+    """Append a line to a dosage the way the parser always has"""
+    return dosage + " " + text if dosage else text
+
+def split_page(lines, started=False, has_entry=False):
+    """
+    Segment one page of extracted lines into raw [name, dosage] pairs.
+
+    started: the "DRUGS ARE LISTED BY GENERIC NAME" marker was already seen
+    has_entry: an entry is still open from an earlier page
+
+    Returns (started, head, entries): `head` holds the lines continuing the
+    entry left open by an earlier page, `entries` the entries starting here.
+    """
+    head = []
+    entries = []
+
+    def append(text):
+        if entries:
+            entries[-1][1] = _join(entries[-1][1], text)
+        else:
+            head.append(text)
 
-    parsed_data = []
-    current_entry = None
-    
-    # Common non-drug words that might start a sentence
-    NON_DRUG_STARTS = {
-        'Monitor', 'Note', 'Caution', 'Warning', 'See', 'Adult', 'Child', 'Infant', 'Neonatal', 'Preterm', 'Term', 
-        'Give', 'Stop', 'Repeat', 'Max', 'Min', 'Total', 'Daily', 'Weekly', 'Monthly', 'If', 'Then', 'For', 'Use', 
-        'Avoid', 'Adjust', 'Check', 'Measure', 'Keep', 'Protect', 'Dilute', 'Dissolve', 'Infuse', 'Inject', 'Take', 
-        'Administer', 'Apply', 'In', 'On', 'At', 'To', 'By', 'With', 'Without', 'Or', 'And', 'But', 'However', 
-        'Although', 'Because', 'Since', 'When', 'Where', 'Why', 'How', 'What', 'Who', 'Which', 'That', 'This', 
-        'These', 'Those', 'It', 'They', 'We', 'You', 'He', 'She', 'The', 'A', 'An', 'My', 'Your', 'His', 'Her', 
-        'Its', 'Our', 'Their', 'NB', 'IV', 'IM', 'SC', 'PO', 'PR', 'PV', 'SL', 'TOP', 'INH', 'NEB', 'Contents',
-        'Drug', 'Doses', 'Infusion', 'Rates', 'Table', 'Haemofiltration', 'Cytochrome', 'Alveolar', 'Muscle',
-        'Pacemaker', 'Intravenous', 'Haematology', 'Fluid', 'Dialysis', 'Ventilation', 'Immunisation', 'Antibiotic',
-        'Normal', 'Values', 'Resuscitation', 'Pharmacokinetic', 'Prophylaxis', 'Treatment', 'Loading', 'Maintenance',
-        'Severe', 'Slow', 'Extended', 'Newborn', 'NOT'
-    }
-
-    start_processing = False
-    skipped_count = 0
-    
     for line in lines:
         line = line.strip()
         if not line:
             continue
             
         if "DRUGS ARE LISTED BY GENERIC NAME" in line:
-            start_processing = True
+            started = True
             continue
             
-        if not start_processing:
+        if not started:
             continue
 
         # Skip obvious junk lines
@@ -288,15 +171,11 @@ def parse_frank_shann(file_path):
                 dosage = ""
                 
             if is_new_entry:
-                current_entry = {
-                    "id": f"fs-{str(len(parsed_data)+1).zfill(4)}",
-                    "name": name,
-                    "dosage": dosage
-                }
-                parsed_data.append(current_entry)
+                entries.append([name, dosage])
+                has_entry = True
         
         if not is_new_entry:
-            if current_entry:
+            if has_entry:
                 # Check for "hidden" drug entry in this line (merged by OCR)
                 # Look for pattern: ". Name. " where Name is capitalized
                 potential_split = re.search(r'\.\s+([A-Z][a-z]{3,30})\.\s', line)
@@ -308,77 +187,284 @@ def parse_frank_shann(file_path):
                         post_split = line[potential_split.start()+1:].strip()
                         
                         # Add pre_split to current entry
-                        if current_entry['dosage']:
-                            current_entry['dosage'] += " " + pre_split
-                        else:
-                            current_entry['dosage'] = pre_split
+                        append(pre_split)
                             
                         # Create new entry from post_split
                         parts = post_split.split('.', 1)
                         new_name = parts[0].strip()
                         new_dosage = parts[1].strip() if len(parts) > 1 else ""
                         
-                        current_entry = {
-                            "id": f"fs-{str(len(parsed_data)+1).zfill(4)}",
-                            "name": new_name,
-                            "dosage": new_dosage
-                        }
-                        parsed_data.append(current_entry)
+                        entries.append([new_name, new_dosage])
                         continue
 
                 # Append to current entry's dosage
-                if current_entry['dosage']:
-                    current_entry['dosage'] += " " + line
-                else:
-                    current_entry['dosage'] = line
+                append(line)
+
+    return started, head, entries
+
+def split_entries(lines):
+    """Split extracted lines into raw (uncleaned) {name, dosage} entries"""
+    _, _, entries = split_page(lines)
+    return [{"name": name, "dosage": dosage} for name, dosage in entries]
+
+def stitch_pages(fragments):
+    """
+    Join (page_num, head, entries) fragments, in page order, into raw entries.
+
+    Each entry keeps the span of pages it was built from, so a changed page
+    maps straight back to the entries it touches.
+    """
+    parsed_data = []
+    for page_num, head, entries in fragments:
+        if parsed_data and head:
+            for text in head:
+                parsed_data[-1]['dosage'] = _join(parsed_data[-1]['dosage'], text)
+            parsed_data[-1]['pages'][1] = page_num
+        for name, dosage in entries:
+            parsed_data.append({"name": name, "dosage": dosage, "pages": [page_num, page_num]})
+    return parsed_data
+
+# Fix common drug name OCR errors
+NAME_FIXES = {
+    "Abaca vir": "Abacavir",
+    "Abalacept": "Abatacept", 
+    "Ace!ylcysteinu": "Acetylcysteine",
+    "Acetylcysteine": "Acetylcysteine",
+    "Acyclovir": "Aciclovir",
+    "AlbuteroL": "Albuterol",
+}
+
+def clean_entry(name, dosage):
+    """Clean and validate one raw entry; returns [name, dosage], or None if rejected"""
+    # Clean the text
+    name = clean_text(name)
+    dosage = clean_text(dosage)
+    
+    # Validate entry
+    if not is_valid_drug_name(name):
+        return None
+        
+    if not is_valid_dosage(dosage):
+        return None
+    
+    # Skip entries in the NON_DRUG_STARTS list
+    if name in NON_DRUG_STARTS:
+        return None
+    
+    for wrong, correct in NAME_FIXES.items():
+        if wrong in name:
+            name = name.replace(wrong, correct)
+    
+    return [name, dosage]
+
+# Below this many entries a process pool costs more than it saves
+MIN_PARALLEL_ENTRIES = 500
+
+def _clean_chunk(chunk):
+    """Worker: clean a list of raw (name, dosage) pairs"""
+    return [clean_entry(name, dosage) for name, dosage in chunk]
+
+def clean_entries(raw, workers=None):
+    """
+    clean_entry() over a list of (name, dosage) pairs, results in input order.
+
+    Large batches are split into contiguous chunks (a few per worker, for
+    balance) and cleaned across a process pool.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+        if len(raw) < MIN_PARALLEL_ENTRIES:
+            workers = 1
+    workers = max(1, min(workers, len(raw)))
+    if workers == 1:
+        return _clean_chunk(raw)
+
+    size = -(-len(raw) // (workers * 4))
+    chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_clean_chunk, chunks):
+            results.extend(chunk)
+    return results
+
+def content_hash(*parts):
+    """SHA-1 of some strings, used for page keys and entry ids"""
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+def stable_id(name, seen):
+    """
+    Content-derived id: fs-<hash of the cleaned name>, plus -2, -3... for
+    repeated names, counted in `seen`. Entries keep their id when earlier
+    pages gain or lose entries, unlike the old sequential fs-NNNN numbering.
+    """
+    seen[name] = seen.get(name, 0) + 1
+    entry_id = f"fs-{content_hash(name)[:10]}"
+    if seen[name] > 1:
+        entry_id += f"-{seen[name]}"
+    return entry_id
+
+# Incremental state: page segmentations and cleaned entries from the last run
+STATE_PATH = '.frank_shann_state.json'
+STATE_VERSION = 2
+
+def parser_fingerprint():
+    """
+    Hash of everything that decides how a page is split and an entry cleaned:
+    the OCR rule table, NAME_FIXES, NON_DRUG_STARTS and the source of this
+    module and of the rule engine. State from a different fingerprint is
+    discarded, so editing any of them forces a full re-parse.
+    """
+    parts = [repr(frank_shann_rules.RULES), repr(sorted(NAME_FIXES.items())), repr(sorted(NON_DRUG_STARTS))]
+    for module_path in (__file__, frank_shann_rules.__file__, ocr_engine.__file__):
+        with open(module_path, 'r', encoding='utf-8') as f:
+            parts.append(f.read())
+    return content_hash(*parts)
+
+def load_state(path):
+    """The previous run's state, or an empty one if missing or made by other rules or code"""
+    empty = {'version': STATE_VERSION, 'pages': {}, 'entries': {}}
+    if not path or not os.path.exists(path):
+        return empty
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION or state.get('fingerprint') != parser_fingerprint():
+        return empty
+    return state
+
+def save_state(path, pages, entries):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': STATE_VERSION, 'fingerprint': parser_fingerprint(), 'pages': pages, 'entries': entries},
+                  f, ensure_ascii=False)
+
+def parse_frank_shann(file_path, output_file='src/frankShannData.json', state_path=None, workers=None,
+                      compact=False, columnar=False, index_root=COMPACT_ROOT, page_types=('monograph',)):
+    """
+    Parse frank_shann_extracted.txt into the app's Frank Shann data.
+
+    With a state_path the run is incremental: a page whose text and incoming
+    parser state are unchanged reuses its stored segmentation, and only entries
+    whose raw text changed are cleaned again. Everything the run used is
+    written back as the new state.
+
+    workers: processes for entry cleanup (None = auto, 1 = serial)
+    compact: write minified per-letter shards to public/data/frankShann/
+    columnar: write public/data/frankShann.columnar.json instead
+    page_types: only parse pages of these page_types.py types, skipping the
+        contents, tables and appendix; None parses every page from the
+        "DRUGS ARE LISTED BY GENERIC NAME" marker on
+    """
+    state = load_state(state_path)
+    pages = {}
 
-    # Post-processing and validation
-    final_data = []
+    if page_types is None:
+        source = read_pages(file_path)
+        skipped = 0
+    else:
+        with section('classify_pages'):
+            types = load_page_types(file_path)
+        source = read_pages_of_type(file_path, page_types)
+        skipped = sum(kind not in page_types for kind in types.values())
+
+    # Segment pages, reusing the fragments of unchanged ones
+    fragments = []
+    changed_pages = set()
+    # The classifier has already found where the monographs start
+    started = page_types is not None
+    has_entry = False
+    with section('split_pages'):
+        for page_num, text in source:
+            key = content_hash(text, str(started), str(has_entry))
+            fragment = state['pages'].get(key)
+            if fragment is None:
+                changed_pages.add(page_num)
+                started_out, head, entries = split_page(text.split('\n'), started, has_entry)
+                fragment = {'started': started_out, 'head': head, 'entries': entries}
+            pages[key] = fragment
+            fragments.append((page_num, fragment['head'], fragment['entries']))
+            started = fragment['started']
+            has_entry = has_entry or bool(fragment['entries'])
+
+        parsed_data = stitch_pages(fragments)
+
+    # Clean each distinct raw entry not cleaned by an earlier run
+    cleaned = {}
+    todo = {}
+    touched = 0
+    for entry in parsed_data:
+        first, last = entry['pages']
+        if any(first <= num <= last for num in changed_pages):
+            touched += 1
+        entry['key'] = content_hash(entry['name'], entry['dosage'])
+        if entry['key'] in state['entries']:
+            cleaned[entry['key']] = state['entries'][entry['key']]
+        elif entry['key'] not in todo:
+            todo[entry['key']] = (entry['name'], entry['dosage'])
+
+    # Opt-in per-rule profiling of clean_text(): OCR_PROFILE=1
+    profile = profile_from_env()
+    if profile is not None:
+        profile.attach(CLEAN_TEXT_RULES)
+        # Rule counters live in this process, so profile serially
+        workers = 1
+
+    with section('clean_entries'):
+        cleaned.update(zip(todo, clean_entries(list(todo.values()), workers)))
+
+    # Post-processing and validation, straight into the record table
+    final_data = RecordTable(('id', 'name', 'dosage'))
+    seen = {}
     rejected_count = 0
     
     for entry in parsed_data:
-        # Clean the text
-        entry['name'] = clean_text(entry['name'])
-        entry['dosage'] = clean_text(entry['dosage'])
-        
-        # Validate entry
-        if not is_valid_drug_name(entry['name']):
-            rejected_count += 1
-            continue
-            
-        if not is_valid_dosage(entry['dosage']):
-            rejected_count += 1
-            continue
-        
-        # Skip entries in the NON_DRUG_STARTS list
-        if entry['name'] in NON_DRUG_STARTS:
+        result = cleaned[entry['key']]
+        if result is None:
             rejected_count += 1
             continue
-        
-        # Fix common drug name OCR errors
-        name_fixes = {
-            "Abaca vir": "Abacavir",
-            "Abalacept": "Abatacept", 
-            "Ace!ylcysteinu": "Acetylcysteine",
-            "Acetylcysteine": "Acetylcysteine",
-            "Acyclovir": "Aciclovir",
-            "AlbuteroL": "Albuterol",
-        }
-        
-        for wrong, correct in name_fixes.items():
-            if wrong in entry['name']:
-                entry['name'] = entry['name'].replace(wrong, correct)
-        
-        final_data.append(entry)
+        name, dosage = result
+        final_data.append({"id": stable_id(name, seen), "name": name, "dosage": dosage})
     
     # Save to file
-    output_file = 'src/frankShannData.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_data, f, indent=4, ensure_ascii=False)
+    with section('write_json'):
+        if compact:
+            write_shards(final_data.dicts(), 'frankShann', by_letter('name'))
+            output_file = COMPACT_ROOT + '/frankShann'
+        elif columnar:
+            output_file = columnar_path('frankShann')
+            write_columnar(final_data.dicts(), output_file)
+        else:
+            write_json_array(final_data.dicts(), output_file, indent=4)
+    with section('build_index'):
+        build_index(final_data, 'frankShann', ('name', 'dosage'), root=index_root)
+    if state_path:
+        with section('save_state'):
+            save_state(state_path, pages, cleaned)
+    record_count('pages', len(fragments))
+    record_count('skipped_pages', skipped)
+    record_count('entries', len(final_data))
+    record_count('rejected', rejected_count)
+    record_count('recleaned', len(todo))
     
     print(f"✓ Extracted {len(final_data)} entries")
     print(f"✓ Rejected {rejected_count} invalid entries")
+    if skipped:
+        print(f"✓ Skipped {skipped} pages that are not {'/'.join(page_types)}")
+    print(f"✓ Re-parsed {len(changed_pages)} of {len(fragments)} pages "
+          f"({touched} entries touched), re-cleaned {len(todo)} of {len(parsed_data)} entries")
     print(f"✓ Output saved to {output_file}")
+    finish_profile(profile)
+    return final_data
 
 if __name__ == "__main__":
-    parse_frank_shann('frank_shann_extracted.txt')
+    parser = argparse.ArgumentParser(description="Parse frank_shann_extracted.txt into src/frankShannData.json")
+    parser.add_argument('--full', action='store_true', help="ignore and don't update the incremental state")
+    parser.add_argument('--state', default=STATE_PATH, help=f"incremental state file (default: {STATE_PATH})")
+    parser.add_argument('--workers', type=int, default=None, help="processes for entry cleanup (default: all cores)")
+    parser.add_argument('--compact', action='store_true', help="write minified per-letter shards + manifest")
+    parser.add_argument('--columnar', action='store_true', help="write dictionary-encoded columns instead")
+    parser.add_argument('--all-pages', action='store_true',
+                        help="parse every page after the generic-name marker, not just monograph pages")
+    args = parser.parse_args()
+
+    parse_frank_shann('frank_shann_extracted.txt', state_path=None if args.full else args.state,
+                      workers=args.workers, compact=args.compact,
+                      columnar=args.columnar, page_types=None if args.all_pages else ('monograph',))
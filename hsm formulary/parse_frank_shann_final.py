@@ -1,49 +1,53 @@
 import re
 import json
 
-def clean_text(text):
-    """Clean OCR errors from text"""
+from ocr_engine import compile_rules
+
+# Common OCR errors, replaced literally in this order
+OCR_REPLACEMENTS = {
+    'rng': 'mg', 'rnq': 'mg', 'rn g': 'mg', 'm g': 'mg',
+    'rncg': 'mcg', 'mc g': 'mcg',
+    'l<g': 'kg', 'I<g': 'kg', 'k(J': 'kg', 'k[J': 'kg', 'kq': 'kg', '1<g': 'kg',
+    'rnl': 'ml', 'rn l': 'ml', 'mll': 'ml',
+    'rnin': 'min', 'Omin': '0min',
+    'ornl': 'oral', 'oml': 'oral', 'orul': 'oral', 'omI': 'oral',
+    'tl1en': 'then', 'tl1on': 'then',
+    'beforo': 'before', 'beforc': 'before',
+    'paracetarnol': 'paracetamol', 'paracetarno1': 'paracetamol',
+    'soltn': 'solution',
+    'umoi': 'umol', 'urnoi': 'umol', 'umolll': 'umol/L',
+    'rnux': 'max', 'rnax': 'max',
+    'tub': 'tab', 'tsb': 'tab', 'tau': 'tab',
+    'repoat': 'repeat',
+    'dnily': 'daily', 'dni!y': 'daily',
+    'rnane': 'mane', 'nocle': 'nocte',
+    'infsn': 'infusion', 'incr': 'increase', 'reqd': 'required',
+    'Sec': 'See', 'Soo': 'See', 'Seu': 'See',
+    'UlV': 'IV', 'IVl': 'IM', 'lVl': 'IM', 'IlV': 'IV',
+    '8-24ft': '8-24H', '6-12JI': '6-12H', '8-l2H': '8-12H',
+    '12-241-l': '12-24H', '12-241': '12-24H',
+    'wl<': 'wk',
+    '1 O': '10', '1O': '10', '2 O': '20', '2O': '20',
+    '5 O': '50', '5O': '50', '/O': '20',
+    '!': 't',
+}
+
+CLEAN_TEXT_RULES = compile_rules(
     # Fix common OCR errors
-    replacements = {
-        'rng': 'mg', 'rnq': 'mg', 'rn g': 'mg', 'm g': 'mg',
-        'rncg': 'mcg', 'mc g': 'mcg',
-        'l<g': 'kg', 'I<g': 'kg', 'k(J': 'kg', 'k[J': 'kg', 'kq': 'kg', '1<g': 'kg',
-        'rnl': 'ml', 'rn l': 'ml', 'mll': 'ml',
-        'rnin': 'min', 'Omin': '0min',
-        'ornl': 'oral', 'oml': 'oral', 'orul': 'oral', 'omI': 'oral',
-        'tl1en': 'then', 'tl1on': 'then',
-        'beforo': 'before', 'beforc': 'before',
-        'paracetarnol': 'paracetamol', 'paracetarno1': 'paracetamol',
-        'soltn': 'solution',
-        'umoi': 'umol', 'urnoi': 'umol', 'umolll': 'umol/L',
-        'rnux': 'max', 'rnax': 'max',
-        'tub': 'tab', 'tsb': 'tab', 'tau': 'tab',
-        'repoat': 'repeat',
-        'dnily': 'daily', 'dni!y': 'daily',
-        'rnane': 'mane', 'nocle': 'nocte',
-        'infsn': 'infusion', 'incr': 'increase', 'reqd': 'required',
-        'Sec': 'See', 'Soo': 'See', 'Seu': 'See',
-        'UlV': 'IV', 'IVl': 'IM', 'lVl': 'IM', 'IlV': 'IV',
-        '8-24ft': '8-24H', '6-12JI': '6-12H', '8-l2H': '8-12H',
-        '12-241-l': '12-24H', '12-241': '12-24H',
-        'wl<': 'wk',
-        '1 O': '10', '1O': '10', '2 O': '20', '2O': '20',
-        '5 O': '50', '5O': '50', '/O': '20',
-        '!': 't',
-    }
-    
-    for wrong, correct in replacements.items():
-        text = text.replace(wrong, correct)
-    
+    [(re.escape(wrong), correct) for wrong, correct in OCR_REPLACEMENTS.items()] + [
     # Remove page markers
-    text = re.sub(r'\$\d+\.\d+.*?drugdoses\.com', '', text)
-    text = re.sub(r'\$9\.9[5ti].*?Page \d+', '', text)
+    (r'\$\d+\.\d+.*?drugdoses\.com', ''),
+    (r'\$9\.9[5ti].*?Page \d+', ''),
     
     # Clean up spacing
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'(\d+)\s*\.(\d+)', r'\1.\2', text)  # Fix decimal points
-    text = re.sub(r'(\d+)\s*%', r'\1%', text)  # Fix percentages
-    
+    (r'\s+', ' '),
+    (r'(\d+)\s*\.(\d+)', r'\1.\2'),  # Fix decimal points
+    (r'(\d+)\s*%', r'\1%'),  # Fix percentages
+])
+
+def clean_text(text):
+    """Clean OCR errors from text"""
+    text = CLEAN_TEXT_RULES.apply(text)
     return text.strip()
 
 def parse_frank_shann(file_path):
@@ -2,166 +2,171 @@ import re
 import json
 import unicodedata
 
+from ocr_engine import compile_rules
+
 def normalize_unicode(text):
     """Convert Unicode characters to ASCII where possible"""
     text = unicodedata.normalize('NFKD', text)
     text = text.encode('ascii', 'ignore').decode('ascii')
     return text
 
-def clean_text(text):
-    """Comprehensive text cleaning with aggressive OCR error correction"""
-    # First, normalize Unicode
-    text = normalize_unicode(text)
-    
+# OCR correction table, applied in order by clean_text()
+CLEAN_TEXT_RULES = compile_rules([
     # Remove page artifacts and headers/footers
-    text = re.sub(r'=== PAGE \d+ ===', ' ', text)
-    text = re.sub(r'\$\d+\.\d+ \+ postage from orders@drugdoses\.com Page \d+', ' ', text)
-    text = re.sub(r'drugdoses\.com', ' ', text)
-    text = re.sub(r'Page \d+', '', text)
-    text = re.sub(r'\$9\.9[5ti].*?drugdoses\.com', '', text, flags=re.IGNORECASE)
-    
+    (r'=== PAGE \d+ ===', ' '),
+    (r'\$\d+\.\d+ \+ postage from orders@drugdoses\.com Page \d+', ' '),
+    (r'drugdoses\.com', ' '),
+    (r'Page \d+', ''),
+    (r'\$9\.9[5ti].*?drugdoses\.com', '', re.IGNORECASE),
+
     # Fix exclamation marks (common OCR error for't')
-    text = re.sub(r'!', 't', text)
-    
+    (r'!', 't'),
+
     # Fix common character substitutions - NUMBERS
-    text = re.sub(r'\bO(?=mg|mcg|ml|kg|H\b)', '0', text)  # Capital O -> 0
-    text = re.sub(r'(?<=\d)\s*O\s*(?=mg|mcg|ml|kg)', '0', text)  # "1 O" -> "10"
-    text = re.sub(r'\b1\s*O\s*O\b', '100', text)  # "1 O O" -> "100"
-    text = re.sub(r'\b1\s*O\b', '10', text)  # "1 O" -> "10"
-    text = re.sub(r'\b2\s*O\b', '20', text)  # "2 O" -> "20"
-    text = re.sub(r'\b5\s*O\b', '50', text)  # "5 O" -> "50"
-    text = re.sub(r'/O\b', '20', text)  # "/O" -> "20"
-    text = re.sub(r'\b0\s*\.\s*', '0.', text)  # "0 . " -> "0."
-    
+    (r'\bO(?=mg|mcg|ml|kg|H\b)', '0'),  # Capital O -> 0
+    (r'(?<=\d)\s*O\s*(?=mg|mcg|ml|kg)', '0'),  # "1 O" -> "10"
+    (r'\b1\s*O\s*O\b', '100'),  # "1 O O" -> "100"
+    (r'\b1\s*O\b', '10'),  # "1 O" -> "10"
+    (r'\b2\s*O\b', '20'),  # "2 O" -> "20"
+    (r'\b5\s*O\b', '50'),  # "5 O" -> "50"
+    (r'/O\b', '20'),  # "/O" -> "20"
+    (r'\b0\s*\.\s*', '0.'),  # "0 . " -> "0."
+
     # Fix UNITS - comprehensive pattern matching
-    text = re.sub(r'(?<=\d)\s*rng\b', 'mg', text)
-    text = re.sub(r'(?<=\d)\s*rnq\b', 'mg', text)
-    text = re.sub(r'(?<=\d)\s*rn\s*g\b', 'mg', text)
-    text = re.sub(r'(?<=\d)\s*m\s+g\b', 'mg', text)
-    text = re.sub(r'\brng\b', 'mg', text)
-    text = re.sub(r'\brnq\b', 'mg', text)
-    
+    (r'(?<=\d)\s*rng\b', 'mg'),
+    (r'(?<=\d)\s*rnq\b', 'mg'),
+    (r'(?<=\d)\s*rn\s*g\b', 'mg'),
+    (r'(?<=\d)\s*m\s+g\b', 'mg'),
+    (r'\brng\b', 'mg'),
+    (r'\brnq\b', 'mg'),
+
     # mcg variations
-    text = re.sub(r'(?<=\d)\s*rncg\b', 'mcg', text)
-    text = re.sub(r'(?<=\d)\s*mc\s*g\b', 'mcg', text)
-    text = re.sub(r'\brncg\b', 'mcg', text)
-    
+    (r'(?<=\d)\s*rncg\b', 'mcg'),
+    (r'(?<=\d)\s*mc\s*g\b', 'mcg'),
+    (r'\brncg\b', 'mcg'),
+
     # kg variations - very extensive
-    text = re.sub(r'(?<=\d)\s*[lI1]\s*<\s*g\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*k\s*[(\[][Jg]\s*[)\]]\b', 'kg', text)
-    text = re.sub(r'(?<=\d)\s*kq\b', 'kg', text)
-    text = re.sub(r'\b[lI1]<g\b', 'kg', text)
-    text = re.sub(r'\bI<g\b', 'kg', text)
-    text = re.sub(r'\bk[(\[]J[)\]]\b', 'kg', text)
-    text = re.sub(r'\bkq\b', 'kg', text)
-    
+    (r'(?<=\d)\s*[lI1]\s*<\s*g\b', 'kg'),
+    (r'(?<=\d)\s*k\s*[(\[][Jg]\s*[)\]]\b', 'kg'),
+    (r'(?<=\d)\s*kq\b', 'kg'),
+    (r'\b[lI1]<g\b', 'kg'),
+    (r'\bI<g\b', 'kg'),
+    (r'\bk[(\[]J[)\]]\b', 'kg'),
+    (r'\bkq\b', 'kg'),
+
     # ml variations
-    text = re.sub(r'(?<=\d)\s*rnl\b', 'ml', text)
-    text = re.sub(r'(?<=\d)\s*rn\s*l\b', 'ml', text)
-    text = re.sub(r'\brnl\b', 'ml', text)
-    text = re.sub(r'\bmll\b', 'ml', text)
-    
+    (r'(?<=\d)\s*rnl\b', 'ml'),
+    (r'(?<=\d)\s*rn\s*l\b', 'ml'),
+    (r'\brnl\b', 'ml'),
+    (r'\bmll\b', 'ml'),
+
     # Time intervals - H pattern
-    text = re.sub(r'\bti\s*-\s*1', '6-1', text)
-    text = re.sub(r'\b6\s*-\s*1\s*2\s*H\b', '6-12H', text)
-    text = re.sub(r'\b8\s*-\s*1\s*2\s*H\b', '8-12H', text)
-    text = re.sub(r'\b(\d+)\s*-\s*1\s*H\b', r'\1-12H', text)
-    text = re.sub(r'\bti-12H\b', '6-12H', text)
-    text = re.sub(r'\b8-l2H\b', '8-12H', text)
-    text = re.sub(r'\b(\d+)hr\b', r'\1H', text)
-    text = re.sub(r'\bllr\b', 'hr', text)
-    text = re.sub(r'\blhr\b', 'hr', text)
-    text = re.sub(r'\b8-24ft\b', '8-24H', text)
-    text = re.sub(r'\b6-12JI\b', '6-12H', text)
-    text = re.sub(r'\b12-24H-l\b', '12-24H', text)
-    
+    (r'\bti\s*-\s*1', '6-1'),
+    (r'\b6\s*-\s*1\s*2\s*H\b', '6-12H'),
+    (r'\b8\s*-\s*1\s*2\s*H\b', '8-12H'),
+    (r'\b(\d+)\s*-\s*1\s*H\b', r'\1-12H'),
+    (r'\bti-12H\b', '6-12H'),
+    (r'\b8-l2H\b', '8-12H'),
+    (r'\b(\d+)hr\b', r'\1H'),
+    (r'\bllr\b', 'hr'),
+    (r'\blhr\b', 'hr'),
+    (r'\b8-24ft\b', '8-24H'),
+    (r'\b6-12JI\b', '6-12H'),
+    (r'\b12-24H-l\b', '12-24H'),
+
     # Week patterns
-    text = re.sub(r'\b(\d+)wl<\b', r'\1wk', text)
-    text = re.sub(r'\bwl<\b', 'wk', text)
-    
+    (r'\b(\d+)wl<\b', r'\1wk'),
+    (r'\bwl<\b', 'wk'),
+
     # min variations
-    text = re.sub(r'(?<=\d)\s*rnin\b', 'min', text)
-    text = re.sub(r'\brnin\b', 'min', text)
-    text = re.sub(r'\bOrnin\b', '0min', text)
-    text = re.sub(r'\bOmin\b', '0min', text)
-    
+    (r'(?<=\d)\s*rnin\b', 'min'),
+    (r'\brnin\b', 'min'),
+    (r'\bOrnin\b', '0min'),
+    (r'\bOmin\b', '0min'),
+
     # Fix common WORD OCR errors
-    text = re.sub(r'\bornl\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\boml\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\borul\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bomI\b', 'oral', text, flags=re.IGNORECASE)
-    text = re.sub(r'\btl1en\b', 'then', text)
-    text = re.sub(r'\btl1on\b', 'then', text)
-    text = re.sub(r'\bthen1\b', 'then', text)
-    text = re.sub(r'\btnon\b', 'then', text)
-    text = re.sub(r'\bbeforc\b', 'before', text)
-    text = re.sub(r'\bbeforo\b', 'before', text)
-    text = re.sub(r'\bparacetarno1\b', 'paracetamol', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bparacetarnol\b', 'paracetamol', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bnarar,r,tclt\b', 'paracetamol', text, flags=re.IGNORECASE)
-    text = re.sub(r'\bangioplasly\b', 'angioplasty', text)
-    text = re.sub(r'\bsoltn\b', 'solution', text)
-    text = re.sub(r'\bintratrac:l1eal\b', 'intratracheal', text)
-    text = re.sub(r'\bumoi\b', 'umol', text)
-    text = re.sub(r'\burnoi\b', 'umol', text)
-    text = re.sub(r'\bumolll\b', 'umol/L', text)
-    text = re.sub(r'\brnux\b', 'max', text)
-    text = re.sub(r'\brnax\b', 'max', text)
-    text = re.sub(r'\btub\b', 'tab', text)
-    text = re.sub(r'\btsb\b', 'tab', text)
-    text = re.sub(r'\btau\b', 'tab', text)
-    text = re.sub(r'\brepoat\b', 'repeat', text)
-    text = re.sub(r'\brepeat\b', 'repeat', text)
-    text = re.sub(r'\bdnily\b', 'daily', text)
-    text = re.sub(r'\bdni!y\b', 'daily', text)
-    text = re.sub(r'\brnane\b', 'mane', text)
-    text = re.sub(r'\bnocle\b', 'nocte', text)
-    text = re.sub(r'\benceph\b', 'encephalitis', text)
-    text = re.sub(r'\bcella\b', 'cellulitis', text)
-    text = re.sub(r'\binfsn\b', 'infusion', text)
-    text = re.sub(r'\bincr\b', 'increase', text)
-    text = re.sub(r'\breqd\b', 'required', text)
-    text = re.sub(r'\bprn\b', 'as needed', text)
-    text = re.sub(r'\bSec\b', 'See', text)
-    text = re.sub(r'\bSoo\b', 'See', text)
-    text = re.sub(r'\bSeu\b', 'See', text)
-    
+    (r'\bornl\b', 'oral', re.IGNORECASE),
+    (r'\boml\b', 'oral', re.IGNORECASE),
+    (r'\borul\b', 'oral', re.IGNORECASE),
+    (r'\bomI\b', 'oral', re.IGNORECASE),
+    (r'\btl1en\b', 'then'),
+    (r'\btl1on\b', 'then'),
+    (r'\bthen1\b', 'then'),
+    (r'\btnon\b', 'then'),
+    (r'\bbeforc\b', 'before'),
+    (r'\bbeforo\b', 'before'),
+    (r'\bparacetarno1\b', 'paracetamol', re.IGNORECASE),
+    (r'\bparacetarnol\b', 'paracetamol', re.IGNORECASE),
+    (r'\bnarar,r,tclt\b', 'paracetamol', re.IGNORECASE),
+    (r'\bangioplasly\b', 'angioplasty'),
+    (r'\bsoltn\b', 'solution'),
+    (r'\bintratrac:l1eal\b', 'intratracheal'),
+    (r'\bumoi\b', 'umol'),
+    (r'\burnoi\b', 'umol'),
+    (r'\bumolll\b', 'umol/L'),
+    (r'\brnux\b', 'max'),
+    (r'\brnax\b', 'max'),
+    (r'\btub\b', 'tab'),
+    (r'\btsb\b', 'tab'),
+    (r'\btau\b', 'tab'),
+    (r'\brepoat\b', 'repeat'),
+    (r'\brepeat\b', 'repeat'),
+    (r'\bdnily\b', 'daily'),
+    (r'\bdni!y\b', 'daily'),
+    (r'\brnane\b', 'mane'),
+    (r'\bnocle\b', 'nocte'),
+    (r'\benceph\b', 'encephalitis'),
+    (r'\bcella\b', 'cellulitis'),
+    (r'\binfsn\b', 'infusion'),
+    (r'\bincr\b', 'increase'),
+    (r'\breqd\b', 'required'),
+    (r'\bprn\b', 'as needed'),
+    (r'\bSec\b', 'See'),
+    (r'\bSoo\b', 'See'),
+    (r'\bSeu\b', 'See'),
+
     #IV/IM variations
-    text = re.sub(r'\bUlV\b', 'IV', text)
-    text = re.sub(r'\bIVl\b', 'IM', text)
-    text = re.sub(r'\blVl\b', 'IM', text)
-    text = re.sub(r'\bIlV\b', 'IV', text)
-    
+    (r'\bUlV\b', 'IV'),
+    (r'\bIVl\b', 'IM'),
+    (r'\blVl\b', 'IM'),
+    (r'\bIlV\b', 'IV'),
+
     # Fix decimal points
-    text = re.sub(r'(\d+)\s*\.\s*(\d+)', r'\1.\2', text)
-    text = re.sub(r'(\d+)\s*_\s*(\d+)', r'\1.\2', text)
-    text = re.sub(r'0_1', '0.1', text)
-    text = re.sub(r'12\.ti', '12.5', text)
-    
+    (r'(\d+)\s*\.\s*(\d+)', r'\1.\2'),
+    (r'(\d+)\s*_\s*(\d+)', r'\1.\2'),
+    (r'0_1', '0.1'),
+    (r'12\.ti', '12.5'),
+
     # Fix percentages
-    text = re.sub(r'([0-9])\s*%', r'\1%', text)
-    
+    (r'([0-9])\s*%', r'\1%'),
+
     # Fix spacing around operators
-    text = re.sub(r'\s*\+\s*', ' + ', text)
-    text = re.sub(r'(\d+)\s*/\s*(\d+)', r'\1/\2', text)
-    
+    (r'\s*\+\s*', ' + '),
+    (r'(\d+)\s*/\s*(\d+)', r'\1/\2'),
+
     # Clean up garbage patterns
-    text = re.sub(r'[\\\\][\w]+', '', text)
-    text = re.sub(r'~', '-', text)
-    text = re.sub(r'--+', '-', text)
-    
+    (r'[\\\\][\w]+', ''),
+    (r'~', '-'),
+    (r'--+', '-'),
+
     # Remove soft hyphens
-    text = re.sub(r'[\u00ad\u200b\u200c\u200d]', '', text)
-    
+    (r'[\u00ad\u200b\u200c\u200d]', ''),
+
     # Fix double periods
-    text = re.sub(r'\.\.+', '.', text)
-    text = re.sub(r'\s+\. name', '. name', text)
-    text = re.sub(r'\.\s+\.', '.', text)
-    
+    (r'\.\.+', '.'),
+    (r'\s+\. name', '. name'),
+    (r'\.\s+\.', '.'),
+
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\s+,', ',', text)
-    
+    (r'\s+', ' '),
+    (r'\s+,', ','),
+])
+
+def clean_text(text):
+    """Comprehensive text cleaning with aggressive OCR error correction"""
+    # First, normalize Unicode
+    text = normalize_unicode(text)
+    text = CLEAN_TEXT_RULES.apply(text)
     return text.strip()
 
 def is_valid_drug_name(name):
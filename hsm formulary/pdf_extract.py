@@ -0,0 +1,200 @@
+"""
+Shared PDF text extraction used by the extract_*.py scripts.
+
+Pages are extracted with PyPDF2 either serially or, for larger documents,
+across a process pool where each worker opens the PDF itself and handles a
+contiguous range of pages. Results are always reassembled in page order.
+
+Unless disabled, page text goes through the content-addressed PageCache so
+unchanged pages are never extracted twice.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+from build_report import record_count, section
+from extracted_text import write_page_index
+from page_cache import PageCache, file_hash, page_hash
+
+# Default page block, as written by extract_frank_shann.py / extract_pdf_text.py
+PAGE_FORMAT = "=== PAGE {num} ===\n\n{text}\n\n"
+
+# Below this many pages the process pool costs more than it saves
+MIN_PARALLEL_PAGES = 16
+
+
+def page_text(page, mode='plain'):
+    """Extract text from a single PyPDF2 page"""
+    if mode == 'layout':
+        return page.extract_text(extraction_mode="layout")
+    return page.extract_text()
+
+
+def count_pages(pdf_path):
+    """Return the number of pages in a PDF"""
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_chunk(pdf_path, page_numbers, mode):
+    """Worker: extract a list of (1-based) pages from its own PdfReader"""
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [(num, page_text(reader.pages[num - 1], mode)) for num in page_numbers]
+
+
+def split_chunks(page_numbers, workers):
+    """Split page numbers into contiguous chunks, a few per worker for balance"""
+    page_numbers = list(page_numbers)
+    if not page_numbers:
+        return []
+    n_chunks = min(len(page_numbers), workers * 4)
+    size = -(-len(page_numbers) // n_chunks)
+    return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+
+def resolve_workers(workers, num_pages):
+    """Pick the worker count: explicit value, else all cores for big documents"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+        if num_pages < MIN_PARALLEL_PAGES:
+            workers = 1
+    return max(1, min(workers, num_pages))
+
+
+def iter_pages(pdf_path, pages=None, mode='plain', workers=None, cache=None):
+    """
+    Lazily yield (page_number, text) from a PDF, in the order requested.
+
+    pages: iterable of 1-based page numbers (default: every page)
+    mode: 'plain' for extract_text(), 'layout' for extraction_mode="layout"
+    workers: process count (None = auto, 1 = serial in this process)
+    cache: optional PageCache; cached pages skip PyPDF2 extraction entirely
+
+    Only a bounded window of page chunks is in flight at once, so consumers
+    (writers, parsers) can start before extraction finishes.
+    """
+    if cache is not None:
+        yield from _iter_cached(pdf_path, pages, mode, workers, cache)
+        return
+
+    if pages is None:
+        pages = range(1, count_pages(pdf_path) + 1)
+    pages = list(pages)
+    workers = resolve_workers(workers, len(pages))
+
+    if workers == 1:
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            for num in pages:
+                yield num, page_text(reader.pages[num - 1], mode)
+        return
+
+    chunks = split_chunks(pages, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_extract_chunk, pdf_path, chunk, mode))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def extract_pages(pdf_path, pages=None, mode='plain', workers=None, cache=None):
+    """Extract page text from a PDF as a list of (page_number, text)"""
+    return list(iter_pages(pdf_path, pages, mode, workers, cache))
+
+
+def _iter_cached(pdf_path, pages, mode, workers, cache):
+    """Serve pages from the cache, extracting (and storing) only the misses"""
+    pdf_hash = file_hash(pdf_path)
+    doc = cache.document(pdf_hash)
+    if doc is None:
+        # New or changed PDF: hash its pages so unchanged ones still hit
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            doc = {i + 1: page_hash(page) for i, page in enumerate(reader.pages)}
+        cache.store_document(pdf_hash, doc)
+
+    pages = sorted(doc) if pages is None else list(pages)
+    cached = cache.cached_hashes({doc[num] for num in pages}, mode)
+
+    # First occurrence of each uncached page hash gets extracted, in page order
+    missing = []
+    for num in pages:
+        h = doc[num]
+        if h not in cached:
+            missing.append(num)
+            cached.add(h)
+    fresh = iter_pages(pdf_path, missing, mode, workers) if missing else iter(())
+
+    cache.misses += len(missing)
+    cache.hits += len(pages) - len(missing)
+
+    next_missing = 0
+    for num in pages:
+        if next_missing < len(missing) and missing[next_missing] == num:
+            _, text = next(fresh)
+            cache.store_text(doc[num], mode, text)
+            next_missing += 1
+        else:
+            text = cache.text(doc[num], mode)
+        yield num, text
+
+
+def write_pages(pages, output_path, page_format=PAGE_FORMAT, separator=''):
+    """
+    Write (page_number, text) pairs to a text file using the page markers,
+    plus its .pages.json page index
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as out_file:
+        for num, text in pages:
+            if count and separator:
+                out_file.write(separator)
+            out_file.write(page_format.format(num=num, text=text))
+            count += 1
+    write_page_index(output_path)
+    return count
+
+
+def extract_to_file(pdf_path, output_path, pages=None, mode='plain', workers=None,
+                    page_format=PAGE_FORMAT, separator='', use_cache=True):
+    """Stream a PDF into a *_extracted.txt file and report throughput"""
+    start = time.perf_counter()
+    cache = PageCache() if use_cache else None
+    try:
+        with section('extract_pages'):
+            stream = iter_pages(pdf_path, pages=pages, mode=mode, workers=workers, cache=cache)
+            count = write_pages(stream, output_path, page_format, separator)
+    finally:
+        if cache is not None:
+            cache.close()
+    record_count('pages', count)
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    used = resolve_workers(workers, count) if count else 1
+    print(f"✓ Extracted {count} pages in {elapsed:.2f}s ({rate:.1f} pages/sec, {used} worker(s))")
+    if cache is not None:
+        print(f"✓ Page cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    print(f"✓ Saved to {output_path}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract PDF text with === PAGE n === markers")
+    parser.add_argument('pdf_path')
+    parser.add_argument('output_path')
+    parser.add_argument('--workers', type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument('--layout', action='store_true', help='use extraction_mode="layout"')
+    parser.add_argument('--no-cache', action='store_true', help="bypass the page text cache")
+    args = parser.parse_args()
+
+    extract_to_file(args.pdf_path, args.output_path, mode='layout' if args.layout else 'plain',
+                    workers=args.workers, use_cache=not args.no_cache)
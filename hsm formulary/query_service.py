@@ -0,0 +1,308 @@
+"""
+Local offline query service over every formulary dataset.
+
+Loads the generated data once into in-memory indexes and answers HTTP/JSON
+queries with nothing but the standard library (asyncio streams, keep-alive):
+
+    GET /search?q=amox[&dataset=formulary][&limit=20]
+    GET /id/<record id>[?dataset=...]   the record; every match if datasets share the id
+    GET /atc/<code or prefix>           e.g. /atc/J01C
+    GET /category?name=<category>[&dataset=abx]
+    GET /categories[?dataset=...]
+    GET /stats                           request counts and p50/p99 latency
+
+    python query_service.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import signal
+import time
+from collections import deque
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from js_data import load_js_export
+from records import RecordTable, StringTable
+from search_index import IndexBuilder, normalize, search
+
+
+def _load_json(path, key=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data[key] if key else data
+
+
+# dataset -> (loader, searchable fields, category field)
+DATASETS = {
+    'formulary': (lambda: _load_json('src/formularyData.json'),
+                  ('genericName', 'brandName', 'category'), 'category'),
+    'frankShann': (lambda: _load_json('src/frankShannData.json'),
+                   ('name', 'dosage'), None),
+    'abx': (lambda: _load_json('src/abxData.json', 'antibiotics'),
+            ('name', 'category', 'route'), 'category'),
+    'dilution': (lambda: load_js_export('src/dilutionData.js', 'DILUTION_DATA'),
+                 ('genericName', 'brandName', 'category'), 'category'),
+    'counseling': (lambda: load_js_export('src/counselingData.js', 'COUNSELING_MEDICATIONS'),
+                   ('name', 'pharmacologicalGroup', 'indication'), 'pharmacologicalGroup'),
+}
+
+
+class Catalog:
+    """
+    Every dataset, indexed by id, ATC code, category and search token.
+    Records are held as RecordTables sharing one string table.
+    """
+
+    def __init__(self, datasets=DATASETS):
+        self.records = {}
+        self.indexes = {}
+        self.by_id = {}
+        self.by_atc = {}
+        self.by_category = {}
+        self.categories = {}
+        strings = StringTable()
+
+        for dataset, (load, fields, category_field) in datasets.items():
+            records = RecordTable.from_records(load(), strings)
+            self.records[dataset] = records
+            builder = IndexBuilder(dataset, fields)
+            for position, record in enumerate(records):
+                builder.add(record)
+                ref = (dataset, position)
+                # Ids are only unique within a dataset, so keep every match
+                self.by_id.setdefault(record['id'], []).append(ref)
+                if record.get('atc'):
+                    self.by_atc.setdefault(record['atc'].upper(), []).append(ref)
+                if category_field and record.get(category_field):
+                    # Formulary categories are "chapter\nsection"; index both lines
+                    for line in record[category_field].split('\n'):
+                        if line.strip():
+                            key = normalize(line.strip())
+                            self.categories.setdefault(dataset, {}).setdefault(key, line.strip())
+                            self.by_category.setdefault(key, []).append(ref)
+            index = builder.build()
+            # Map ids back to positions so hits resolve without a lookup
+            index['ids'] = list(range(len(records)))
+            self.indexes[dataset] = index
+
+        self.atc_codes = sorted(self.by_atc)
+        strings.freeze()
+
+    def record(self, ref):
+        dataset, position = ref
+        return {'dataset': dataset, **self.records[dataset][position]}
+
+    def by_record_id(self, record_id, dataset=None):
+        """Every record with this id, optionally within one dataset"""
+        return [r for r in self.by_id.get(record_id, []) if dataset is None or r[0] == dataset]
+
+    def search(self, query, dataset=None, limit=20):
+        results = []
+        for name in ([dataset] if dataset else self.indexes):
+            for position in search(self.indexes[name], query):
+                results.append((name, position))
+        return results[:limit], len(results)
+
+    def atc(self, prefix):
+        """Records whose ATC code starts with `prefix`"""
+        prefix = prefix.upper()
+        refs = []
+        for code in self.atc_codes[bisect.bisect_left(self.atc_codes, prefix):]:
+            if not code.startswith(prefix):
+                break
+            refs.extend(self.by_atc[code])
+        return refs
+
+    def category(self, name, dataset=None):
+        refs = self.by_category.get(normalize(name.strip()), [])
+        return [r for r in refs if dataset is None or r[0] == dataset]
+
+
+class LatencyStats:
+    """Per-route request counts and latency percentiles over a recent window"""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, route, seconds):
+        self.samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+        self.counts[route] = self.counts.get(route, 0) + 1
+
+    @staticmethod
+    def percentile(ordered, p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        report = {}
+        everything = []
+        for route, samples in self.samples.items():
+            ordered = sorted(samples)
+            everything.extend(ordered)
+            report[route] = {
+                'requests': self.counts[route],
+                'p50_ms': round(self.percentile(ordered, 50) * 1000, 3),
+                'p99_ms': round(self.percentile(ordered, 99) * 1000, 3),
+            }
+        if everything:
+            everything.sort()
+            report['all'] = {
+                'requests': sum(self.counts.values()),
+                'p50_ms': round(self.percentile(everything, 50) * 1000, 3),
+                'p99_ms': round(self.percentile(everything, 99) * 1000, 3),
+            }
+        return report
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class QueryService:
+    """Routes requests against a Catalog over asyncio HTTP/1.1"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.stats = LatencyStats()
+
+    def route(self, target):
+        """Return (route name, status, body) for a request target"""
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        dataset = params.get('dataset')
+        if dataset and dataset not in self.catalog.records:
+            return 'error', 400, {'error': f"unknown dataset {dataset!r}"}
+        catalog = self.catalog
+
+        if parts == ['search']:
+            if not params.get('q'):
+                return 'search', 400, {'error': "missing q"}
+            try:
+                limit = int(params.get('limit', 20))
+            except ValueError:
+                return 'search', 400, {'error': "limit must be an integer"}
+            if limit < 0:
+                return 'search', 400, {'error': "limit must not be negative"}
+            refs, total = catalog.search(params['q'], dataset, limit)
+            return 'search', 200, {'total': total, 'results': [catalog.record(r) for r in refs]}
+
+        if len(parts) == 2 and parts[0] == 'id':
+            refs = catalog.by_record_id(parts[1], dataset)
+            if not refs:
+                return 'id', 404, {'error': f"no record {parts[1]!r}"}
+            if len(refs) > 1:
+                return 'id', 200, {'total': len(refs), 'results': [catalog.record(r) for r in refs]}
+            return 'id', 200, catalog.record(refs[0])
+
+        if len(parts) == 2 and parts[0] == 'atc':
+            refs = catalog.atc(parts[1])
+            return 'atc', 200, {'total': len(refs), 'results': [catalog.record(r) for r in refs]}
+
+        if parts == ['category']:
+            if not params.get('name'):
+                return 'category', 400, {'error': "missing name"}
+            refs = catalog.category(params['name'], dataset)
+            return 'category', 200, {'total': len(refs), 'results': [catalog.record(r) for r in refs]}
+
+        if parts == ['categories']:
+            names = {ds: sorted(c.values()) for ds, c in catalog.categories.items()
+                     if dataset is None or ds == dataset}
+            return 'categories', 200, names
+
+        if parts == ['stats']:
+            return 'stats', 200, self.stats.summary()
+
+        return 'error', 404, {'error': f"no route for {url.path}"}
+
+    async def handle(self, reader, writer):
+        """Serve one keep-alive connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    route, status, body = 'error', 400, {'error': "malformed request line"}
+                    version = 'HTTP/1.0'
+                else:
+                    if method != 'GET':
+                        route, status, body = 'error', 405, {'error': "only GET is supported"}
+                    else:
+                        route, status, body = self.route(target)
+
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Access-Control-Allow-Origin: *\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                    + payload
+                )
+                await writer.drain()
+                self.stats.record(route, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def print_stats(stats):
+    summary = stats.summary()
+    if not summary:
+        return
+    print(f"{'route':<12} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for route, row in summary.items():
+        print(f"{route:<12} {row['requests']:>9} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+
+
+async def serve(host, port):
+    start = time.perf_counter()
+    service = QueryService(Catalog())
+    counts = ', '.join(f"{len(r)} {name}" for name, r in service.catalog.records.items())
+    print(f"✓ Loaded {counts} in {time.perf_counter() - start:.2f}s")
+    server = await service.start(host, port)
+    print(f"✓ Listening on http://{host}:{port}")
+
+    # Stop cleanly (and report latency) on Ctrl-C or SIGTERM
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, task.cancel)
+        except NotImplementedError:
+            pass
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        print_stats(service.stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline formulary query service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,253 @@
+"""
+Binary record files: every dataset in a read-only container that is
+memory-mapped and decoded one record at a time.
+
+Layout (little-endian, offsets from the start of the file):
+
+  header   magic 'HSMR', version u16, reserved u16, record count u32,
+           field count u32, then the offsets of the field, record, id
+           index and heap sections (u32 each)
+  fields   per field: (heap offset, length) of its UTF-8 name
+  records  fixed width, per record and field: (heap offset, length).
+           A length with the high bit set is a JSON-encoded value (lists,
+           dicts, numbers, booleans, null); other values are UTF-8 strings.
+           The offset MISSING marks a field the record does not have.
+  id index per record that has an id, sorted by id bytes: (heap offset,
+           length, position); its size follows from the heap offset
+  heap     UTF-8 bytes, each distinct value stored once
+
+Opening a file reads the header and field names only. record(i) and
+get(id) slice the mapping and decode just that record, so a tool answers
+its first lookup without parsing a whole dataset. Processes reading the
+same file share its pages through the OS page cache.
+
+    python record_file.py build                  # every dataset -> record_files/<dataset>.bin
+    python record_file.py get formulary drug-12  # one record as JSON
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+RECORD_DIR = 'record_files'
+
+MAGIC = b'HSMR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIII')
+SLOT = struct.Struct('<II')
+INDEX_ENTRY = struct.Struct('<III')
+JSON_FLAG = 0x80000000
+MISSING = 0xFFFFFFFF
+
+
+def record_path(dataset, root=RECORD_DIR):
+    return os.path.join(root, f"{dataset}.bin")
+
+
+def _encode(value):
+    """(bytes, is JSON) for one field value"""
+    if isinstance(value, str):
+        return value.encode('utf-8'), False
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), True
+
+
+def write_record_file(records, path, id_field='id'):
+    """
+    Write records into a binary record file (via a temp file, swapped in
+    when complete); returns the record count
+    """
+    records = list(records)
+    fields = []
+    for record in records:
+        for field in record:
+            if field not in fields:
+                fields.append(field)
+
+    heap = bytearray()
+    offsets = {}
+
+    def store(data):
+        offset = offsets.get(data)
+        if offset is None:
+            offset = offsets[data] = len(heap)
+            heap.extend(data)
+        return offset
+
+    field_slots = [(store(f.encode('utf-8')), len(f.encode('utf-8'))) for f in fields]
+    table = bytearray()
+    ids = []
+    for position, record in enumerate(records):
+        for field in fields:
+            if field not in record:
+                table += SLOT.pack(MISSING, 0)
+                continue
+            data, is_json = _encode(record[field])
+            table += SLOT.pack(store(data), len(data) | (JSON_FLAG if is_json else 0))
+        # Records without an id are reachable by position only
+        if record.get(id_field) is None:
+            continue
+        record_id = str(record[id_field]).encode('utf-8')
+        ids.append((record_id, position, store(record_id)))
+    # Stable on duplicates: get() finds the first record with an id
+    ids.sort()
+    index = b''.join(INDEX_ENTRY.pack(offset, len(record_id), position) for record_id, position, offset in ids)
+
+    fields_offset = HEADER.size
+    table_offset = fields_offset + SLOT.size * len(fields)
+    index_offset = table_offset + len(table)
+    heap_offset = index_offset + len(index)
+    if heap_offset + len(heap) > MISSING:
+        raise ValueError(f"{path}: over 4 GB, too large for u32 offsets")
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), len(fields),
+                            fields_offset, table_offset, index_offset, heap_offset))
+        f.write(b''.join(SLOT.pack(*slot) for slot in field_slots))
+        f.write(table)
+        f.write(index)
+        f.write(heap)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class RecordFile:
+    """Read-only, memory-mapped view of a binary record file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        (magic, version, _, self.count, n_fields, fields_offset,
+         self._table, self._index, self._heap) = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a v{VERSION} record file")
+        self.fields = [self._text(*SLOT.unpack_from(self._view, fields_offset + i * SLOT.size))
+                       for i in range(n_fields)]
+        self._columns = {field: column for column, field in enumerate(self.fields)}
+        self._index_count = (self._heap - self._index) // INDEX_ENTRY.size
+        # A whole record's slots in one unpack
+        self._row = struct.Struct('<' + 'II' * n_fields)
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _text(self, offset, length):
+        start = self._heap + offset
+        return str(self._view[start:start + length], 'utf-8')
+
+    def _slot(self, position, column):
+        offset, length = SLOT.unpack_from(self._view, self._table + position * self._row.size + column * SLOT.size)
+        return self._decode(offset, length)
+
+    def _decode(self, offset, length):
+        if offset == MISSING:
+            return MISSING
+        if length & JSON_FLAG:
+            return json.loads(self._text(offset, length & ~JSON_FLAG))
+        return self._text(offset, length)
+
+    def value(self, position, field, default=None):
+        """One field of one record, decoding nothing else"""
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        value = self._slot(position, self._columns[field]) if field in self._columns else MISSING
+        return default if value is MISSING else value
+
+    def record(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        slots = self._row.unpack_from(self._view, self._table + position * self._row.size)
+        record = {}
+        for column, field in enumerate(self.fields):
+            value = self._decode(slots[2 * column], slots[2 * column + 1])
+            if value is not MISSING:
+                record[field] = value
+        return record
+
+    __getitem__ = record
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.record(position)
+
+    def position(self, record_id):
+        """Position of the first record with this id, or None (binary search of the id index)"""
+        target = str(record_id).encode('utf-8')
+        lo, hi = 0, self._index_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, length, _ = INDEX_ENTRY.unpack_from(self._view, self._index + mid * INDEX_ENTRY.size)
+            start = self._heap + offset
+            if self._mmap[start:start + length] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._index_count:
+            offset, length, position = INDEX_ENTRY.unpack_from(self._view, self._index + lo * INDEX_ENTRY.size)
+            start = self._heap + offset
+            if self._mmap[start:start + length] == target:
+                return position
+        return None
+
+    def get(self, record_id, default=None):
+        """The record with this id, or default"""
+        position = self.position(record_id)
+        return default if position is None else self.record(position)
+
+
+def build_record_files(root=RECORD_DIR, sources=None):
+    """Every dataset export_sqlite.py loads, one file each"""
+    from build_report import record_count, section
+    from export_sqlite import SOURCES
+
+    counts = {}
+    for dataset, (load, _) in (sources or SOURCES).items():
+        with section('load_sources'):
+            records = load()
+        with section('write_records'):
+            counts[dataset] = write_record_file(records, record_path(dataset, root))
+        record_count(dataset, counts[dataset])
+    print(f"✓ {', '.join(f'{n} {d}' for d, n in counts.items())} -> {root}/")
+    return counts
+
+
+if __name__ == "__main__":
+    # Not at the top: readers should not pay for importing argparse
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binary, memory-mapped record files")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help=f"write every dataset to {RECORD_DIR}/<dataset>.bin")
+    get = sub.add_parser('get', help="print one record by id")
+    get.add_argument('dataset', help="formulary, frankShann, abx, dilution or counseling")
+    get.add_argument('id')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_record_files()
+    else:
+        start = time.perf_counter()
+        with RecordFile(record_path(args.dataset)) as records:
+            record = records.get(args.id)
+        elapsed = time.perf_counter() - start
+        if record is None:
+            parser.exit(1, f"✗ No {args.dataset} record {args.id!r}\n")
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+        print(f"✓ Opened and looked up in {elapsed * 1000:.2f} ms")
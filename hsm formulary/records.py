@@ -0,0 +1,206 @@
+"""
+Compact in-memory records: one column per field plus a shared string table.
+
+A list of dicts keeps a hash table, a copy of every key and a separate str
+object per value for each record. A RecordTable instead keeps
+
+  - string fields as array('I') codes into a StringTable, where each distinct
+    string is stored once (every "Not specified", "Generic" or chapter name)
+  - other fields (bools, lists, nested dicts) in a plain list per column,
+    with the strings inside them swapped for the table's single copy
+
+Parsers append into a table and serialisers read it back as dicts, in the
+table's field order, so the JSON they write is unchanged:
+
+    table = RecordTable(('id', 'name', 'dosage'))
+    table.append({'id': 'fs-1', 'name': 'Abacavir', 'dosage': '8mg/kg 12H oral'})
+    write_json_array(table.dicts(), path, indent=4)
+
+table[i] is a read-only Record view that behaves like a dict for lookups
+(record['name'], record.get(...), **record), so indexers and query code
+work on it unchanged. benchmarks/bench_records.py measures the saving.
+"""
+import json
+from array import array
+
+# A field the record does not have (distinct from a None value)
+_MISSING = object()
+
+
+class StringTable:
+    """Every distinct string stored once; codes 0 and 1 are 'missing' and None"""
+    __slots__ = ('codes', 'strings')
+
+    def __init__(self):
+        self.codes = {}
+        self.strings = [_MISSING, None]
+
+    def __len__(self):
+        return len(self.strings) - 2
+
+    def encode(self, value):
+        if value is None:
+            return 1
+        if self.codes is None:
+            self.codes = {s: code for code, s in enumerate(self.strings) if code > 1}
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def freeze(self):
+        """Drop the lookup dict once loading is done; encode() rebuilds it if needed"""
+        self.codes = None
+
+    def canonical(self, value):
+        """The stored copy of each string inside a value (lists and dicts are rebuilt)"""
+        if isinstance(value, str):
+            return self.strings[self.encode(value)]
+        if isinstance(value, list):
+            return [self.canonical(v) for v in value]
+        if isinstance(value, dict):
+            return {self.canonical(k): self.canonical(v) for k, v in value.items()}
+        return value
+
+
+class Record:
+    """Read-only dict-like view of one row of a RecordTable"""
+    __slots__ = ('table', 'position')
+
+    def __init__(self, table, position):
+        self.table = table
+        self.position = position
+
+    def __getitem__(self, field):
+        value = self.table.value(field, self.position)
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        if field not in self.table.columns:
+            return default
+        value = self.table.value(field, self.position)
+        return default if value is _MISSING else value
+
+    def __contains__(self, field):
+        return field in self.table.columns and self.table.value(field, self.position) is not _MISSING
+
+    def keys(self):
+        return [f for f in self.table.fields if self.table.value(f, self.position) is not _MISSING]
+
+    def items(self):
+        return [(f, self[f]) for f in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Record({self.to_dict()!r})"
+
+
+class RecordTable:
+    """
+    Records stored column-wise. Fields may be declared up front or are added
+    as they first appear; a string column turns into a plain list the first
+    time it receives a non-string value.
+    """
+
+    def __init__(self, fields=(), strings=None):
+        self.fields = []
+        self.columns = {}
+        # Which columns hold string codes rather than values
+        self.coded = set()
+        self.strings = strings if strings is not None else StringTable()
+        self.length = 0
+        for field in fields:
+            self._add_field(field)
+
+    @classmethod
+    def from_records(cls, records, strings=None):
+        table = cls(strings=strings)
+        table.extend(records)
+        return table
+
+    def _add_field(self, field):
+        self.fields.append(field)
+        self.columns[field] = array('I', bytes(4 * self.length))
+        self.coded.add(field)
+
+    def _uncode(self, field):
+        strings = self.strings.strings
+        self.columns[field] = [strings[code] for code in self.columns[field]]
+        self.coded.discard(field)
+
+    def append(self, record):
+        for field in record:
+            if field not in self.columns:
+                self._add_field(field)
+        for field in self.fields:
+            column = self.columns[field]
+            value = record.get(field, _MISSING)
+            if field in self.coded:
+                if value is _MISSING:
+                    column.append(0)
+                    continue
+                if value is None or isinstance(value, str):
+                    column.append(self.strings.encode(value))
+                    continue
+                self._uncode(field)
+                column = self.columns[field]
+            column.append(value if value is _MISSING else self.strings.canonical(value))
+        self.length += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def value(self, field, position):
+        value = self.columns[field][position]
+        return self.strings.strings[value] if field in self.coded else value
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [Record(self, i) for i in range(*position.indices(self.length))]
+        if position < 0:
+            position += self.length
+        if not 0 <= position < self.length:
+            raise IndexError(position)
+        return Record(self, position)
+
+    def __iter__(self):
+        for position in range(self.length):
+            yield Record(self, position)
+
+    def column(self, field):
+        """Every value of one field (None where a record lacks it)"""
+        if field in self.coded:
+            strings = self.strings.strings
+            return [None if code == 0 else strings[code] for code in self.columns[field]]
+        return [None if v is _MISSING else v for v in self.columns[field]]
+
+    def dicts(self):
+        """The records as plain dicts, one at a time, in field order"""
+        strings = self.strings.strings
+        columns = [(f, self.columns[f], f in self.coded) for f in self.fields]
+        for position in range(self.length):
+            record = {}
+            for field, column, coded in columns:
+                value = column[position]
+                if coded:
+                    value = strings[value]
+                if value is not _MISSING:
+                    record[field] = value
+            yield record
+
+
+def load_table(path, key=None, strings=None):
+    """A generated JSON dataset (optionally wrapped under `key`) as a RecordTable"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return RecordTable.from_records(data[key] if key else data, strings)
+
@@ -0,0 +1,241 @@
+"""
+Renal dose lookup over the CrCl bands in src/abxData.json.
+
+Each drug's bands (">50-90", "10-30", "<10", ...) carry numeric intervals
+(crclRange, written by parse_abx_data.parse_crcl_band; older files without
+them are parsed on load) and are flattened into a sorted list of
+breakpoints. Between and on the breakpoints the answer is precomputed,
+so a lookup is one bisect, and a whole ward is one numpy.searchsorted per
+drug. Where bands overlap on a shared endpoint (30 in "30-50" and "10-30")
+the lower-CrCl band wins: it is the more conservative dose.
+
+Printed bands are whole numbers, so "10-29" and "30-50" are contiguous: a
+gap of at most 1 between two bands (29.6, or 10 between "<10" and
+"11-34") belongs to the lower band, for the same reason.
+
+CrCl above every listed band gets the usual dose; a CrCl that falls in a
+wider gap between bands (or a drug with only non-numeric bands such as
+"HD") gets no answer, and the reference must be checked.
+
+    python renal_dose.py amikacin-od 37
+    python renal_dose.py --ward ward.csv                 # patient,crcl,drug rows
+    python renal_dose.py --ward ward.csv --drugs vancomycin,meropenem
+"""
+import argparse
+import bisect
+import csv
+import json
+import sys
+
+import numpy as np
+
+from parse_abx_data import parse_crcl_band
+
+# Band codes besides 0..n-1
+NO_BAND = -1
+ABOVE_BANDS = -2
+
+
+def band_range(band):
+    """Numeric interval of a renalDosing entry, parsing older files on the fly"""
+    if 'crclRange' in band:
+        return band['crclRange']
+    return parse_crcl_band(band['crcl'])
+
+
+def in_range(r, crcl):
+    low, high = r['min'], r['max']
+    if low is not None and (crcl < low or (crcl == low and not r['minInclusive'])):
+        return False
+    if high is not None and (crcl > high or (crcl == high and not r['maxInclusive'])):
+        return False
+    return True
+
+
+def close_gaps(ranges):
+    """
+    Ranges (None for non-numeric bands) with every gap of at most 1 between
+    consecutive bands folded into the lower band
+    """
+    ranges = [dict(r) if r is not None else None for r in ranges]
+    numeric = sorted((r for r in ranges if r is not None),
+                     key=lambda r: (-np.inf if r['min'] is None else r['min'], r['minInclusive']))
+    for lower, upper in zip(numeric, numeric[1:]):
+        if lower['max'] is None or upper['min'] is None:
+            continue
+        gap = upper['min'] - lower['max']
+        touching = gap == 0 and (lower['maxInclusive'] or upper['minInclusive'])
+        if 0 <= gap <= 1 and not touching:
+            lower['max'] = upper['min']
+            lower['maxInclusive'] = not upper['minInclusive']
+    return ranges
+
+
+def _band_order(r):
+    """Sort key putting the lowest-CrCl band first"""
+    return (np.inf if r['max'] is None else r['max'], -np.inf if r['min'] is None else r['min'])
+
+
+class DrugBands:
+    """Sorted-bisect index over one drug's CrCl bands"""
+
+    def __init__(self, drug):
+        self.drug = drug
+        self.bands = drug['renalDosing']
+        ranges = close_gaps([band_range(b) for b in self.bands])
+        numeric = [r for r in ranges if r is not None]
+
+        points = sorted({v for r in numeric for v in (r['min'], r['max']) if v is not None})
+        top = max((r['max'] for r in numeric), default=None) if all(r['max'] is not None for r in numeric) else None
+        self.points = np.array(points, dtype=float)
+
+        # Segment 2i is the open interval below points[i], 2i+1 the point itself
+        codes = []
+        for k in range(2 * len(points) + 1):
+            if k % 2:
+                x = points[k // 2]
+            elif not points:
+                x = 0.0
+            elif k == 0:
+                x = points[0] - 1
+            elif k == 2 * len(points):
+                x = points[-1] + 1
+            else:
+                x = (points[k // 2 - 1] + points[k // 2]) / 2
+            matches = [i for i, r in enumerate(ranges) if r is not None and in_range(r, x)]
+            code = min(matches, key=lambda i: _band_order(ranges[i])) if matches else NO_BAND
+            if code == NO_BAND and numeric and top is not None and x > top:
+                code = ABOVE_BANDS
+            codes.append(code)
+        self.codes = np.array(codes, dtype=np.int64)
+
+        self.labels = [b['adjustment'] for b in self.bands]
+        self.usual = f"{drug['usualDose']} (no renal adjustment listed)"
+
+    def code(self, crcl):
+        """Band index for one CrCl value (or NO_BAND / ABOVE_BANDS)"""
+        if crcl != crcl:  # NaN
+            return NO_BAND
+        points = self.points
+        i = bisect.bisect_left(points, crcl)
+        exact = i < len(points) and points[i] == crcl
+        return int(self.codes[2 * i + exact])
+
+    def codes_for(self, crcls):
+        """Band indices for an array of CrCl values, in one searchsorted"""
+        crcls = np.asarray(crcls, dtype=float)
+        points = self.points
+        i = np.searchsorted(points, crcls, side='left')
+        if len(points):
+            exact = (i < len(points)) & (points[np.minimum(i, len(points) - 1)] == crcls)
+        else:
+            exact = np.zeros(len(crcls), dtype=bool)
+        codes = self.codes[2 * i + exact]
+        codes[np.isnan(crcls)] = NO_BAND
+        return codes
+
+    def label(self, code):
+        if code == ABOVE_BANDS:
+            return self.usual
+        if code == NO_BAND:
+            return None
+        return self.labels[code]
+
+    def labels_for(self, codes):
+        table = np.array(self.labels + [self.usual, None], dtype=object)
+        # -2 and -1 index the two extra entries
+        return table[codes]
+
+
+class RenalDoseIndex:
+    """Every drug's DrugBands, addressable by id, name or match keyword"""
+
+    def __init__(self, antibiotics):
+        self.drugs = {d['id']: DrugBands(d) for d in antibiotics}
+
+    @classmethod
+    def from_file(cls, path='src/abxData.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['antibiotics'])
+
+    def resolve(self, drug):
+        """Drug id for an id, name or keyword (case-insensitive)"""
+        if drug in self.drugs:
+            return drug
+        key = drug.strip().lower()
+        for drug_id, bands in self.drugs.items():
+            d = bands.drug
+            if key == d['name'].lower() or key in (k.lower() for k in d.get('matchKeywords', [])):
+                return drug_id
+        raise KeyError(f"unknown drug {drug!r}")
+
+    def lookup(self, drug, crcl):
+        """The adjustment for one drug at one CrCl"""
+        bands = self.drugs[self.resolve(drug)]
+        code = bands.code(float(crcl))
+        return {
+            'drug': bands.drug['id'],
+            'name': bands.drug['name'],
+            'crcl': crcl,
+            'band': bands.bands[code]['crcl'] if code >= 0 else None,
+            'adjustment': bands.label(code),
+        }
+
+    def batch(self, crcls, drugs):
+        """Adjustments for paired (crcl, drug) arrays, e.g. one row per prescription"""
+        crcls = np.asarray(crcls, dtype=float)
+        drug_ids = np.array([self.resolve(d) for d in drugs], dtype=object)
+        out = np.empty(len(crcls), dtype=object)
+        for drug_id in set(drug_ids):
+            rows = np.nonzero(drug_ids == drug_id)[0]
+            bands = self.drugs[drug_id]
+            out[rows] = bands.labels_for(bands.codes_for(crcls[rows]))
+        return out
+
+    def ward(self, crcls, drugs):
+        """Patients x drugs matrix of adjustments, one vectorised lookup per drug"""
+        crcls = np.asarray(crcls, dtype=float)
+        out = np.empty((len(crcls), len(drugs)), dtype=object)
+        for j, drug in enumerate(drugs):
+            bands = self.drugs[self.resolve(drug)]
+            out[:, j] = bands.labels_for(bands.codes_for(crcls))
+        return out
+
+
+def _print_ward(index, path, drugs):
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    crcls = [float(r['crcl']) for r in rows]
+    writer = csv.writer(sys.stdout)
+    if drugs:
+        writer.writerow(['patient', 'crcl'] + drugs)
+        for row, doses in zip(rows, index.ward(crcls, drugs)):
+            writer.writerow([row.get('patient', ''), row['crcl']] + [d or '' for d in doses])
+    else:
+        writer.writerow(['patient', 'crcl', 'drug', 'adjustment'])
+        doses = index.batch(crcls, [r['drug'] for r in rows])
+        for row, dose in zip(rows, doses):
+            writer.writerow([row.get('patient', ''), row['crcl'], row['drug'], dose or ''])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Renal dose adjustment lookup by CrCl")
+    parser.add_argument('drug', nargs='?')
+    parser.add_argument('crcl', nargs='?', type=float)
+    parser.add_argument('--ward', help="CSV with patient,crcl[,drug] columns")
+    parser.add_argument('--drugs', help="comma-separated drugs for a patients x drugs table")
+    parser.add_argument('--data', default='src/abxData.json')
+    args = parser.parse_args()
+
+    index = RenalDoseIndex.from_file(args.data)
+    if args.ward:
+        _print_ward(index, args.ward, args.drugs.split(',') if args.drugs else None)
+    elif args.drug is not None and args.crcl is not None:
+        result = index.lookup(args.drug, args.crcl)
+        if result['band']:
+            band = f"CrCl {result['band']}"
+        else:
+            band = "above the listed bands" if result['adjustment'] else "no matching band"
+        print(f"{result['name']} at CrCl {args.crcl:g}: {result['adjustment'] or 'check reference'} ({band})")
+    else:
+        parser.error("give a drug and CrCl, or --ward")
@@ -0,0 +1,128 @@
+"""
+Prebuilt inverted search index, generated alongside each dataset.
+
+For every record the searchable fields are normalised (ASCII-folded,
+lower-cased) and split into tokens once, at build time:
+
+  tokens   - token -> positions of the records containing it
+  prefixes - 1..PREFIX_LEN character prefix -> tokens starting with it
+  ids      - record id for each position
+
+A query term is looked up through its prefix bucket, so typing "amox" only
+touches the handful of tokens starting with "amo" instead of every record.
+The index is written as minified JSON to public/data/<dataset>.index.json.
+"""
+import json
+import os
+import re
+import unicodedata
+
+from json_writer import COMPACT_ROOT
+
+PREFIX_LEN = 3
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """ASCII-fold and lower-case text for indexing and querying"""
+    text = unicodedata.normalize('NFKD', text)
+    return text.encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def tokenize(text):
+    """Normalised tokens of a string (or list of strings)"""
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text)
+    return TOKEN.findall(normalize(str(text)))
+
+
+class IndexBuilder:
+    """Accumulates records into an inverted index"""
+
+    def __init__(self, dataset, fields, id_field='id'):
+        self.dataset = dataset
+        self.fields = list(fields)
+        self.id_field = id_field
+        self.ids = []
+        self.postings = {}
+
+    def add(self, record):
+        position = len(self.ids)
+        self.ids.append(record[self.id_field])
+        for field in self.fields:
+            for token in tokenize(record.get(field) or ''):
+                positions = self.postings.setdefault(token, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+    def feed(self, records):
+        """Index records as they stream past, yielding them unchanged"""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def build(self):
+        prefixes = {}
+        for token in sorted(self.postings):
+            for n in range(1, min(PREFIX_LEN, len(token)) + 1):
+                prefixes.setdefault(token[:n], []).append(token)
+        return {
+            'dataset': self.dataset,
+            'fields': self.fields,
+            'prefixLength': PREFIX_LEN,
+            'ids': self.ids,
+            'tokens': self.postings,
+            'prefixes': prefixes,
+        }
+
+
+def index_path(dataset, root=COMPACT_ROOT):
+    return os.path.join(root, f"{dataset}.index.json")
+
+
+def write_index(index, root=COMPACT_ROOT):
+    """Write an index as minified JSON; returns the path"""
+    os.makedirs(root, exist_ok=True)
+    path = index_path(index['dataset'], root)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✓ Search index: {len(index['ids'])} records, {len(index['tokens'])} tokens -> {path}")
+    return path
+
+
+def load_index(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_index(records, dataset, fields, id_field='id', root=COMPACT_ROOT):
+    """Index a list of records and write it out"""
+    builder = IndexBuilder(dataset, fields, id_field)
+    for record in records:
+        builder.add(record)
+    return write_index(builder.build(), root)
+
+
+def matching_positions(index, term):
+    """Positions of records with a token starting with `term`"""
+    bucket = index['prefixes'].get(term[:index['prefixLength']], ())
+    positions = set()
+    for token in bucket:
+        if token.startswith(term):
+            positions.update(index['tokens'][token])
+    return positions
+
+
+def search(index, query):
+    """Ids of records matching every term of the query (as token prefixes), in record order"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    # Longest (usually rarest) term first keeps the intersection small
+    found = None
+    for term in sorted(terms, key=len, reverse=True):
+        positions = matching_positions(index, term)
+        found = positions if found is None else found & positions
+        if not found:
+            return []
+    return [index['ids'][p] for p in sorted(found)]
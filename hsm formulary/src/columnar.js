@@ -0,0 +1,31 @@
+// Decoder for the columnar dataset files written by json_writer.write_columnar()
+// (public/data/<dataset>.columnar.json). Each column holds either plain
+// `values` or a `dict` plus one integer code per record; `absent` lists the
+// records that lack a field. Dictionary-encoded arrays and objects are shared
+// between records, so treat decoded records as read-only.
+
+const COLUMNAR_VERSION = 1;
+
+export function decodeColumnar(data) {
+    if (data.format !== 'columnar' || data.version !== COLUMNAR_VERSION) {
+        throw new Error(`Not a columnar v${COLUMNAR_VERSION} document`);
+    }
+    const { count, columns, absent = {} } = data;
+    const records = new Array(count);
+    for (let i = 0; i < count; i++) records[i] = {};
+
+    for (const { name, dict, codes, values } of columns) {
+        const skip = absent[name] ? new Set(absent[name]) : null;
+        for (let i = 0; i < count; i++) {
+            if (skip && skip.has(i)) continue;
+            records[i][name] = dict ? dict[codes[i]] : values[i];
+        }
+    }
+    return records;
+}
+
+export async function loadColumnar(url) {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`Failed to load ${url}: ${response.status}`);
+    return decodeColumnar(await response.json());
+}
@@ -0,0 +1,160 @@
+"""
+Trigram index for typo-tolerant drug name lookup.
+
+Names are folded to lower-case ASCII with spaces and punctuation removed
+("Abaca vir" -> "abacavir"), padded, and cut into overlapping trigrams. A
+query is scored against every name sharing at least one trigram with the
+Dice coefficient 2|Q & N| / (|Q| + |N|), so OCR splits, dropped letters and
+substitutions still land near the top.
+
+Covers formulary genericName/brandName and Frank Shann name:
+
+    python trigram_index.py build
+    python trigram_index.py query "acetylcystiene"
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+
+from build_report import record_count, section
+from json_writer import COMPACT_ROOT
+from search_index import normalize
+
+INDEX_PATH = os.path.join(COMPACT_ROOT, 'trigram.index.json')
+
+# (dataset, JSON file, fields) indexed by default
+SOURCES = (
+    ('formulary', 'src/formularyData.json', ('genericName', 'brandName')),
+    ('frankShann', 'src/frankShannData.json', ('name',)),
+)
+
+# Brand placeholders that would only add noise
+SKIP_NAMES = {'generic', 'na', ''}
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def fold(text):
+    """Lower-case ASCII with everything but letters and digits removed"""
+    return NON_ALNUM.sub('', normalize(text))
+
+
+def trigrams(text):
+    """Distinct trigrams of a folded, padded name"""
+    text = f"$${fold(text)}$"
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Name entries and trigram -> entry postings"""
+
+    def __init__(self):
+        # One entry per distinct (dataset, id, field) name
+        self.entries = []
+        self.sizes = []
+        self.postings = {}
+
+    def add(self, dataset, record_id, field, text):
+        if fold(text) in SKIP_NAMES:
+            return
+        grams = trigrams(text)
+        n = len(self.entries)
+        self.entries.append((dataset, record_id, field, text))
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(n)
+
+    def add_records(self, dataset, records, fields, id_field='id'):
+        for record in records:
+            for field in fields:
+                if record.get(field):
+                    self.add(dataset, record[id_field], field, record[field])
+
+    def query(self, text, limit=10, min_score=0.3):
+        """
+        Ranked fuzzy matches as dicts (dataset, id, field, name, score),
+        best first, at most one per record.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        size = len(grams)
+        best = {}
+        for n, common in shared.items():
+            score = 2 * common / (size + self.sizes[n])
+            if score < min_score:
+                continue
+            dataset, record_id, field, name = self.entries[n]
+            key = (dataset, record_id)
+            if key not in best or score > best[key]['score']:
+                best[key] = {'dataset': dataset, 'id': record_id, 'field': field,
+                             'name': name, 'score': round(score, 3)}
+        ranked = sorted(best.values(), key=lambda m: (-m['score'], m['name']))
+        return ranked[:limit]
+
+    def to_json(self):
+        return {'entries': self.entries, 'sizes': self.sizes, 'postings': self.postings}
+
+    @classmethod
+    def from_json(cls, data):
+        index = cls()
+        index.entries = [tuple(e) for e in data['entries']]
+        index.sizes = data['sizes']
+        index.postings = data['postings']
+        return index
+
+
+def build_trigram_index(sources=SOURCES):
+    """Index every configured dataset present on disk"""
+    index = TrigramIndex()
+    for dataset, path, fields in sources:
+        if not os.path.exists(path):
+            print(f"Skipping {dataset}: {path} not found")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            index.add_records(dataset, json.load(f), fields)
+    return index
+
+
+def write_trigram_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✓ Trigram index: {len(index.entries)} names, {len(index.postings)} trigrams -> {path}")
+
+
+def load_trigram_index(path=INDEX_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return TrigramIndex.from_json(json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the drug name trigram index")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help=f"index the generated data files into {INDEX_PATH}")
+    query = sub.add_parser('query', help="ranked fuzzy lookup")
+    query.add_argument('text')
+    query.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with section('build_index'):
+            index = build_trigram_index()
+        with section('write_json'):
+            write_trigram_index(index)
+        record_count('names', len(index.entries))
+    else:
+        index = load_trigram_index()
+        start = time.perf_counter()
+        matches = index.query(args.text, limit=args.limit)
+        elapsed = time.perf_counter() - start
+        for m in matches:
+            print(f"{m['score']:.3f}  {m['dataset']:<10} {m['id']:<16} {m['name']}")
+        print(f"{len(matches)} match(es) in {elapsed * 1000:.2f} ms")
@@ -1,6 +1,10 @@
+import argparse
 import json
 from datetime import datetime
 
+from build_report import record_count
+from json_writer import by_letter, write_shards
+
 def format_special_considerations(special_dict):
     """Format special considerations object for JavaScript"""
     if not special_dict:
@@ -76,7 +80,23 @@ def generate_counseling_js(json_file, output_file):
     with open(output_file, 'w') as f:
         f.write(js_content)
     
+    record_count('medications', len(medications))
     print(f"Updated {output_file} with {len(medications)} medications.")
 
+def generate_counseling_shards(json_file):
+    """Compact build: minified per-letter JSON shards in public/data/counseling/"""
+    with open(json_file, 'r') as f:
+        medications = json.load(f)
+    write_shards(medications, 'counseling', by_letter('name'))
+
 if __name__ == "__main__":
-    generate_counseling_js('counseling_data_extracted.json', 'src/counselingData.js')
+    parser = argparse.ArgumentParser(description="Generate src/counselingData.js from counseling_data_extracted.json")
+    parser.add_argument('json_file', nargs='?', default='counseling_data_extracted.json')
+    parser.add_argument('output_file', nargs='?', default='src/counselingData.js')
+    parser.add_argument('--compact', action='store_true', help="write minified per-letter shards to public/data/counseling/")
+    args = parser.parse_args()
+
+    if args.compact:
+        generate_counseling_shards(args.json_file)
+    else:
+        generate_counseling_js(args.json_file, args.output_file)